@@ -27,11 +27,17 @@ class ProgressWindow(QWidget):
         self.log_output = QTextEdit(self)
         self.log_output.setReadOnly(True)  # Make it read-only
         self.log_output.setFont(QFont("Consolas", 10))
+
+        # Add a preview of the COP (progressive order, hidden until the first preview)
+        self.preview_figure = Figure(figsize=(7, 3), tight_layout=True)
+        self.preview_canvas = FigureCanvasQTAgg(self.preview_figure)
+        self.preview_canvas.hide()
         
         # Organise the widgets
         layout.addWidget(self.progress_bar)
         layout.addWidget(self.status_label)
         layout.addWidget(self.log_output)
+        layout.addWidget(self.preview_canvas)
         
         self.setLayout(layout)
         
@@ -50,6 +56,20 @@ class ProgressWindow(QWidget):
             sys.stderr = sys.__stderr__
 
 
+    def update_preview(self, var_name, list_outputs):
+        # Plot the COP of the points computed so far (refined at the end of each level)
+        axes = self.preview_figure.gca()
+        axes.clear()
+        for outputs in list_outputs:
+            axes.plot(outputs[var_name], outputs['COP'], 'o-', markersize=3, label=outputs.get('fluid', 'COP'))
+        axes.set_xlabel(var_name)
+        axes.set_ylabel('COP')
+        axes.set_title(f"Preview: {sum(len(outputs['COP']) for outputs in list_outputs)} converged points")
+        axes.legend(loc='best')
+        self.preview_canvas.draw()
+        self.preview_canvas.show()
+
+
 
 class TerminalOutput:
     # Redirects stdout and stderr to a QTextEdit widget.
@@ -71,26 +91,29 @@ class TerminalOutput:
 class SimulationThread(QThread):
     progress = pyqtSignal(int)  # Signal to communicate progress
     finished = pyqtSignal(str) # Signal to communicate when done
+    preview = pyqtSignal(str, object)  # Signal to communicate the outputs at the end of each level (progressive order)
 
 
-    def __init__(self, simulation_type, file_path, variable_parameter):
+    def __init__(self, simulation_type, file_path, variable_parameter, progressive=False):
         super().__init__()
         self.simulation_type = simulation_type
         self.file_path = file_path
         self.variable_parameter = variable_parameter
+        self.progressive = progressive
 
 
     def run(self):
         try:
             if self.simulation_type == "One fluid simulation":
-                simulation = OneFluidSimulation(self.file_path, self.variable_parameter)
+                simulation = OneFluidSimulation(self.file_path, self.variable_parameter, progressive=self.progressive)
             elif self.simulation_type == "Several fluids simulation":
-                simulation = SeveralFluidsSimulation(self.file_path, self.variable_parameter)
+                simulation = SeveralFluidsSimulation(self.file_path, self.variable_parameter, progressive=self.progressive)
             else:
                 raise ValueError("Invalid simulation type.")
 
             # Simulate progress during the simulation
-            for progress in simulation.run_with_progress():  # Assuming `run_with_progress()` yields progress
+            preview = (lambda list_outputs: self.preview.emit(self.variable_parameter, list_outputs)) if self.progressive else None
+            for progress in simulation.run_with_progress(preview):  # Assuming `run_with_progress()` yields progress
                 self.progress.emit(progress)  # Emit progress update
             self.finished.emit("Simulation complete!")
         except Exception as e:
@@ -119,6 +142,7 @@ class HeatPumpInterface(QWidget):
         self._add_file_input()
         self._add_simulation_type_checkboxes()
         self._add_variable_parameter_dropdown()
+        self._add_progressive_checkbox()
         self._add_run_button()
 
         self.setLayout(self.layout)
@@ -270,6 +294,25 @@ class HeatPumpInterface(QWidget):
         self.layout.addLayout(dropdown_layout)
 
 
+    def _add_progressive_checkbox(self):
+
+        # Create a horizontal layout
+        progressive_layout = QHBoxLayout()
+
+        # Define the label
+        progressive_label = QLabel("Order of the computation:")
+        progressive_label.setAlignment(Qt.AlignLeft)
+        progressive_label.setFixedWidth(self.label_width)
+
+        # Define the check case
+        self.progressive_check = QCheckBox("Progressive (coarse to fine with a preview, for long sweeps)")
+
+        # Organise layouts
+        progressive_layout.addWidget(progressive_label)
+        progressive_layout.addWidget(self.progressive_check)
+        self.layout.addLayout(progressive_layout)
+
+
     def _add_run_button(self):
         self.button = QPushButton("Run Simulation", self)
         self.button.clicked.connect(self._on_button_click)
@@ -291,11 +334,13 @@ class HeatPumpInterface(QWidget):
         simulation_type = "One fluid simulation" if self.one_fluid_check.isChecked() else "Several fluids simulation"
         file_path = self.file_entry.text()
         variable_parameter = self.variable_dropdown.currentText()
+        progressive = self.progressive_check.isChecked()
 
         # Start simulation in a separate thread
-        self.simulation_thread = SimulationThread(simulation_type, file_path, variable_parameter)
+        self.simulation_thread = SimulationThread(simulation_type, file_path, variable_parameter, progressive)
         self.simulation_thread.progress.connect(self._on_progress_update)
         self.simulation_thread.finished.connect(self._on_simulation_finished)
+        self.simulation_thread.preview.connect(self._on_preview_update)
 
         # Open Progress Window
         self.progress_window = ProgressWindow()
@@ -310,6 +355,11 @@ class HeatPumpInterface(QWidget):
             self.progress_window.update_progress(value)
 
 
+    def _on_preview_update(self, var_name, list_outputs):
+        if hasattr(self, 'progress_window'):
+            self.progress_window.update_preview(var_name, list_outputs)
+
+
     def _on_simulation_finished(self, message):
         if hasattr(self, 'progress_window'):
             self.progress_window.status_label.setText(message)
\ No newline at end of file
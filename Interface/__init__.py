@@ -5,6 +5,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QFont, QPixmap, QTextCursor
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
 import sys
 import time
 import io
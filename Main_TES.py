@@ -1,5 +1,6 @@
 from Model_TES.ThermalEnergyStorage import *
 from Model_TES.Simulation           import *
+from Model_TES.COPLaw               import *
 from Interface.CreateSound          import *
 
 
@@ -26,4 +27,17 @@ if __name__ == "__main__":
         'η_elec' : 0.9,
     }
 
+    # COP law fitted on the results of the HTHP model (see COPLaw.py) instead of the values above
+    # => sweep of the compressor volume V for one fluid, the COP(Ẇ_comp) law goes straight into the inputs
+    fit_COP = False
+    if fit_COP:
+        from Model_HTHP.ExcelToPython import ExcelToPython
+        from Model_HTHP.Simulation    import OneFluidSimulation
+
+        data_list = ExcelToPython(input_file='Excel_Inputs/Inputs_T4_sizing_plot.xlsx').get_data()
+        data_list = [dict(data, fluid='R1233zd(E)') for data in data_list]
+        outputs   = OneFluidSimulation(None, 'V', verif=False)._get_outputs(data_list)
+        inputs['COP'] = COPLaw.from_outputs(outputs)
+        inputs['COP'].report()
+
     Simulation(inputs).run()
\ No newline at end of file
@@ -0,0 +1,106 @@
+from Model_HTHP.__init__	import *
+from Model_HTHP.PointResult	import *
+
+
+"""
+The class chooses the values of the variable parameter (var_name) of a sweep,
+instead of computing every column of the Excel input file.
+
+	1. n_initial points are computed uniformly in the range (low, high)
+	2. Each interval between two computed points gets a loss = (error + width_weight) * width
+		- error: distance between the outputs at the points and the straight line between their
+		  neighbours (normalized by the range of each output) => large where the curvature is large
+		- width: width of the interval (normalized by the range) => the whole range keeps being explored
+	3. A new point is computed in the middle of the interval with the largest loss
+	4. Repeat 2. and 3. until the budget (total number of points) is reached
+
+=> the points concentrate where the watched outputs (e.g. COP, ṁ_f) change fastest.
+
+The points are solved with the _solve_point method of the simulation (see Simulation.py),
+the nearest converged point being used as previous solution.
+
+"""
+
+
+class AdaptiveSampling:
+	def __init__(self, simulation, base_data, bounds, budget,	# values to be set
+			watch		= ('COP', 'ṁ_f'),						# default values
+			n_initial	= 9,									# default values
+			width_weight= 0.1,									# default values
+			):
+		self.simulation	= simulation
+		self.var_name	= simulation.var_name
+		self.base_data	= base_data
+		self.low, self.high = bounds
+		self.budget		= budget
+		self.watch		= watch
+		self.n_initial	= min(n_initial, budget)
+		self.width_weight = width_weight
+
+		self.x		= []	# sorted values of var_name
+		self.points	= []	# PointResult at each x
+
+
+	def _solve(self, x):
+		# Compute the point at x and insert it in the sorted lists
+
+		data = dict(self.base_data)
+		data[self.var_name] = float(x)
+
+		# Nearest converged neighbour as previous solution
+		position = int(np.searchsorted(self.x, x))
+		neighbours = sorted(range(len(self.x)), key=lambda i: abs(self.x[i] - x))
+		previous_solution = next((self.points[i].solution for i in neighbours if self.points[i].converged), None)
+
+		point = self.simulation._solve_point(len(self.points), data, previous_solution)
+		self.x.insert(position, float(x))
+		self.points.insert(position, point)
+
+
+	def _output(self, name):
+		return np.array([point.outputs[name] if point.converged else np.nan for point in self.points])
+
+
+	def _losses(self):
+		# Loss of each interval [x_i, x_i+1] (see the description above)
+
+		x = np.array(self.x)
+		width = np.diff(x) / (self.high - self.low)
+		error = np.zeros(len(x))
+
+		for name in self.watch:
+			# Only the converged points (failed points keep an error of 0)
+			y = self._output(name)
+			ok = np.flatnonzero(np.isfinite(y))
+			if len(ok) < 3 or not np.ptp(y[ok]) > 0:
+				continue
+			xs, ys = x[ok], y[ok]
+
+			# Interpolation error at each inner point (from its two converged neighbours)
+			y_line = ys[:-2] + (ys[2:] - ys[:-2]) * (xs[1:-1] - xs[:-2]) / (xs[2:] - xs[:-2])
+			error[ok[1:-1]] = np.maximum(error[ok[1:-1]], np.abs(ys[1:-1] - y_line) / np.ptp(ys))
+
+		# An interval takes the largest error of its two points, weighted by its width (splitting it halves the loss)
+		return (np.maximum(error[:-1], error[1:]) + self.width_weight) * width
+
+
+	def get_points(self):
+		# Compute the points and return them sorted by the value of var_name
+
+		for x in np.linspace(self.low, self.high, self.n_initial):
+			self._solve(x)
+
+		while len(self.points) < self.budget:
+			losses = self._losses()
+			# Do not split an interval too small
+			losses[np.diff(self.x) < 1e-6 * (self.high - self.low)] = -1
+			i = int(np.argmax(losses))
+			if losses[i] < 0:
+				break
+			self._solve((self.x[i] + self.x[i+1]) / 2)
+
+		# Index of each point = position in the sorted list
+		for index, point in enumerate(self.points):
+			point.index = index
+
+		return self.points
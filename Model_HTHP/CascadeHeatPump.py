@@ -0,0 +1,199 @@
+from Model_HTHP.__init__		import *
+from Model_HTHP.HeatPump		import *
+from Model_HTHP.PostComputation	import *
+
+
+"""
+The class computes a cascade of two heat pumps (low and high temperature stages),
+coupled by an intermediate loop (e.g. water), for the large temperature lifts.
+
+	source => evaporator L | stage L | condenser L => intermediate loop => evaporator H | stage H | condenser H => sink
+
+	- inputs_L	: inputs of the low stage (see HeatPump), its condenser side is the intermediate loop
+	- inputs_H	: inputs of the high stage (see HeatPump), its evaporator side is the intermediate loop
+	(T_ci of the low stage and T_ei of the high stage are unknowns of the system, see Intermediate loop)
+
+Intermediate loop:
+	- both stages must describe the same loop: fluid_c, ṁ_c, T_ci, P_ci of the low stage = fluid_e, ṁ_e, T_ei, P_ei of the high stage
+	  => checked with the capacity rates ṁ_c cp_c (low) = ṁ_e cp_e (high), else ValueError
+	  => the heat given by the low condenser is the heat taken by the high evaporator
+	- approximation: cp and ε of the loop are computed once by PreComputation at T_ci / T_ei of the inputs,
+	  not at the temperatures T_i1 / T_i2 found by the solve => give a temperature of the loop close to the expected one
+
+Unknowns (10):
+	[T_2, T_3, T_cd, T_ev] of the low stage, [T_2, T_3, T_cd, T_ev] of the high stage,
+	T_i1 = temperature of the loop into the low condenser, T_i2 = temperature of the loop into the high evaporator
+
+Equations (10):
+	- the 4 equations of each stage (see HeatPump._equations), with T_ci = T_i1 (low) and T_ei = T_i2 (high)
+	- low condenser:	T_i2 - T_i1 = ε_cd,L (T_2,L - T_i1)
+	- high evaporator:	T_i2 - T_i1 = ε_ev,H (T_i2 - T_ev,H)
+
+Solver:
+	Newton iterations x = x - α J^-1 F (numpy.linalg.solve, J is only 10 x 10), α halved until the scaled residuals decrease
+	After a full step, J is corrected by a sparse Broyden update (Schubert) instead of being computed again
+	The Jacobian J is sparse (blocks of each stage + coupling): it is computed by finite differences
+	perturbing together the columns which never appear in the same equation,
+	and only the stage of the perturbed columns is evaluated again (the loop equations are cheap)
+	=> 5 evaluations of each stage for a Jacobian (instead of 10 for a dense Jacobian)
+
+Cost of a point (measured with _test10.py, from the default initial guess):
+	- 21 evaluations of the equations of each stage (42 in all), about 40 to 50 ms
+	- one stage solved alone by fsolve: 29 evaluations from the default initial guess (about 25 ms),
+	  20 from an initial guess close to its solution (about 16 ms)
+	=> about 1.5 to 2 times one stage solved alone from the same initial guess,
+	   but up to 3 times one stage started close to its solution
+
+"""
+
+
+class CascadeHeatPump:
+	def __init__(self, inputs_L, inputs_H):
+		self.stage_L	= HeatPump(inputs_L)
+		self.stage_H	= HeatPump(inputs_H)
+		self.inputs_L	= dict(inputs_L)
+		self.inputs_H	= dict(inputs_H)
+
+		# Same intermediate loop on both sides: same capacity rate (W/K)
+		C_L = inputs_L['ṁ_c'] * inputs_L['cp_c']
+		C_H = inputs_H['ṁ_e'] * inputs_H['cp_e']
+		if not math.isclose(C_L, C_H, rel_tol=1e-6):
+			raise ValueError(f'The condenser side of the low stage (ṁ_c cp_c = {C_L:.6g} W/K) and the evaporator side '
+							 f'of the high stage (ṁ_e cp_e = {C_H:.6g} W/K) must describe the same intermediate loop')
+
+		# Sparsity of the Jacobian (rows = equations, columns = unknowns)
+		self.pattern = np.zeros((10, 10), dtype=bool)
+		self.pattern[0:4, 0:4]	= True		# low stage
+		self.pattern[0:4, 8]	= True		# T_ci of the low stage = T_i1
+		self.pattern[4:8, 4:8]	= True		# high stage
+		self.pattern[4:8, 9]	= True		# T_ei of the high stage = T_i2
+		self.pattern[8, [0, 8, 9]]	= True	# low condenser
+		self.pattern[9, [7, 8, 9]]	= True	# high evaporator
+
+		# Groups of columns perturbed together (no equation depends on two columns of the same group)
+		self.groups = [[0, 4], [1, 5], [2, 6], [3, 7], [8], [9]]
+
+
+	def _stage_equations(self, stage, vars):
+		# Equations of a stage (see HeatPump._equations)
+		equations = list(stage._equations(vars))
+
+		# eq4 of a stage is piecewise linear in T_3 - T_cd (slope 1 below 0, 2 above): divided by its slope,
+		# it becomes T_3 - T_cd (same solution, but no kink for the Newton iterations)
+		equations[3] = equations[3] / 2 if equations[3] > 0 else equations[3]
+		return equations
+
+
+	def _equations(self, vars, F=None, stages=('L', 'H')):
+		# F, stages => only the stages given are evaluated, the equations of the other stage are taken from F
+		T_i1, T_i2 = vars[8], vars[9]
+
+		# Each stage with the temperature of the intermediate loop
+		self.stage_L.T_ci = T_i1
+		self.stage_H.T_ei = T_i2
+		eq_L = self._stage_equations(self.stage_L, vars[0:4]) if 'L' in stages else list(F[0:4])
+		eq_H = self._stage_equations(self.stage_H, vars[4:8]) if 'H' in stages else list(F[4:8])
+
+		# Intermediate loop
+		eq_cd = (T_i2 - T_i1) - self.stage_L.ε_cd * (vars[0] - T_i1)
+		eq_ev = (T_i2 - T_i1) - self.stage_H.ε_ev * (T_i2 - vars[7])
+
+		# A trial point out of the domain of the fluids may give complex values (power of a negative number) => NaN
+		equations = np.array(list(eq_L) + list(eq_H) + [eq_cd, eq_ev], dtype=complex)
+		return np.where(equations.imag == 0, equations.real, np.nan)
+
+
+	def _jacobian(self, x, F):
+		# Sparse Jacobian by finite differences, one evaluation of the equations for each group of columns
+		# (only the stages which depend on the columns of the group)
+		J = np.zeros((len(x), len(x)))
+		for group in self.groups:
+			dx = x.copy()
+			steps = np.zeros(len(x))
+			for j in group:
+				steps[j] = 1e-6 * max(abs(x[j]), 1)
+				dx[j] += steps[j]
+			stages = [stage for stage, rows in (('L', slice(0, 4)), ('H', slice(4, 8))) if self.pattern[rows, group].any()]
+			dF = self._equations(dx, F, stages) - F
+			for j in group:
+				J[self.pattern[:, j], j] = dF[self.pattern[:, j]] / steps[j]
+		return J
+
+
+	def _update_jacobian(self, J, dx, dF):
+		# Sparse Broyden update (Schubert): each row is corrected on its non-zero entries only
+		for i in range(len(J)):
+			s = np.where(self.pattern[i], dx, 0)
+			if s @ s > 0:
+				J[i] += (dF[i] - J[i] @ dx) * s / (s @ s)
+		return J
+
+
+	def get_initial_guess(self):
+		# Loop between the source and the sink, each stage with a lift of half the total lift
+		T_ei, T_ci = self.inputs_L['T_ei'], self.inputs_H['T_ci']
+		T_i = (T_ei + T_ci) / 2
+		guess_L = [T_i + 30, T_i + 10, T_i + 10, T_ei - 10]
+		guess_H = [T_ci + 30, T_ci + 10, T_ci + 10, T_i - 10]
+		return guess_L + guess_H + [T_i - 3, T_i + 3]
+
+
+	def solve(self, initial_guess=None, tolerance=1e-10, max_iterations=50):
+		# Damped Newton iterations on the coupled system, returns the solution and the residuals
+
+		x = np.array(initial_guess if initial_guess is not None else self.get_initial_guess(), dtype=float)
+		F = self._equations(x)
+		J = self._jacobian(x, F)
+
+		# Scale of each equation: norm of its row of the Jacobian (derivatives relative to the value of each unknown)
+		norm = np.linalg.norm(J * np.abs(x), axis=1)
+		weights = 1 / np.where(np.isfinite(norm) & (norm > 0), norm, 1)
+		merit = lambda F: float(np.max(np.abs(F * weights)))
+
+		self.iterations = 0
+		updated = False		# True if J comes from a Broyden update
+		for self.iterations in range(1, max_iterations + 1):
+			if not np.all(np.isfinite(F)) or merit(F) < tolerance:
+				break
+
+			try:
+				step = np.linalg.solve(J, -F)
+			except np.linalg.LinAlgError:
+				break
+			if not np.all(np.isfinite(step)):
+				break
+
+			# Damping: the step is halved until the scaled residuals decrease
+			α = 1
+			while α > 1e-3:
+				F_new = self._equations(x + α * step)
+				if np.all(np.isfinite(F_new)) and merit(F_new) < merit(F):
+					break
+				α /= 2
+			else:
+				# No decrease: with an updated J, the Jacobian is computed again before giving up
+				if not updated:
+					break
+				J, updated = self._jacobian(x, F), False
+				continue
+
+			# Full step: the Jacobian is updated (sparse Broyden), else it is computed again by finite differences
+			x = x + α * step
+			updated = α == 1
+			J = self._update_jacobian(J, α * step, F_new - F) if updated else self._jacobian(x, F_new)
+			F = F_new
+
+		return x, list(F)
+
+
+	def get_results(self, solution):
+		# Post computation of each stage (see PostComputation) with the temperatures of the loop
+		inputs_L = dict(self.inputs_L, T_ci=solution[8])
+		inputs_H = dict(self.inputs_H, T_ei=solution[9])
+		return PostComputation(inputs_L, solution[0:4]), PostComputation(inputs_H, solution[4:8])
+
+
+	def get_COP(self, solution):
+		# COP of the cascade = heat given to the sink / work of both compressors
+		results_L, results_H = self.get_results(solution)
+		return results_H.power['cond'] / (results_L.power['comp'] + results_H.power['comp'])
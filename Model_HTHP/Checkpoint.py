@@ -0,0 +1,126 @@
+from Model_HTHP.__init__ import *
+from Model_HTHP.PointResult import *
+import json
+
+
+"""
+The class saves the completed points of a long simulation in an append-only file (one JSON line per event),
+so that a crashed or interrupted run can be resumed without computing again the finished points.
+
+File format:
+	{"job": {"input_file": ..., "var_name": ...}}				First line, identifies the job
+	{"fluid": ..., "index": ..., "status": "started"}				Written (and flushed) before solving a point
+	{"fluid": ..., "index": ..., "status": "done", "point": {...}}	Written (and flushed) when the point is solved
+
+A point that is 'started' but never 'done' was being solved when the run stopped:
+	- once	=> computed again when resuming (Ctrl+C, window closed, ...)
+	- twice	=> it crashes the run (e.g. CoolProp segfault), marked as failed instead of being computed again
+
+A line partially written when the run stopped is removed before the new lines are appended
+(the job line is written again if it is the partial one, a job line which cannot be read is another job).
+
+"""
+
+
+class Checkpoint:
+	max_starts = 2	# a point started this number of times and never done is marked as failed
+
+
+	def __init__(self, file_path, job, resume=False):
+		self.file_path	= file_path
+		self.job		= job		# e.g. {'input_file': ..., 'var_name': ...}
+		self.points		= {}		# (fluid, index) => PointResult
+
+		if resume and os.path.exists(self.file_path) and self._load():
+			self.file = open(self.file_path, 'a', encoding='utf-8')
+		else:
+			# New file, or nothing complete in the file (the job line was partially written during a crash)
+			self.file = open(self.file_path, 'w', encoding='utf-8')
+			self._write({'job': self.job})
+
+
+	def _write(self, line):
+		# Append one line and flush it, so that it survives a crash of the process
+		self.file.write(json.dumps(line, ensure_ascii=False) + '\n')
+		self.file.flush()
+
+
+	def _load(self):
+		# Read the points of the file, False if even the job line is not complete (nothing to resume)
+		started = {}	# (fluid, index) => number of runs which started the point
+		end = 0			# end of the last complete line (in bytes)
+
+		with open(self.file_path, 'rb') as file:
+			for n, line in enumerate(file):
+				if not line.endswith(b'\n'):
+					break # last line partially written during a crash
+				end += len(line)
+				try:
+					line = json.loads(line)
+				except json.JSONDecodeError:
+					line = None
+
+				if n == 0:
+					job = line.get('job') if isinstance(line, dict) else None
+					if job != self.job:
+						raise ValueError(f"The checkpoint {self.file_path} belongs to another job: {job}")
+					continue
+				if line is None:
+					continue
+
+				key = (line['fluid'], line['index'])
+				if line['status'] == 'started':
+					started[key] = started.get(key, 0) + 1
+				else:
+					self.points[key] = self._from_json(line['point'])
+
+		# Remove the partial line, else the next line would be appended to it
+		with open(self.file_path, 'r+b') as file:
+			file.truncate(end)
+
+		# Points which stopped the previous runs several times (the others are computed again)
+		for (fluid, index), starts in started.items():
+			if (fluid, index) not in self.points and starts >= self.max_starts:
+				self.points[(fluid, index)] = PointResult(index, None, error=f'Crash during {starts} previous runs')
+
+		return end > 0
+
+
+	def _to_json(self, point):
+		# numpy floats are not JSON serializable
+		to_float = lambda values: [float(v) for v in values] if values is not None else None
+		return {
+			'index'		: point.index,
+			'data'		: point.data,
+			'inputs'	: {k: (v if isinstance(v, str) else float(v)) for k, v in point.inputs.items()} if point.inputs else None,
+			'solution'	: to_float(point.solution),
+			'residuals'	: to_float(point.residuals),
+			'outputs'	: {k: float(v) for k, v in point.outputs.items()},
+			'error'		: point.error,
+			'time'		: point.time,
+		}
+
+
+	def _from_json(self, point):
+		return PointResult(
+			point['index'], point['data'], point['inputs'],
+			np.array(point['solution']) if point['solution'] is not None else None,
+			point['residuals'], point['outputs'], point['error'], point['time'])
+
+
+	def get(self, fluid, index):
+		# Return the PointResult if the point is already finished, else None
+		return self.points.get((fluid, index))
+
+
+	def start(self, fluid, index):
+		self._write({'fluid': fluid, 'index': index, 'status': 'started'})
+
+
+	def save(self, fluid, point):
+		self.points[(fluid, point.index)] = point
+		self._write({'fluid': fluid, 'index': point.index, 'status': 'done', 'point': self._to_json(point)})
+
+
+	def close(self):
+		self.file.close()
@@ -0,0 +1,240 @@
+from Model_HTHP.__init__			import *
+from Model_HTHP.PerformanceMap	import *
+import itertools
+
+
+"""
+The class stores a large performance map (see PerformanceMap.py) on disk, in chunks,
+so that the size of the map is limited by the disk and not by the memory.
+
+Directory of the map (one directory per fluid, the fluid is given by base_data):
+	index.json				Axes, chunk shape, base data and list of the finished chunks
+	chunk_i_j_k.npy			Sub-grid n°(i, j, k), array of shape (len(output_names) + 1, *chunk_shape)
+								=> one row per output (NaN if not converged), last row = converged (1 or 0)
+
+Build:
+	ChunkedPerformanceMap.build(directory, base_data, factors, chunk_size=4096, workers=4)
+	=> chunk_size is a number of points per chunk, split between the axes (e.g. 8^4 points in 4-D, 4^6 in 6-D)
+	=> each worker solves one chunk (see DesignOfExperiments.py) and writes its .npy file,
+	   the index is updated when the chunk is finished
+	=> if the build is stopped, building again in the same directory only computes the missing chunks
+
+Lookup:
+	ChunkedPerformanceMap(directory).evaluate('COP', T_ei=..., ...)		(same as PerformanceMap, linear only)
+	=> the queries are grouped by chunk, only the chunks touched by the queries are memory-mapped
+	to_memory() loads the whole map in a PerformanceMap (e.g. for the cubic interpolation of a small map)
+
+"""
+
+
+def _build_chunk(directory, file_name, base_data, factors, output_names, kwargs):
+	# Solve one chunk in a worker process and write its file (must be a module function to be pickled)
+	# The new solutions of the warm start index are sent back to the main process (see WarmStartIndex.merge)
+	design	= DesignOfExperiments(base_data, factors, method='grid', **kwargs)
+	results	= design.run()
+
+	shape = results['converged'].shape
+	array = np.full((len(output_names) + 1,) + shape, np.nan)
+	for j, name in enumerate(output_names):
+		if name in results['outputs']:
+			array[j] = results['outputs'][name]
+	array[-1] = results['converged']
+
+	# Write a temporary file first, so that a crash never leaves a corrupted chunk
+	temporary = os.path.join(directory, file_name + '.tmp.npy')
+	np.save(temporary, array)
+	os.replace(temporary, os.path.join(directory, file_name))
+
+	warm_start = design.simulation.warm_start
+	return file_name, warm_start.new_entries if warm_start is not None else []
+
+
+class ChunkedPerformanceMap(PerformanceMap):
+	# Outputs of a point (see OneFluidSimulation._point_outputs)
+	output_names = ['T_2', 'T_3', 'T_cd', 'T_ev', 'P_evap', 'P_cond', 'P_comp', 'ΔT_lift', 'ΔT_cd', 'COP', 'ṁ_f']
+
+
+	def __init__(self, directory):
+		# PerformanceMap.__init__ is not called (it needs the whole tables in memory):
+		# axes, outputs (names only, the values are in the chunks), base_data and _corners are set here,
+		# converged and _filtered are not used (linear interpolation chunk by chunk, see _evaluate_rows)
+		self.directory	= directory
+		with open(os.path.join(directory, 'index.json'), encoding='utf-8') as file:
+			self.index	= json.load(file)
+
+		self.axes			= {name: np.array(values, dtype=float) for name, values in self.index['axes'].items()}
+		self.outputs		= {name: None for name in self.index['output_names']}
+		self.base_data		= self.index['base_data']
+		self.chunk_shape	= tuple(self.index['chunk_shape'])
+		self.n_chunks		= tuple(-(-n // c) for n, c in zip(self.shape, self.chunk_shape))
+		self._corners		= np.array(list(np.ndindex(*(2,) * len(self.axes))))
+		self._chunks		= {}	# chunk => memory-mapped array (None if the chunk is not built)
+
+
+	@staticmethod
+	def _file_name(chunk):
+		return 'chunk_' + '_'.join(str(k) for k in chunk) + '.npy'
+
+
+	@staticmethod
+	def _get_chunk_shape(lengths, chunk_size):
+		# Points of each axis in a chunk, with about chunk_size points in the chunk:
+		# the shortest axes first, the points which they do not use are given to the longest ones
+		shape, budget = [None] * len(lengths), chunk_size
+		for j in sorted(range(len(lengths)), key=lambda j: lengths[j]):
+			remaining	= sum(side is None for side in shape)
+			shape[j]	= min(lengths[j], max(1, int(budget ** (1 / remaining) + 1e-9)))
+			budget		= max(budget // shape[j], 1)
+		return shape
+
+
+	@classmethod
+	def build(cls, directory, base_data, factors, chunk_size=4096, workers=1, **kwargs):
+		# Solve the missing chunks of the map (kwargs: store, warm_start, ... see DesignOfExperiments)
+		# chunk_size => number of points per chunk (see _get_chunk_shape)
+
+		factors		= {name: sorted(float(value) for value in values) for name, values in factors.items()}
+		chunk_shape	= cls._get_chunk_shape([len(values) for values in factors.values()], chunk_size)
+		index_file	= os.path.join(directory, 'index.json')
+		index		= {
+			'axes'			: factors,
+			'output_names'	: cls.output_names,
+			'chunk_shape'	: chunk_shape,
+			'base_data'		: base_data,
+			'done'			: [],
+			}
+
+		# Resume a previous build of the same map
+		if os.path.exists(index_file):
+			with open(index_file, encoding='utf-8') as file:
+				previous = json.load(file)
+			if {key: previous[key] for key in index if key != 'done'} != {key: index[key] for key in index if key != 'done'}:
+				raise ValueError(f'{directory} contains another map, use another directory')
+			index['done'] = [name for name in previous['done'] if os.path.exists(os.path.join(directory, name))]
+		os.makedirs(directory, exist_ok=True)
+
+		def save_index():
+			temporary = index_file + '.tmp'
+			with open(temporary, 'w', encoding='utf-8') as file:
+				json.dump(index, file, ensure_ascii=False)
+			os.replace(temporary, index_file)
+
+		# Factors of each missing chunk
+		n_chunks = [-(-len(values) // c) for values, c in zip(factors.values(), chunk_shape)]
+		tasks = []
+		for chunk in np.ndindex(*n_chunks):
+			if cls._file_name(chunk) in index['done']:
+				continue
+			chunk_factors = {name: values[k*c:(k+1)*c] for (name, values), k, c in zip(factors.items(), chunk, chunk_shape)}
+			tasks.append((directory, cls._file_name(chunk), base_data, chunk_factors, cls.output_names, kwargs))
+
+		print(f'Chunks to compute: {len(tasks)} / {int(np.prod(n_chunks))}\n')
+		save_index()
+
+		if workers <= 1:
+			for task in tasks:
+				index['done'].append(_build_chunk(*task)[0])
+				save_index()
+		else:
+			with ProcessPoolExecutor(max_workers=workers) as executor:
+				futures = [executor.submit(_build_chunk, *task) for task in tasks]
+				for future in as_completed(futures):
+					file_name, entries = future.result()
+					kwargs['warm_start'].merge(entries) if entries else None
+					index['done'].append(file_name)
+					save_index()
+
+		return cls(directory)
+
+
+	def _get_chunk(self, chunk):
+		# Memory-mapped array of the chunk (None if the chunk is not built yet)
+		if chunk not in self._chunks:
+			file_path = os.path.join(self.directory, self._file_name(chunk))
+			self._chunks[chunk] = np.load(file_path, mmap_mode='r') if os.path.exists(file_path) else None
+		return self._chunks[chunk]
+
+
+	def _get_block(self, chunk):
+		# Points of the chunk plus the first layer of the next chunks, so that all the cells of the chunk are complete
+		start	= [k * c for k, c in zip(chunk, self.chunk_shape)]
+		stop	= [min(s + c + 1, n) for s, c, n in zip(start, self.chunk_shape, self.shape)]
+		block	= np.full((len(self.outputs) + 1,) + tuple(b - a for a, b in zip(start, stop)), np.nan)
+		block[-1] = 0
+
+		for neighbour in itertools.product(*[(k, k + 1) if k + 1 < n else (k,) for k, n in zip(chunk, self.n_chunks)]):
+			array = self._get_chunk(neighbour)
+			if array is None:
+				continue
+			n_start	= [k * c for k, c in zip(neighbour, self.chunk_shape)]
+			low		= [max(a, b) for a, b in zip(start, n_start)]
+			high	= [min(a, b + n) for a, b, n in zip(stop, n_start, array.shape[1:])]
+			block[(slice(None),) + tuple(slice(l - s, h - s) for l, h, s in zip(low, high, start))] = \
+				array[(slice(None),) + tuple(slice(l - s, h - s) for l, h, s in zip(low, high, n_start))]
+		return block
+
+
+	def _evaluate_rows(self, rows, queries):
+		# Interpolation of the rows of the chunks (+ converged) at the queries, chunk by chunk
+		index, t, inside = self._locate(queries)
+		shape	= inside.shape
+		index	= [np.broadcast_to(i, shape).ravel() for i in index]
+		t		= [np.broadcast_to(tj, shape).ravel() for tj in t]
+
+		values	= np.full((len(rows), inside.size), np.nan)
+		valid	= np.zeros(inside.size, dtype=bool)
+
+		# Group the queries by chunk of their cell
+		chunks	= [i // c for i, c in zip(index, self.chunk_shape)]
+		ids		= np.ravel_multi_index(chunks, self.n_chunks)
+		order	= np.argsort(ids, kind='stable')
+		bounds	= np.flatnonzero(np.diff(ids[order])) + 1
+
+		for group in np.split(order, bounds):
+			if len(group) == 0:
+				continue
+			chunk = tuple(int(k[group[0]]) for k in chunks)
+			block = self._get_block(chunk)
+			local = [i[group] - k * c for i, k, c in zip(index, chunk, self.chunk_shape)]
+			converged = block[-1] > 0.5
+			for j, row in enumerate(rows):
+				values[j, group], valid[group] = self._interpolate(block[row], converged, local, [tj[group] for tj in t])
+			if not rows:
+				valid[group] = self._interpolate(block[-1], converged, local, [tj[group] for tj in t])[1]
+
+		valid = valid.reshape(shape) & inside
+		return [np.where(valid, value.reshape(shape), np.nan) for value in values], valid
+
+
+	def is_valid(self, **queries):
+		return self._evaluate_rows([], queries)[1]
+
+
+	def evaluate(self, name, method='linear', **queries):
+		# Output 'name' at the queries (NaN where is_valid is False)
+
+		if name not in self.outputs:
+			raise KeyError(f"'{name}' is not an output of the map, use one of {list(self.outputs)}")
+		if method != 'linear':
+			raise ValueError(f"Only the method 'linear' is available for a chunked map, use to_memory() for '{method}'")
+
+		return self._evaluate_rows([list(self.outputs).index(name)], queries)[0][0]
+
+
+	def save(self, file_path):
+		# The chunks are the storage of the map, save writes the whole map in one .npz file (see PerformanceMap.save)
+		self.to_memory().save(file_path)
+
+
+	def to_memory(self):
+		# Whole map in a PerformanceMap (the chunks which are not built are not converged)
+		table = np.full((len(self.outputs) + 1,) + self.shape, np.nan)
+		table[-1] = 0
+		for chunk in np.ndindex(*self.n_chunks):
+			array = self._get_chunk(chunk)
+			if array is not None:
+				start = [k * c for k, c in zip(chunk, self.chunk_shape)]
+				table[(slice(None),) + tuple(slice(s, s + n) for s, n in zip(start, array.shape[1:]))] = array
+
+		outputs = {name: table[j] for j, name in enumerate(self.outputs)}
+		return PerformanceMap(self.axes, outputs, table[-1] > 0.5, self.base_data)
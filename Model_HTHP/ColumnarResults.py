@@ -0,0 +1,229 @@
+from Model_HTHP.__init__	import *
+import json
+import csv
+
+# Optional: Feather and Parquet files need pyarrow, else the results are written in .npy files
+try:
+	import pyarrow
+	import pyarrow.feather	as feather
+	import pyarrow.parquet	as parquet
+except ImportError:
+	pyarrow = None
+
+
+"""
+The class stores the results of a run in columns (one row per operating point), written next to the Excel file
+in a binary format, so that the post-processing and the comparisons between runs do not need openpyxl.
+
+Columns:
+	'fluid'				: ,		Fluid of the point
+	'var_name'			: ,		Name of the variable parameter of the run
+	'var_value'			: ,		Value of the variable parameter (units of the Excel file)
+	'index'				: ,		Position of the point in the input data (see PointResult)
+	'input.<name>'		: ,		Raw data of the point (see ExcelToPython.get_data), e.g. 'input.T_ci'
+	'solution.<name>'	: ,		Solution [T_2, T_3, T_cd, T_ev] (in K)
+	'residual.<i>'		: ,		Residuals of the non-linear system (i = 1, 2, ...)
+	'output.<name>'		: ,		Outputs of the point (see _point_outputs), e.g. 'output.COP'
+	'converged'			: ,		True if the point converged
+	'error'				: ,		Reason of the failure ('' if converged)
+	'time'				: ,		Time spent to solve the point (in s)
+	The numbers of the points which did not converge are NaN.
+
+Formats (save):
+	'feather'	=> one .feather file (Arrow, not compressed: the columns are memory-mapped when loaded)	needs pyarrow
+	'parquet'	=> one .parquet file (compressed, smaller but decoded when loaded)						needs pyarrow
+	'npy'		=> one directory with a .npy file per column and schema.json (memory-mapped when loaded)
+	'csv'		=> one .csv file (text, read completely when loaded)
+	'auto'		=> 'feather' if pyarrow is installed, else 'npy'
+
+Loading:
+	results = ColumnarResults.load('Excel_Outputs/Outputs_....feather')
+	(or the directory of the results written part by part during a run, see ResultSink.py)
+	results['output.COP'], results.select(fluid='R134a', converged=True), ...
+
+"""
+
+
+class ColumnarResults:
+	formats = ('auto', 'feather', 'parquet', 'npy', 'csv')
+
+
+	def __init__(self, columns, metadata=None):
+		self.columns	= columns				# name => numpy array (same length)
+		self.metadata	= metadata or {}
+
+
+	@property
+	def names(self):
+		return list(self.columns)
+
+
+	def __len__(self):
+		return len(next(iter(self.columns.values()))) if self.columns else 0
+
+
+	def __getitem__(self, name):
+		return self.columns[name]
+
+
+	def __contains__(self, name):
+		return name in self.columns
+
+
+	@staticmethod
+	def _to_array(values):
+		# Text column if all the values given are strings, else numbers (None => NaN)
+		if all(value is None or isinstance(value, str) for value in values):
+			return np.array(['' if value is None else value for value in values], dtype=str)
+		return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+
+	@staticmethod
+	def _to_numbers(values):
+		# Numbers only (None => NaN), e.g. the solution of a point which did not converge
+		return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+
+	@classmethod
+	def from_points(cls, points, var_name, fluid=None):
+		# Columns of the points (PointResult) of a run, fluid => fluid of all the points (else the fluid of their data)
+		points = list(points)
+
+		names_data		= list(dict.fromkeys(name for point in points for name in point.data))
+		names_outputs	= list(dict.fromkeys(name for point in points for name in point.outputs))
+		n_residuals		= max([len(point.residuals) for point in points if point.residuals is not None], default=0)
+		get = lambda values, i: values[i] if values is not None and i < len(values) else None
+
+		columns = {
+			'fluid'		: cls._to_array([fluid if fluid is not None else point.data.get('fluid') for point in points]),
+			'var_name'	: cls._to_array([var_name] * len(points)),
+			'var_value'	: cls._to_array([point.data.get(var_name) for point in points]),
+			'index'		: np.array([point.index for point in points], dtype=int),
+			}
+		for name in names_data:
+			columns[f'input.{name}'] = cls._to_array([point.data.get(name) for point in points])
+		for i, name in enumerate(('T_2', 'T_3', 'T_cd', 'T_ev')):
+			columns[f'solution.{name}'] = cls._to_numbers([get(point.solution, i) for point in points])
+		for i in range(n_residuals):
+			columns[f'residual.{i + 1}'] = cls._to_numbers([get(point.residuals, i) for point in points])
+		for name in names_outputs:
+			columns[f'output.{name}'] = cls._to_array([point.outputs.get(name) for point in points])
+		columns['converged']	= np.array([point.converged for point in points], dtype=bool)
+		columns['error']		= cls._to_array([point.error or '' for point in points])
+		columns['time']			= cls._to_numbers([point.time for point in points])
+
+		# The residuals and the solution of the points which did not converge are not used
+		for name in columns:
+			if name.startswith(('solution.', 'residual.', 'output.')):
+				columns[name][~columns['converged']] = np.nan
+
+		return cls(columns, {'var_name': var_name})
+
+
+	@classmethod
+	def concatenate(cls, list_results):
+		# Rows of several results (e.g. one per fluid), the columns missing in some results are NaN or ''
+		list_results = [results for results in list_results if len(results)]
+		if not list_results:
+			return cls({})
+
+		names	= list(dict.fromkeys(name for results in list_results for name in results.names))
+		columns	= {}
+		for name in names:
+			model	= next(results[name] for results in list_results if name in results)
+			empty	= lambda n: np.full(n, '' if model.dtype.kind == 'U' else np.nan, dtype=model.dtype if model.dtype.kind == 'U' else float)
+			columns[name] = np.concatenate([np.asarray(results[name]) if name in results else empty(len(results)) for results in list_results])
+		return cls(columns, dict(list_results[0].metadata))
+
+
+	def select(self, **conditions):
+		# Rows where each column is equal to the value given, e.g. select(fluid='R134a', converged=True)
+		mask = np.ones(len(self), dtype=bool)
+		for name, value in conditions.items():
+			mask &= np.asarray(self.columns[name]) == value
+		return ColumnarResults({name: np.asarray(values)[mask] for name, values in self.columns.items()}, dict(self.metadata))
+
+
+	def save(self, path, format='auto'):
+		# Write the columns (path without extension, the extension of the format is added), return the path of the file
+		if format not in self.formats:
+			raise ValueError(f"Unknown format '{format}', use one of {self.formats}")
+		if format == 'auto':
+			format = 'feather' if pyarrow is not None else 'npy'
+		if format in ('feather', 'parquet') and pyarrow is None:
+			raise ImportError(f"The format '{format}' needs pyarrow (pip install pyarrow), use 'npy' or 'csv'")
+
+		os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+		metadata = dict(self.metadata, columns={name: str(values.dtype) for name, values in self.columns.items()})
+
+		if format in ('feather', 'parquet'):
+			table = pyarrow.table({name: np.asarray(values) for name, values in self.columns.items()})
+			table = table.replace_schema_metadata({'heat_pump': json.dumps(metadata, ensure_ascii=False)})
+			path += '.' + format
+			if format == 'feather':
+				feather.write_feather(table, path, compression='uncompressed')
+			else:
+				parquet.write_table(table, path)
+
+		elif format == 'npy':
+			path += '_results'
+			os.makedirs(path, exist_ok=True)
+			for j, (name, values) in enumerate(self.columns.items()):
+				np.save(os.path.join(path, f'{j}.npy'), np.asarray(values))
+			with open(os.path.join(path, 'schema.json'), 'w', encoding='utf-8') as file:
+				json.dump(dict(metadata, files={name: f'{j}.npy' for j, name in enumerate(self.columns)}), file, ensure_ascii=False, indent=1)
+
+		else:
+			path += '.csv'
+			with open(path, 'w', newline='', encoding='utf-8') as file:
+				writer = csv.writer(file)
+				writer.writerow(self.names)
+				writer.writerows(zip(*[values.tolist() for values in self.columns.values()]))
+			with open(path + '.json', 'w', encoding='utf-8') as file:
+				json.dump(metadata, file, ensure_ascii=False, indent=1)
+
+		return path
+
+
+	@classmethod
+	def load(cls, path):
+		# Results written by save, the columns of the .feather and .npy files are memory-mapped (read only)
+
+		if os.path.isfile(os.path.join(path, 'parts.json')):
+			# Results written part by part during a run (see ResultSink.py), only the finished parts are listed
+			with open(os.path.join(path, 'parts.json'), encoding='utf-8') as file:
+				index = json.load(file)
+			results = cls.concatenate([cls.load(os.path.join(path, part['file'])) for part in index['parts']])
+			results.metadata.update(var_name=index['var_name'], finished=index['finished'])
+			return results
+
+		if os.path.isdir(path):
+			with open(os.path.join(path, 'schema.json'), encoding='utf-8') as file:
+				metadata = json.load(file)
+			columns = {name: np.load(os.path.join(path, file_name), mmap_mode='r') for name, file_name in metadata.pop('files').items()}
+
+		elif path.endswith(('.feather', '.parquet')):
+			if pyarrow is None:
+				raise ImportError(f'{path} needs pyarrow (pip install pyarrow)')
+			if path.endswith('.feather'):
+				table = feather.read_table(pyarrow.memory_map(path), memory_map=True)
+			else:
+				table = parquet.read_table(path, memory_map=True)
+			metadata = json.loads(table.schema.metadata[b'heat_pump'].decode())
+			columns = {name: table.column(name).to_numpy() for name in table.column_names}
+
+		else:
+			with open(path + '.json', encoding='utf-8') as file:
+				metadata = json.load(file)
+			with open(path, newline='', encoding='utf-8') as file:
+				rows = list(csv.reader(file))
+			columns = {}
+			for name, values in zip(rows[0], zip(*rows[1:]) if len(rows) > 1 else [()] * len(rows[0])):
+				dtype = metadata['columns'][name]
+				if dtype == 'bool':
+					columns[name] = np.array([value == 'True' for value in values], dtype=bool)
+				else:
+					columns[name] = np.array(values, dtype=dtype if dtype.startswith('<U') else float).astype(dtype)
+
+		metadata.pop('columns', None)
+		return cls(columns, metadata)
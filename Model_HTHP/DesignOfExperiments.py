@@ -0,0 +1,207 @@
+from Model_HTHP.__init__	import *
+from Model_HTHP.Simulation	import *
+
+
+"""
+The class runs a multi-dimensional sweep (design of experiments) of the heat pump model,
+without having to write each point as a column of the Excel input file.
+
+Inputs:
+	'base_data'	: ,		Data of one column (see ExcelToPython.get_data), used for all the fixed inputs
+	'factors'	: ,		Inputs to vary (any key of base_data, in the units of the Excel file)
+							method = 'grid'			 => {name: [value1, value2, ...], ...}	(full factorial grid)
+							method = 'lhs' / 'sobol' => {name: (low, high), ...}			(n_samples points)
+	'method'	: ,		'grid', 'lhs' (Latin hypercube) or 'sobol'
+	'n_samples'	: ,		Number of points for 'lhs' and 'sobol'
+	'workers'	: ,		Number of processes solving the points in parallel
+	'store'		: ,		ResultStore object, to reuse the points already computed (see ResultStore.py)
+	'warm_start': ,		WarmStartIndex object, initial guesses from the past solutions (see WarmStartIndex.py)
+
+Scheduler:
+	The points are solved so that two consecutive points are near neighbours
+	(serpentine path for a grid, nearest neighbour path otherwise).
+	=> the previous solution is a good initial guess when the first initial guess diverges (see OneFluidSimulation)
+	With several workers, the path is split in contiguous chunks, each chunk being solved by one process.
+
+Outputs (see run):
+	'factors'	: ,		grid => axis of each factor	/ lhs, sobol => value of each factor for each sample
+	'outputs'	: ,		Arrays of the outputs (see OneFluidSimulation._point_outputs), NaN if not computed
+							grid => shape (len(factor1), len(factor2), ...)	/ lhs, sobol => shape (n_samples,)
+	'converged'	: ,		Boolean array, same shape, True if the point converged
+	'time'		: ,		Time spent on each point (in s), same shape
+
+"""
+
+
+def _solve_chunk(simulation, chunk):
+	# Solve a chunk of consecutive points in a worker process (must be a module function to be pickled)
+	# The new solutions of the warm start index are sent back to the main process (see WarmStartIndex.merge)
+	indexes, data_list = zip(*chunk)
+	points = list(simulation.iter_points(list(data_list)))
+	for index, point in zip(indexes, points):
+		point.index = index
+	return points, simulation.warm_start.new_entries if simulation.warm_start is not None else []
+
+
+class DesignOfExperiments:
+	def __init__(self, base_data, factors,					# values to be set
+			method		= 'grid',							# default values
+			n_samples	= None,								# default values
+			seed		= None,								# default values
+			workers		= 1,								# default values
+			first_initial_guess = [370, 250, 330, 290],		# default values
+			criteria_1	= 1e-3,								# default values
+			criteria_2	= 1e-6,								# default values
+			store		= None,								# default values
+			warm_start	= None,								# default values
+			):
+
+		if method not in ('grid', 'lhs', 'sobol'):
+			raise ValueError(f"Unknown method '{method}', use 'grid', 'lhs' or 'sobol'")
+		if method != 'grid' and not n_samples:
+			raise ValueError(f"n_samples is required for the method '{method}'")
+		for name in factors:
+			if name not in base_data:
+				raise KeyError(f"'{name}' is not an input of the heat pump model (see ExcelToPython.get_data)")
+
+		self.base_data	= base_data
+		self.factors	= factors
+		self.method		= method
+		self.n_samples	= n_samples
+		self.seed		= seed
+		self.workers	= workers
+
+		# The points are solved by the one fluid simulation (see Simulation.py)
+		self.simulation = OneFluidSimulation(None, self.names[0],
+			first_initial_guess=first_initial_guess, verif=False, criteria_1=criteria_1, criteria_2=criteria_2, store=store, warm_start=warm_start)
+
+		self._unit_samples = self._get_unit_samples() if method != 'grid' else None
+
+
+	@property
+	def names(self):
+		return list(self.factors)
+
+
+	@property
+	def shape(self):
+		if self.method == 'grid':
+			return tuple(len(values) for values in self.factors.values())
+		return (self.n_samples,)
+
+
+	def _get_unit_samples(self):
+		# Samples in [0, 1]^d for the Latin hypercube and Sobol methods
+		d = len(self.factors)
+		if self.method == 'lhs':
+			sampler = qmc.LatinHypercube(d=d, seed=self.seed)
+		else:
+			sampler = qmc.Sobol(d=d, scramble=True, seed=self.seed)
+		return sampler.random(self.n_samples)
+
+
+	def get_sample(self, index):
+		# Values of the factors for the point n°index
+		if self.method == 'grid':
+			multi_index = np.unravel_index(index, self.shape)
+			return [values[i] for values, i in zip(self.factors.values(), multi_index)]
+
+		lows, highs = zip(*self.factors.values())
+		return list(qmc.scale(self._unit_samples[index:index+1], lows, highs)[0])
+
+
+	def get_data(self, index):
+		# Data of the point n°index, in the same format as ExcelToPython.get_data
+		data = dict(self.base_data)
+		for name, value in zip(self.names, self.get_sample(index)):
+			data[name] = value if isinstance(value, str) else float(value)
+		return data
+
+
+	def _schedule(self):
+		# Order in which the points are solved, near neighbours are solved consecutively
+
+		if self.method == 'grid':
+			# Serpentine path: an axis is reversed when the path on the previous axes is at an odd position
+			order = []
+			for visit in np.ndindex(*self.shape):
+				index = list(visit)
+				for j in range(1, len(index)):
+					if np.ravel_multi_index(visit[:j], self.shape[:j]) % 2:
+						index[j] = self.shape[j] - 1 - index[j]
+				order.append(int(np.ravel_multi_index(index, self.shape)))
+			return order
+
+		# Nearest neighbour path in the unit hypercube
+		remaining = np.ones(self.n_samples, dtype=bool)
+		order = [0]
+		remaining[0] = False
+		for _ in range(self.n_samples - 1):
+			distances = np.sum((self._unit_samples - self._unit_samples[order[-1]]) ** 2, axis=1)
+			distances[~remaining] = np.inf
+			order.append(int(np.argmin(distances)))
+			remaining[order[-1]] = False
+		return order
+
+
+	def iter_points(self):
+		# Solve all the points and yield each PointResult (see PointResult.py) when it is available
+		# point.index is the index of the point in the design (see get_sample)
+
+		order = self._schedule()
+
+		if self.workers <= 1:
+			points = self.simulation.iter_points([self.get_data(index) for index in order])
+			for index, point in zip(order, points):
+				point.index = index
+				yield point
+			return
+
+		# Contiguous chunks of the path (a few per worker, to get the results progressively)
+		chunks = np.array_split(np.arange(len(order)), min(4 * self.workers, len(order)))
+
+		with ProcessPoolExecutor(max_workers=self.workers) as executor:
+			futures = [
+				executor.submit(_solve_chunk, self.simulation, [(order[k], self.get_data(order[k])) for k in chunk])
+				for chunk in chunks
+				]
+			for future in as_completed(futures):
+				points, entries = future.result()
+				self.simulation.warm_start.merge(entries) if entries else None
+				yield from points
+
+
+	def run(self):
+		# Solve all the points and gather the outputs in N-dimensional arrays
+
+		results = {
+			'factors'	: {},
+			'outputs'	: {},
+			'converged'	: np.zeros(self.shape, dtype=bool),
+			'time'		: np.zeros(self.shape),
+			}
+
+		if self.method == 'grid':
+			results['factors'] = {name: np.array(values) for name, values in self.factors.items()}
+		else:
+			samples = np.array([self.get_sample(index) for index in range(self.n_samples)])
+			results['factors'] = {name: samples[:, j] for j, name in enumerate(self.names)}
+
+		errors = 0
+		for point in self.iter_points():
+			position = np.unravel_index(point.index, self.shape)
+			results['time'][position] = point.time
+
+			if not point.converged:
+				errors += 1
+				continue
+
+			results['converged'][position] = True
+			for name, value in point.outputs.items():
+				if name not in results['outputs']:
+					results['outputs'][name] = np.full(self.shape, np.nan)
+				results['outputs'][name][position] = value
+
+		print(f'Non computed points: {errors} / {int(np.prod(self.shape))}\n') if errors else None
+
+		return results
@@ -0,0 +1,252 @@
+from Model_HTHP.__init__		import *
+from Model_HTHP.HeatPump		import *
+from Model_HTHP.PreComputation	import *
+from Model_HTHP.PostComputation	import *
+
+
+"""
+The class finds the design of the heat pump (V, ω, UA_cd, UA_ev) which maximizes the COP or minimizes a cost proxy,
+instead of sweeping the design variables and reading the best value on the graphs.
+
+Inputs:
+	'base_data'	: ,		Data of one column (see ExcelToPython.get_data), used for all the fixed inputs
+	'variables'	: ,		{name: (low, high), ...}, design variables among 'V', 'ω', 'UA_cd', 'UA_ev' (units of the Excel file)
+	'objective'	: ,		'COP'	=> maximize the COP
+						'cost'	=> minimize Σ weight * (value - low) / (high - low) over the design variables (cost_weights)
+	'T_co_min'	: ,		Constraint T_co >= T_co_min (°C)
+	'P_cd_max'	: ,		Constraint P_cd <= P_cd_max (Pa)
+	'P_ev_min'	: ,		Constraint P_ev >= P_ev_min (Pa)
+
+Gradients (implicit differentiation):
+	At a converged state x = [T_2, T_3, T_cd, T_ev] of the design p, F(x, p) = 0 (see HeatPump._equations)
+	=> dx/dp = - (∂F/∂x)^-1 ∂F/∂p
+	=> dg/dp = ∂g/∂x dx/dp + ∂g/∂p		for g = COP, T_co, P_cd, P_ev
+	The partial derivatives are central differences of the residuals and of g at the converged state:
+	no re-solve of the system is needed for the gradient (one solve per design).
+
+Optimiser:
+	SLSQP (scipy.optimize.minimize) on the design variables scaled in [0, 1]
+	Each solve starts from the last converged state (warm start), the first initial guess is only used if it diverges.
+
+"""
+
+
+class DesignOptimisation:
+	names = ['V', 'ω', 'UA_cd', 'UA_ev']
+
+
+	def __init__(self, base_data, variables,				# values to be set
+			objective	= 'COP',							# default values
+			T_co_min	= None,								# default values (°C)
+			P_cd_max	= None,								# default values (Pa)
+			P_ev_min	= None,								# default values (Pa)
+			cost_weights= None,								# default values
+			first_initial_guess = [370, 250, 330, 290],		# default values
+			criteria_1	= 1e-3,								# default values
+			criteria_2	= 1e-6,								# default values
+			):
+
+		if objective not in ('COP', 'cost'):
+			raise ValueError(f"Unknown objective '{objective}', use 'COP' or 'cost'")
+		for name in variables:
+			if name not in self.names:
+				raise KeyError(f"'{name}' is not a design variable, use {self.names}")
+
+		self.base_data	= base_data
+		self.variables	= {name: (float(low), float(high)) for name, (low, high) in variables.items()}
+		self.objective	= objective
+		self.T_co_min	= T_co_min
+		self.P_cd_max	= P_cd_max
+		self.P_ev_min	= P_ev_min
+		self.cost_weights = cost_weights or {name: 1 for name in variables}
+		self.first_initial_guess = first_initial_guess
+		self.criteria_1	= criteria_1
+		self.criteria_2	= criteria_2
+
+		self.last_u			= None	# last converged design
+		self.last_evaluation= None	# last converged design, outputs and gradients
+		self.penalty		= 100	# penalty of the designs where the model diverged (see _objective)
+		self.last_solution	= None	# last converged state (warm start)
+		self.n_solves		= 0
+		self.history		= []	# design and outputs of each evaluation
+		self._cache			= {}	# scaled design => outputs and gradients
+
+
+	def get_data(self, u):
+		# Data of the design u (design variables scaled in [0, 1])
+		data = dict(self.base_data)
+		for (name, (low, high)), value in zip(self.variables.items(), u):
+			data[name] = low + (high - low) * float(value)
+		return data
+
+
+	def _check_residuals(self, residuals):
+		# Same convergence criteria as the simulations (see Simulation.py)
+		return max(abs(r) for r in residuals) > self.criteria_1 or abs(residuals[-1]) > self.criteria_2
+
+
+	def _solve_from(self, inputs, initial_guesses):
+		heat_pump_model = HeatPump(inputs)
+		for initial_guess in initial_guesses:
+			if initial_guess is None:
+				continue
+			self.n_solves += 1
+			solution, residuals = heat_pump_model.solve_v2(initial_guess)
+			if not self._check_residuals(residuals):
+				return solution
+		return None
+
+
+	def _solve(self, u):
+		# Solve the heat pump model for the design u, from the last converged state first
+		inputs = PreComputation(self.get_data(u)).format_inputs()
+		solution = self._solve_from(inputs, (self.last_solution, self.first_initial_guess))
+
+		# Continuation: go from the last converged design to u in small steps, each one starting from the previous state
+		if solution is None and self.last_u is not None:
+			solution = self.last_solution
+			for t in np.linspace(0, 1, 9)[1:]:
+				step_inputs = PreComputation(self.get_data(self.last_u + t * (u - self.last_u))).format_inputs()
+				solution = self._solve_from(step_inputs, (solution,))
+				if solution is None:
+					break
+
+		if solution is None:
+			raise Exception('Solutions Divergence')
+
+		self.last_u, self.last_solution = np.array(u, dtype=float), solution
+		return inputs, solution
+
+
+	def _outputs(self, inputs, x):
+		# Functions g of the optimisation at the state x (see PostComputation)
+		results = PostComputation(inputs, x)
+		return np.array([results.COP, results.ΔT_cd, results.P_cd, results.P_ev])
+
+
+	def _evaluate(self, u):
+		# Outputs g = [COP, T_co, P_cd, P_ev] at the design u, their gradients dg/du (implicit differentiation)
+		# and True if the model diverged for this design
+
+		key = tuple(np.round(u, 12))
+		if key in self._cache:
+			return self._cache[key]
+
+		try:
+			inputs, x = self._solve(u)
+		except Exception:
+			if self.last_evaluation is None:
+				raise
+			# The model diverged for this design: linear extrapolation from the last converged design,
+			# the objective is penalized (see _objective) so that the line search of the optimiser comes back
+			u_last, g_last, gradient_last = self.last_evaluation
+			g = g_last + gradient_last @ (np.array(u) - u_last)
+			self._cache[key] = (g, gradient_last, True)
+			return self._cache[key]
+
+		g		= self._outputs(inputs, x)
+		residual= lambda inputs, x: np.array(HeatPump(inputs)._equations(x))
+
+		# ∂F/∂x and ∂g/∂x: central differences at the converged state
+		F_x = np.zeros((len(x), len(x)))
+		g_x = np.zeros((len(g), len(x)))
+		for j in range(len(x)):
+			step = 1e-6 * abs(x[j])
+			x_plus, x_minus = x.copy(), x.copy()
+			x_plus[j] += step
+			x_minus[j] -= step
+			F_x[:, j] = (residual(inputs, x_plus) - residual(inputs, x_minus)) / (2 * step)
+			g_x[:, j] = (self._outputs(inputs, x_plus) - self._outputs(inputs, x_minus)) / (2 * step)
+
+		# ∂F/∂u and ∂g/∂u: central differences at the converged state (the design changes the inputs of the model)
+		F_u = np.zeros((len(x), len(u)))
+		g_u = np.zeros((len(g), len(u)))
+		for j in range(len(u)):
+			step = 1e-6
+			u_plus, u_minus = np.array(u, dtype=float), np.array(u, dtype=float)
+			u_plus[j] += step
+			u_minus[j] -= step
+			inputs_plus	 = PreComputation(self.get_data(u_plus)).format_inputs()
+			inputs_minus = PreComputation(self.get_data(u_minus)).format_inputs()
+			F_u[:, j] = (residual(inputs_plus, x) - residual(inputs_minus, x)) / (2 * step)
+			g_u[:, j] = (self._outputs(inputs_plus, x) - self._outputs(inputs_minus, x)) / (2 * step)
+
+		# Implicit differentiation: dx/du = - (∂F/∂x)^-1 ∂F/∂u
+		x_u = -np.linalg.solve(F_x, F_u)
+		gradient = g_x @ x_u + g_u
+
+		self._cache[key] = (g, gradient, False)
+		self.last_evaluation = (np.array(u, dtype=float), g, gradient)
+		self.history.append({**{name: self.get_data(u)[name] for name in self.variables},
+							 'COP': g[0], 'T_co': g[1], 'P_cd': g[2], 'P_ev': g[3]})
+		return self._cache[key]
+
+
+	def _objective(self, u):
+		g, gradient, failed = self._evaluate(u)
+		if self.objective == 'COP':
+			value, jacobian = -g[0], -gradient[0]
+		else:
+			jacobian = np.array([self.cost_weights.get(name, 0) for name in self.variables], dtype=float)
+			value = float(jacobian @ u)
+
+		# Penalty for a design where the model diverged (distance to the last converged design)
+		if failed:
+			distance = np.array(u) - self.last_evaluation[0]
+			value	 = value + self.penalty * float(distance @ distance)
+			jacobian = jacobian + 2 * self.penalty * distance
+		return value, jacobian
+
+
+	def _constraints(self):
+		# Constraints >= 0 (scaled by their limits)
+		constraints = []
+		if self.T_co_min is not None:
+			constraints.append({'type': 'ineq',
+				'fun': lambda u: (self._evaluate(u)[0][1] - self.T_co_min) / 10,
+				'jac': lambda u: self._evaluate(u)[1][1] / 10})
+		if self.P_cd_max is not None:
+			constraints.append({'type': 'ineq',
+				'fun': lambda u: 1 - self._evaluate(u)[0][2] / self.P_cd_max,
+				'jac': lambda u: -self._evaluate(u)[1][2] / self.P_cd_max})
+		if self.P_ev_min is not None:
+			constraints.append({'type': 'ineq',
+				'fun': lambda u: self._evaluate(u)[0][3] / self.P_ev_min - 1,
+				'jac': lambda u: self._evaluate(u)[1][3] / self.P_ev_min})
+		return constraints
+
+
+	def run(self, initial=None, maxiter=50, display=True):
+		# Optimal design, starting from initial ({name: value}, else the design of base_data)
+
+		initial = initial or {name: self.base_data[name] for name in self.variables}
+		u_0 = np.clip([(initial[name] - low) / (high - low) for name, (low, high) in self.variables.items()], 0, 1)
+
+		start = time.perf_counter()
+		try:
+			result	= minimize(self._objective, u_0, jac=True, method='SLSQP', bounds=[(0, 1)] * len(u_0),
+							   constraints=self._constraints(), options={'maxiter': maxiter})
+			failed	= self._evaluate(result.x)[2]
+			u		= self.last_evaluation[0] if failed else result.x
+			success	= result.success and not failed
+			message	= 'Solutions Divergence at the optimum' if failed else result.message
+		except Exception as e:
+			# The model diverged before any converged design (e.g. the initial design)
+			if self.last_evaluation is None:
+				raise
+			u		= self.last_evaluation[0]
+			success	= False
+			message	= str(e) or type(e).__name__
+
+		g		= self._evaluate(u)[0]
+		design	= {name: self.get_data(u)[name] for name in self.variables}
+		outputs	= {'COP': g[0], 'T_co': g[1], 'P_cd': g[2], 'P_ev': g[3]}
+
+		if display:
+			print(f"Optimisation ({self.objective}): {message}")
+			print(f"{self.n_solves} solves, {len(self.history)} designs, {time.perf_counter() - start:.1f} s")
+			for name, value in {**design, **outputs}.items():
+				print(f'	{name:<6} = {value:.4g}')
+
+		return {'success': success, 'message': message, 'design': design, 'outputs': outputs,
+				'n_solves': self.n_solves, 'history': self.history}
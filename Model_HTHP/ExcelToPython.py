@@ -1,97 +1,154 @@
 from Model_HTHP.__init__ import *
+from Model_HTHP.TextInputs	import *
+from openpyxl			import Workbook
+import itertools
 
 
 class ExcelToPython:
-	def __init__(self, input_file="Excel_Inputs/Inputs.xlsx"):
+	# Row of each input in the sheet 'inputs' (one column per operating point, from column D)
+	rows = {
+		'fluid'	: 3,
+		'V'		: 6,	'r'		: 7,	'n'		: 8,	'Cv'	: 9,	'ω'		: 11,
+		'fluid_c': 13,	'T_ci'	: 14,	'P_ci'	: 15,	'ṁ_c'	: 16,	'UA_cd'	: 17,
+		'fluid_e': 19,	'T_ei'	: 20,	'P_ei'	: 21,	'ṁ_e'	: 22,	'UA_ev'	: 23,
+		'ΔT_s'	: 26,
+		}
+	first_column	= 4		# Column D
+	last_column		= 500
+
+
+	def __init__(self, input_file="Excel_Inputs/Inputs.xlsx", sheet='inputs'):
 		# Load the original file
 		self.input_file		= input_file
-		self.output_file	= self._new_file_name()
-		# Create a new file
-		copyfile(self.input_file, self.output_file)
-		self.input_sheet	= load_workbook(self.output_file, data_only=True)['inputs']		# data_only=True else we get the formulas instead of the values
-		self.output_sheet	= load_workbook(self.output_file, data_only=True)['outputs']	# e.g., we want 20 not '=D6+10'
-
-
-	def _new_file_name(self):
+		self.sheet			= sheet						# sheet of the inputs (see get_scenarios)
+		self.output_file	= self._new_file_name()		# only created when the results are written (see _write_columns)
+
+		# Text input file (CSV, JSON or YAML, see TextInputs.py): no Excel file to read
+		self.text_data = TextInputs.read(self.input_file) if self.input_file.lower().endswith(TextInputs.extensions) else None
+		if self.text_data is not None:
+			return
+
+		# One read of the whole block of inputs (read_only: the cells are streamed, not loaded one by one)
+		workbook = load_workbook(self.input_file, read_only=True, data_only=True)	# data_only=True else we get the formulas instead of the values
+		try:																		# e.g., we want 20 not '=D6+10'
+			block = workbook[self.sheet].iter_rows(min_row=1, max_row=max(self.rows.values()),
+				min_col=self.first_column, max_col=self.last_column, values_only=True)
+			self.input_columns = list(zip(*block))	# rows => columns (iter_cols is not available in read_only mode)
+		finally:
+			workbook.close()
+
+
+	@staticmethod
+	def _new_file_name(prefix='Outputs'):
 		current_date = datetime.now()
-		return f"Excel_Outputs/Outputs_{current_date.strftime('%Y-%m-%d_%H-%M-%S')}.xlsx"
+		return f"Excel_Outputs/{prefix}_{current_date.strftime('%Y-%m-%d_%H-%M-%S')}.xlsx"
 
 
-	def _get_excel_column_name(self, n):
-		column_name = ""
-		while n > 0:
-			n, remainder = divmod(n - 1, 26)
-			column_name = chr(65 + remainder) + column_name
-		return column_name
+	@classmethod
+	def get_scenarios(cls, path):
+		"""
+		List of the scenarios [(name, input_file, sheet), ...] of a workbook or of a directory of input files
+
+		Workbook	=> one scenario per sheet whose name starts with 'inputs' ('inputs_T4a', 'inputs_T4b', ...),
+					   named as the sheet without 'inputs_' (or as the file if there is only the sheet 'inputs')
+		Directory	=> the scenarios of each Excel or text input file (see TextInputs.py), named as the files
+		"""
+		if os.path.isdir(path):
+			scenarios = []
+			for file_name in sorted(os.listdir(path)):
+				if file_name.startswith('~$') or not file_name.lower().endswith(('.xlsx',) + TextInputs.extensions):
+					continue	# lock files of Excel and other files
+				stem = os.path.splitext(file_name)[0]
+				for name, input_file, sheet in cls.get_scenarios(os.path.join(path, file_name)):
+					name = stem if name == stem else f'{stem}_{name}'
+					name = file_name if name in [scenario[0] for scenario in scenarios] else name	# e.g. Inputs_T4a.xlsx and .csv
+					scenarios.append((name, input_file, sheet))
+			return scenarios
+
+		stem = os.path.splitext(os.path.basename(path))[0]
+		if path.lower().endswith(TextInputs.extensions):
+			return [(stem, path, None)]
+
+		workbook = load_workbook(path, read_only=True)
+		try:
+			sheets = [sheet for sheet in workbook.sheetnames if sheet.lower().startswith('inputs')]
+		finally:
+			workbook.close()
+		if sheets == ['inputs']:
+			return [(stem, path, 'inputs')]
+		return [(sheet[len('inputs'):].strip(' _-') or stem, path, sheet) for sheet in sheets]
 
 
 	def get_data(self):
-		# Starting data column index
-		column_nb	 = 4  # Column D
-		data_columns = [] # List with all the data of each column
-
-		while True:
-			column = self._get_excel_column_name(column_nb)
-			fluid_value = self.input_sheet[f"{column}3"].value
+		# List with all the data of each column, until the first column without fluid
+		if self.text_data is not None:
+			return [dict(data) for data in self.text_data]
 
-			# Break if no more data in the column
-			if fluid_value is None or column_nb>500:
+		data_columns = []
+		for values in self.input_columns:
+			if values[self.rows['fluid'] - 1] is None:
 				break
-
-			# Read data from the current column
-			data = {
-				'fluid':	self.input_sheet[f"{column}3"].value,
-				'V':		self.input_sheet[f"{column}6"].value,
-				'r':		self.input_sheet[f"{column}7"].value,
-				'n':		self.input_sheet[f"{column}8"].value,
-				'Cv':		self.input_sheet[f"{column}9"].value,
-				'ω':		self.input_sheet[f"{column}11"].value,
-				'ω':		self.input_sheet[f"{column}11"].value,
-				'fluid_c':	self.input_sheet[f"{column}13"].value,
-				'T_ci':		self.input_sheet[f"{column}14"].value,
-				'P_ci':		self.input_sheet[f"{column}15"].value,
-				'ṁ_c':		self.input_sheet[f"{column}16"].value,
-				'UA_cd':	self.input_sheet[f"{column}17"].value,
-				'fluid_e':	self.input_sheet[f"{column}19"].value,
-				'T_ei':		self.input_sheet[f"{column}20"].value,
-				'P_ei':		self.input_sheet[f"{column}21"].value,
-				'ṁ_e':		self.input_sheet[f"{column}22"].value,
-				'UA_ev':	self.input_sheet[f"{column}23"].value,
-				'ΔT_s':		self.input_sheet[f"{column}26"].value,
-			}
-
-			# Increment
-			data_columns.append(data)
-			column_nb += 1
+			data_columns.append({name: values[row - 1] for name, row in self.rows.items()})
 
 		return data_columns
 
 
-	def write_results(self, **kwargs):
+	def _write_columns(self, columns):
 		"""
-		Take the values of each list (listed in the kwargs) and put in a excel column
+		Write the columns [(name, list_values), ...] in the sheet 'outputs' of the new file (output_file)
+
+		The workbook is in write_only mode: the lines are streamed to the file when they are appended,
+		so the memory used does not depend on the number of cells (fluids x outputs x points).
+		The sheet 'inputs' of the new file contains the values of the input file (as before, without the formulas).
 		"""
-		column_nb = 1  # start at column n°1 (A)
+		workbook = Workbook(write_only=True)
+
+		# Copy of the inputs, line by line
+		sheet = workbook.create_sheet('inputs')
+		if self.text_data is not None:
+			# Text input file: one line per input, one column per operating point (as in the Excel input files)
+			for name in dict.fromkeys(name for data in self.text_data for name in data):
+				sheet.append([name] + [data.get(name) for data in self.text_data])
+		else:
+			source = load_workbook(self.input_file, read_only=True, data_only=True)
+			try:
+				for row in source[self.sheet].iter_rows(values_only=True):
+					sheet.append(row)
+			finally:
+				source.close()
+
+		self._append_columns(workbook.create_sheet('outputs'), columns)
+
+		workbook.save(self.output_file)
 
-		for var_name, list_result in kwargs.items():
+		# Print that the data are written in the file
+		print(f'\n\n\nThe results data are written ine the file:\n{self.output_file}\n\n\n')
 
-			# get the name of the column (from number to letter)
-			column = self._get_excel_column_name(column_nb)
-			# start at line 1, first line is the name of the list
-			line = 1
-			self.output_sheet[f"{column}{line}"] = var_name
 
-			# take each value of the list an put it in the coresponding excel cell
-			for result in list_result:
-				line += 1
-				self.output_sheet[f"{column}{line}"] = result
-			column_nb += 1
-		
-		# write the list values in the excel
-		self.output_sheet.parent.save(self.output_file)
+	@staticmethod
+	def _append_columns(sheet, columns):
+		# First line = name of each column, then one line per value (empty cell at the end of the shorter lists)
+		sheet.append([name for name, _ in columns])
+		for row in itertools.zip_longest(*(list_values for _, list_values in columns)):
+			sheet.append(row)
 
-		# Print that the data are written in the file
-		print(f'\n\n\nThe results data are written ine the file:\n{self.output_file}\n\n\n')
+
+	@staticmethod
+	def _fluid_columns(list_results):
+		# One block of columns per fluid, the column 'fluid_...' contains the name of the fluid
+		columns = []
+		for results in list_results:
+			for name, list_values in results.items():
+				list_values = [list_values] if isinstance(list_values, str) else list_values
+				columns.append((name + '_' + results['fluid'], list_values))
+		return columns
+
+
+	def write_results(self, **kwargs):
+		"""
+		Take the values of each list (listed in the kwargs) and put in a excel column
+		"""
+		self._write_columns(list(kwargs.items()))
 
 
 	def write_fluid_results(self, list_results):
@@ -105,26 +162,4 @@ class ExcelToPython:
 		]
 
 		"""
-		column_nb = 1  # start at column n°1 (A)
-
-		for results in list_results:
-			for name, list_values in results.items():
-
-				# get the name of the column (from number to letter)
-				column = self._get_excel_column_name(column_nb)
-
-				# start at line 1, first line is the name of the list
-				line = 1
-				self.output_sheet[f"{column}{line}"] = name + '_' + results['fluid']
-
-				# take each value of the list an put it in the coresponding excel cell
-				for value in list_values:
-					line += 1
-					self.output_sheet[f"{column}{line}"] = value
-				column_nb += 1
-		
-		# write the list values in the excel
-		self.output_sheet.parent.save(self.output_file)
-
-		# Print that the data are written in the file
-		print(f'\n\n\nThe results data are written ine the file:\n{self.output_file}\n\n\n')
\ No newline at end of file
+		self._write_columns(self._fluid_columns(list_results))
@@ -0,0 +1,124 @@
+from Model_HTHP.__init__ import *
+from Model_HTHP.PropertyTable import *
+
+
+"""
+The class ranks the working fluids with a cheap ideal cycle, before running the full heat pump model.
+
+For a few representative columns of the input data (first, middle and last by default):
+	- T_ev = T_ei - pinch						Evaporation temperature
+	- T_cd = (T_ci + T_supply) / 2 + pinch		Condensation temperature, above the mean temperature of the external fluid
+												(a large part of the heat is given by the desuperheating, see PostComputation.ΔT_cd)
+												T_supply = T_ci if not given
+	- 1 => 2 isentropic compression from (P_ev, T_ev + ΔT_s)
+	- 3 saturated liquid at T_cd, 3 => 4 isenthalpic expansion
+
+Criteria (averaged over the columns):
+	'COP'		: ,		(h_2 - h_3) / (h_2 - h_1)					=> to maximize
+	'VHC'		: ,		Volumetric heating capacity ρ_1 (h_2 - h_3)	=> to maximize (smaller compressor)
+	'ratio'		: ,		Pressure ratio P_cd / P_ev					=> to minimize
+	'margin'	: ,		Critical temperature margin T_crit - T_cd	=> to maximize
+
+Each criterion gives a rank between 0 (worst) and 1 (best), the score is the weighted mean of the ranks.
+A fluid is not feasible if T_cd is above its critical temperature, if the evaporator would not absorb any heat (COP <= 1)
+or if CoolProp fails.
+
+"""
+
+
+class FluidScreening:
+	def __init__(self, data_list, list_fluid,			# values to be set
+			n_columns	= 3,							# default values
+			T_supply	= None,							# default values (°C)
+			pinch		= 5,							# default values (K)
+			weights		= {'COP': 0.4, 'VHC': 0.3, 'ratio': 0.15, 'margin': 0.15},	# default values
+			):
+		self.list_fluid	= list_fluid
+		self.T_supply	= T_supply
+		self.pinch		= pinch
+		self.weights	= weights
+
+		# Representative columns, evenly spread in the input data
+		indexes = np.unique(np.linspace(0, len(data_list) - 1, min(n_columns, len(data_list))).round().astype(int))
+		self.data_list = [data_list[i] for i in indexes]
+
+
+	def _get_prop(self, *args):
+		# Safely call PropsSI from CoolProp and handle errors.
+		try:
+			return PropertyTable.PropsSI(*args)	# tables of the saturation properties for a mixture
+		except Exception as e:
+			return float('nan')
+
+
+	def _ideal_cycle(self, data, fluid):
+		# Criteria of the ideal cycle for one column of the input data
+		T_ev = data['T_ei'] - self.pinch + 273.15
+		T_supply = self.T_supply if self.T_supply is not None else data['T_ci']
+		T_cd = (data['T_ci'] + T_supply) / 2 + self.pinch + 273.15
+		T_1	 = T_ev + data['ΔT_s']
+
+		P_ev = self._get_prop('P', 'T', T_ev, 'Q', 1, fluid)
+		P_cd = self._get_prop('P', 'T', T_cd, 'Q', 0, fluid)
+
+		h_1	 = self._get_prop('H', 'P', P_ev, 'T', T_1, fluid)
+		s_1	 = self._get_prop('S', 'P', P_ev, 'T', T_1, fluid)
+		ρ_1	 = self._get_prop('D', 'P', P_ev, 'T', T_1, fluid)
+		h_2	 = self._get_prop('H', 'P', P_cd, 'S', s_1, fluid)
+		h_3	 = self._get_prop('H', 'T', T_cd, 'Q', 0, fluid)
+
+		return {
+			'COP'	: (h_2 - h_3) / (h_2 - h_1),
+			'VHC'	: ρ_1 * (h_2 - h_3),
+			'ratio'	: P_cd / P_ev,
+			'margin': self._get_prop('Tcrit', fluid) - T_cd,
+		}
+
+
+	def _get_criteria(self, fluid):
+		# Mean of the criteria over the representative columns
+		cycles = [self._ideal_cycle(data, fluid) for data in self.data_list]
+		criteria = {name: float(np.mean([cycle[name] for cycle in cycles])) for name in self.weights}
+		criteria['fluid']	 = fluid
+		criteria['feasible'] = all(np.isfinite(criteria[name]) for name in self.weights) and criteria['margin'] > 0 and criteria['COP'] > 1
+		return criteria
+
+
+	def _get_rank(self, values, maximize):
+		# Rank between 0 (worst) and 1 (best)
+		values = np.array(values) if maximize else -np.array(values)
+		if len(values) < 2:
+			return np.ones(len(values))
+		return np.argsort(np.argsort(values)) / (len(values) - 1)
+
+
+	def get_ranking(self):
+		# List of the criteria of each fluid, sorted from the best to the worst (not feasible fluids at the end)
+
+		list_criteria	= [self._get_criteria(fluid) for fluid in self.list_fluid]
+		feasible		= [criteria for criteria in list_criteria if criteria['feasible']]
+		not_feasible	= [criteria for criteria in list_criteria if not criteria['feasible']]
+
+		score = np.zeros(len(feasible))
+		for name, weight in self.weights.items():
+			score += weight * self._get_rank([criteria[name] for criteria in feasible], maximize=(name != 'ratio'))
+		for criteria, value in zip(feasible, score):
+			criteria['score'] = float(value) / sum(self.weights.values())
+		for criteria in not_feasible:
+			criteria['score'] = float('nan')
+
+		return sorted(feasible, key=lambda criteria: -criteria['score']) + not_feasible
+
+
+	def select(self, top_k=None, display=True):
+		# Names of the top_k best fluids (all the feasible ones if top_k is None)
+
+		ranking = self.get_ranking()
+
+		if display:
+			print(f"{'Fluid':<12}{'Score':>8}{'COP':>8}{'VHC (kJ/m³)':>14}{'P_cd/P_ev':>11}{'T_crit - T_cd':>15}")
+			for criteria in ranking:
+				print(f"{criteria['fluid']:<12}{criteria['score']:>8.2f}{criteria['COP']:>8.2f}{criteria['VHC']/1000:>14.0f}{criteria['ratio']:>11.2f}{criteria['margin']:>15.1f}")
+
+		feasible = [criteria['fluid'] for criteria in ranking if criteria['feasible']]
+		return feasible[:top_k] if top_k else feasible
@@ -1,4 +1,5 @@
 from Model_HTHP.__init__ import *
+from Model_HTHP.PropertyTable import *
 
 
 """
@@ -8,7 +9,7 @@ The class compute the system of equations explained in the the article:
 		T. B. HERBAS, E. C. BERLINCK, C. A. T URIU, R. P. MARQUES AND J. A. R. PARISE
 
 inputs = {
-	'fluid'	: ,		Refrigirants
+	'fluid'	: ,		Refrigirants (pure fluid or zeotropic mixture, see PropertyTable.py)
 	'ΔTs'	: ,		Superheating
 	'T_ei'	: ,		Temp of the external fluid into the evaporator
 	'T_ci'	: ,		Temp of the external fluid into the condensor
@@ -23,13 +24,25 @@ inputs = {
 	'Cv'	: ,		volumetric coefficient
 	'V'		: ,		swept volume
 	'ω'		: ,		rotation speed
+	'condenser'	: ,	(optional) 'zones' => three-zone condenser, see below
+	'UA_cd'	: ,		(optional) Overall conductance of the condensor, for the three-zone condenser
 }
 
+Three-zone condenser (inputs['condenser'] = 'zones'):
+	The constant effectiveness ε_cd ignores the desuperheating zone, which is large at the high T_2 of some fluids.
+	The refrigerant is cooled from T_2 to T_cd (desuperheating), condensed at T_cd, then cooled to T_3 (subcooling),
+	against the external fluid in counterflow (T_ci => subcooling => condensing => desuperheating => T_co):
+		- the temperatures of the external fluid between the zones are given by the energy balance of each zone
+		- UA needed by each zone = Q / LMTD (= ṁ_c cp_c ln((T_cd - T_in) / (T_cd - T_out)) for the condensing zone)
+	=> eq3 (energy balance with ε_cd) is replaced by: UA_desuperheating + UA_condensing + UA_subcooling - UA_cd
+	The saturation properties are taken from the tables of the fluid (see PropertyTable.py) instead of CoolProp.
+
 """
 
 
 class HeatPump:
-	def __init__(self, inputs):
+	def __init__(self, inputs, warm_start=None):
+		self.inputs	= inputs
 		self.fluid 	= inputs['fluid']
 		self.ΔT_s	= inputs['ΔTs']
 		self.T_ei	= inputs['T_ei']
@@ -45,17 +58,36 @@ class HeatPump:
 		self.Cv		= inputs['Cv']
 		self.V		= inputs['V']
 		self.ω		= inputs['ω']
+		# Index of the past solutions (see WarmStartIndex.py)
+		self.warm_start = warm_start
+		# Three-zone condenser with the tables of the saturation properties (see above)
+		self.zones	= inputs.get('condenser') == 'zones'
+		self.UA_cd	= inputs.get('UA_cd')
+		# Tables of the saturation properties, always used for a mixture (T_cd = bubble and T_ev = dew temperatures)
+		self.mixture= '&' in self.fluid
+		self.table	= PropertyTable.get(self.fluid) if self.zones or self.mixture else None
 
 
 	def _get_prop(self, *args):
 		# Safely call PropsSI from CoolProp and handle errors.
 		try:
-			return PropsSI(*args)
+			return PropertyTable.PropsSI(*args)
 		except Exception as e:
 			# print(f"CoolProp error with arguments {args}: {e}")
 			return float('nan')
 
 
+	def _get_saturation(self, T, Q):
+		# Saturation pressure and enthalpies of the liquid and of the vapour at T
+		# T is the bubble temperature (Q=0) or the dew temperature (Q=1), the same for a pure fluid
+		if self.table is not None:
+			return self.table(T, Q)
+		P	= self._get_prop('P', 'T', T, 'Q', Q, self.fluid)
+		h_l	= self._get_prop('H', 'T', T, 'Q', 0, self.fluid)
+		h_v	= self._get_prop('H', 'T', T, 'Q', 1, self.fluid)
+		return P, h_l, h_v
+
+
 	def _get_ṁ_f(self, P_cd, P_ev, ν_1):
 		η_v = self.Cv * (1 + self.r * (1 - (P_cd / P_ev) ** (1 / self.n)))
 		return (self.V * self.ω * η_v) / (ν_1 * 2 * math.pi)
@@ -87,22 +119,51 @@ class HeatPump:
 		return x4
 
 
+	def _get_zones(self, ṁ_f, h_2, h_3, h_l_cd, h_v_cd):
+		# Heat of the desuperheating, condensing and subcooling zones (W)
+		# (no desuperheating if T_2 < T_cd and no subcooling if T_3 > T_cd, which happens during the iterations)
+		Q_ds = ṁ_f * max(h_2 - h_v_cd, 0)
+		Q_cn = ṁ_f * (h_v_cd - h_l_cd)
+		Q_sc = ṁ_f * max(h_l_cd - h_3, 0)
+		# Temperatures of the external fluid after the subcooling, condensing and desuperheating zones
+		C_c  = self.ṁ_c * self.cp_c
+		T_w1 = self.T_ci + Q_sc / C_c
+		T_w2 = T_w1 + Q_cn / C_c
+		T_co = T_w2 + Q_ds / C_c
+		return (Q_ds, Q_cn, Q_sc), (T_w1, T_w2, T_co)
+
+
+	def _get_zones_UA(self, ṁ_f, T_2, T_3, T_cd, h_2, h_3, h_l_cd, h_v_cd):
+		# UA needed by the three zones of the condenser
+		(Q_ds, Q_cn, Q_sc), (T_w1, T_w2, T_co) = self._get_zones(ṁ_f, h_2, h_3, h_l_cd, h_v_cd)
+		# The condensation starts at the dew temperature (T_cd + glide for a mixture)
+		T_dw = self.table.T_dew(T_cd)
+
+		# Temperature differences below 0.5 K are replaced by δ² / (2δ - ΔT) (> 0, same value and slope at δ):
+		# a temperature cross gives a large UA, increasing linearly with the cross, instead of NaN
+		δ = 0.5
+		ΔT = lambda value: value if value >= δ else δ ** 2 / (2 * δ - value)
+
+		def LMTD(ΔT_a, ΔT_b):
+			return ΔT_a if abs(ΔT_a - ΔT_b) < 1e-9 else (ΔT_a - ΔT_b) / math.log(ΔT_a / ΔT_b)
+
+		UA_ds = Q_ds / LMTD(ΔT(T_2 - T_co), ΔT(T_dw - T_w2))
+		UA_cn = Q_cn / LMTD(ΔT(T_cd - T_w1), ΔT(T_dw - T_w2))
+		UA_sc = Q_sc / LMTD(ΔT(T_cd - T_w1), ΔT(T_3 - self.T_ci))
+		return UA_ds + UA_cn + UA_sc
+
+
 	def _equations(self, vars):
 		T_2, T_3, T_cd, T_ev = vars
 
-		# Pressure (Pa)
-		P_cd = self._get_prop('P', 'T', T_cd, 'Q', 0, self.fluid)
-		P_ev = self._get_prop('P', 'T', T_ev, 'Q', 0, self.fluid)
+		# Pressure (Pa) and saturated enthalpies (J/kg)
+		P_cd, h_l_cd, h_v_cd = self._get_saturation(T_cd, 0)
+		P_ev, h_l_ev, h_v_ev = self._get_saturation(T_ev, 1)
 		
 		# Specific values (m3/kg)
 		ν_1 = 1 / self._get_prop('D', 'P', P_ev, 'T', T_ev + self.ΔT_s, self.fluid)
 		ν_2 = 1 / self._get_prop('D', 'P', P_cd, 'T', T_2, self.fluid)
 		
-		# Saturated enthalpies (J/kg)
-		h_l_cd = self._get_prop('H', 'T', T_cd, 'Q', 0, self.fluid)
-		h_v_cd = self._get_prop('H', 'T', T_cd, 'Q', 1, self.fluid)
-		h_l_ev = self._get_prop('H', 'T', T_ev, 'Q', 0, self.fluid)
-		h_v_ev = self._get_prop('H', 'T', T_ev, 'Q', 1, self.fluid)
 		# Differences of enthalpies (J/kg)
 		h_lv_ev = h_v_ev - h_l_ev
 		h_lv_cd = h_v_cd - h_l_cd
@@ -114,18 +175,98 @@ class HeatPump:
 		# Enthalpies (J/kg)
 		h_1 = self._get_prop('H', 'P', P_ev, 'T', T_ev + self.ΔT_s, self.fluid)
 		h_2 = self._get_prop('H', 'P', P_cd, 'T', T_2, self.fluid)
-		h_3 = self._get_prop('H', 'T', T_3, 'Q', 0, self.fluid)
+		h_3 = self.table(T_3)[1] if self.table is not None else self._get_prop('H', 'T', T_3, 'Q', 0, self.fluid)
 		h_4 = h_3
 		
 		# System of equations
 		eq1 = (h_4 - h_l_ev) - h_lv_ev * (x4)
 		eq2 = ν_2 - ν_1 * ((P_ev / P_cd) ** (1 / self.n))
-		eq3 = ṁ_f * (h_2 - h_1) - self.ṁ_c * self.cp_c * self.ε_cd * (T_2 - self.T_ci) + self.ṁ_e * self.cp_e * self.ε_ev * (self.T_ei - T_ev)
+		if self.zones:
+			eq3 = self._get_zones_UA(ṁ_f, T_2, T_3, T_cd, h_2, h_3, h_l_cd, h_v_cd) - self.UA_cd
+		else:
+			eq3 = ṁ_f * (h_2 - h_1) - self.ṁ_c * self.cp_c * self.ε_cd * (T_2 - self.T_ci) + self.ṁ_e * self.cp_e * self.ε_ev * (self.T_ei - T_ev)
 		eq4 = ( T_3 - self._get_T_3(T_cd, P_cd, ṁ_f, h_lv_cd, T_2) ) + max(0, T_3-T_cd)
 
 		return [eq1, eq2, eq3, eq4]
 
 
+	def _get_target(self, target, T_2, T_3, T_cd, T_ev):
+		# Value of the target of the inverse design: 'T_co' (K), 'Q_cd' (W) or 'COP' (see PostComputation)
+		if target == 'T_co' and not self.zones:
+			return self.T_ci + self.ε_cd * (T_2 - self.T_ci)
+
+		P_cd = self._get_prop('P', 'T', T_cd, 'Q', 0, self.fluid)
+		P_ev = self._get_prop('P', 'T', T_ev, 'Q', 1, self.fluid)
+		h_1 = self._get_prop('H', 'P', P_ev, 'T', T_ev + self.ΔT_s, self.fluid)
+		h_2 = self._get_prop('H', 'P', P_cd, 'T', T_2, self.fluid)
+		h_3 = self._get_prop('H', 'T', T_3, 'Q', 0, self.fluid)
+
+		if target == 'COP':
+			return (h_2 - h_3) / (h_2 - h_1)
+		ν_1 = 1 / self._get_prop('D', 'P', P_ev, 'T', T_ev + self.ΔT_s, self.fluid)
+		Q_cd = self._get_ṁ_f(P_cd, P_ev, ν_1) * (h_2 - h_3)
+		return self.T_ci + Q_cd / (self.ṁ_c * self.cp_c) if target == 'T_co' else Q_cd
+
+
+	def _inverse_equations(self, vars, design, target, value, x_0):
+		T_2, T_3, T_cd, T_ev, z = vars
+
+		# Design variable scaled by its initial value (z close to 1, like the other unknowns relative to their scale)
+		setattr(self, design, z * x_0)
+		eq1, eq2, eq3, eq4 = self._equations([T_2, T_3, T_cd, T_ev])
+
+		# Extra equation: relative error on the target
+		eq5 = self._get_target(target, T_2, T_3, T_cd, T_ev) / value - 1
+
+		# eq4 stays the last residual (see the convergence criteria of the simulations)
+		return [eq1, eq2, eq3, eq5, eq4]
+
+
+	def solve_inverse(self, initial_guess, design, target, value):
+		# Inverse design: value of the design variable ('V' or 'ω', SI units) giving the target value
+		# ('T_co' in K, 'Q_cd' in W or 'COP') => the target is an extra equation, the design variable an extra unknown
+		if design not in ('V', 'ω'):
+			raise ValueError(f"Unknown design variable '{design}', use 'V' or 'ω'")
+		if target not in ('T_co', 'Q_cd', 'COP'):
+			raise ValueError(f"Unknown target '{target}', use 'T_co', 'Q_cd' or 'COP'")
+
+		x_0 = getattr(self, design)
+		x	= np.array(list(initial_guess) + [1], dtype=float)
+		args= (design, target, value, x_0)
+
+		# The equations have very different scales (J/kg, m3/kg, W, ∅, K): each one is divided by the norm
+		# of its row of the Jacobian at the initial guess (derivatives relative to the value of each unknown)
+		f_0 = np.array(self._inverse_equations(x, *args))
+		jacobian = np.zeros((len(x), len(x)))
+		for j in range(len(x)):
+			step = 1e-6 * max(abs(x[j]), 1)
+			dx = x.copy()
+			dx[j] += step
+			jacobian[:, j] = (np.array(self._inverse_equations(dx, *args)) - f_0) / step * abs(x[j])
+		norm	= np.linalg.norm(jacobian, axis=1)
+		weights	= 1 / np.where(np.isfinite(norm) & (norm > 0), norm, 1)
+
+		solution = fsolve(
+			lambda vars: np.array(self._inverse_equations(vars, *args)) * weights,
+			x,
+			maxfev=10000
+		)
+
+		# The residuals should be close to 0 (not scaled, see the convergence criteria of the simulations)
+		residuals = self._inverse_equations(solution, *args)
+
+		return solution[:4], solution[4] * x_0, residuals
+
+
+	def get_initial_guess(self, default):
+		# Solution of the nearest past operating point (see WarmStartIndex.py), else the default initial guess
+		if self.warm_start is not None:
+			initial_guess = self.warm_start.query(self.inputs)
+			if initial_guess is not None:
+				return initial_guess
+		return default
+
+
 	def solve(self, initial_guess, verif):
 		# fsolve from scipy to solve the 3 non-linear equations
 		solution = fsolve(
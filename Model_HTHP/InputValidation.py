@@ -0,0 +1,238 @@
+from Model_HTHP.__init__	import *
+import CoolProp.CoolProp	as CP
+import difflib
+import re
+
+
+"""
+The class checks all the operating points of a job before the heat pump model is solved,
+so that a wrong input file fails at once with one report, instead of points which do not converge after minutes.
+
+Inputs:
+	'data_list'	: ,		Data of each operating point (see ExcelToPython.get_data)
+	'list_fluid': ,		Refrigerants of SeveralFluidsSimulation (else the fluid of each point is checked)
+	'var_name'	: ,		Variable parameter of the simulation (must be an input of the points)
+
+Checks of each point (see schema):
+	errors		=> the point cannot be solved, nothing is solved (check raises a ValueError):
+					missing cell (None), text instead of a number, value out of its physical range,
+					fluid unknown by CoolProp (with the nearest names)
+	warnings	=> the point may be wrong or will not converge, the job is solved:
+					value out of the usual range (e.g. V in m³ instead of cm³, T in K instead of °C),
+					T_ci above the critical temperature of the refrigerant (no condensation),
+					cp of an external fluid not computable at the inlet (e.g. water below 0.01 °C)
+
+Report: one line per problem, with the points concerned (n°1 = first column of the Excel file) and their values
+
+	InputValidation(data_list).check()		=> prints the report, raises a ValueError if there are errors
+
+"""
+
+
+class InputValidation:
+	# name	: (unit, physical range (else error), usual range (else warning), usual mistake)
+	schema = {
+		'V'		: ('cm³',	'> 0',			(0.1, 1e6),		'm³ or L instead of cm³'),
+		'r'		: ('∅',		'in [0, 1)',	(0, 0.2),		None),
+		'n'		: ('∅',		'> 0',			(1, 1.5),		None),
+		'Cv'	: ('∅',		'> 0',			(0.3, 1),		None),
+		'ω'		: ('rpm',	'> 0',			(20, 20000),	'rad/s or rps instead of rpm'),
+		'T_ci'	: ('°C',	'> -273.15',	(-60, 250),		'K instead of °C'),
+		'P_ci'	: ('Pa',	'> 0',			(1e3, 1e8),		'bar or kPa instead of Pa'),
+		'ṁ_c'	: ('kg/s',	'> 0',			(1e-5, 100),	'kg/h or g/s instead of kg/s'),
+		'UA_cd'	: ('W/K',	'> 0',			(5, 1e6),		'kW/K instead of W/K'),
+		'T_ei'	: ('°C',	'> -273.15',	(-60, 250),		'K instead of °C'),
+		'P_ei'	: ('Pa',	'> 0',			(1e3, 1e8),		'bar or kPa instead of Pa'),
+		'ṁ_e'	: ('kg/s',	'> 0',			(1e-5, 100),	'kg/h or g/s instead of kg/s'),
+		'UA_ev'	: ('W/K',	'> 0',			(5, 1e6),		'kW/K instead of W/K'),
+		'ΔT_s'	: ('K',		'>= 0',			(0, 50),		None),
+		}
+	conditions = {
+		'> 0'		: lambda x: x > 0,
+		'>= 0'		: lambda x: x >= 0,
+		'in [0, 1)'	: lambda x: 0 <= x < 1,
+		'> -273.15'	: lambda x: x > -273.15,
+		}
+	fluids		= ('fluid', 'fluid_c', 'fluid_e')
+	condensers	= ('effectiveness', 'zones')	# see HeatPump.py
+
+
+	def __init__(self, data_list, list_fluid=None, var_name=None):
+		self.data_list	= data_list
+		self.list_fluid	= list_fluid
+		self.var_name	= var_name
+		self.problems	= {}	# (level, name, message) => {point n° (position in list_fluid for list_fluid): value}
+		self._T_crit	= {}	# refrigerant => critical temperature (K), None if unknown
+		self._unknown	= {}	# refrigerant => reason why CoolProp does not know the fluid
+		self._cp		= {}	# (fluid, T, P) => cp is computable
+		self._external	= {}	# (name, fluid) => {index: cp is computable} of the external fluids
+
+		self._check_points()
+
+
+	@property
+	def errors(self):
+		return {key: points for key, points in self.problems.items() if key[0] == 'error'}
+
+
+	@property
+	def warnings(self):
+		return {key: points for key, points in self.problems.items() if key[0] == 'warning'}
+
+
+	def _add(self, level, name, message, index, value):
+		self.problems.setdefault((level, name, message), {})[index + 1] = value
+
+
+	def _get_T_crit(self, fluid):
+		# Critical temperature of the refrigerant (K), None if CoolProp does not know the fluid
+		if fluid not in self._T_crit:
+			try:
+				if '&' in fluid:
+					# Mixture: the components must be known, the critical point is not checked (see PropertyTable.py)
+					components = re.findall(r'([^&\[\]:]+)\[([^\]]+)\]', fluid)
+					CP.AbstractState('HEOS', '&'.join(name for name, _ in components))
+					self._T_crit[fluid] = math.inf
+					if abs(sum(float(fraction) for _, fraction in components) - 1) > 1e-6:
+						self._T_crit[fluid] = None
+						self._unknown[fluid] = 'the mole fractions of the mixture must sum to 1'
+				else:
+					self._T_crit[fluid] = PropsSI('Tcrit', fluid)
+			except Exception:
+				nearest = self._nearest_fluids(fluid)
+				self._T_crit[fluid] = None
+				self._unknown[fluid] = 'unknown refrigerant in CoolProp' + (f', did you mean {nearest}?' if nearest else '')
+		return self._T_crit[fluid]
+
+
+	def _is_cp_computable(self, fluid, T, P):
+		# Same call as PreComputation (cp of the external fluid at the inlet), NaN => the point cannot be solved
+		key = (fluid, T, P)
+		if key not in self._cp:
+			try:
+				self._cp[key] = math.isfinite(PropsSI('Cpmass', 'T', T + 273.15, 'P', P, fluid))
+			except Exception:
+				self._cp[key] = False
+		return self._cp[key]
+
+
+	@staticmethod
+	def _nearest_fluids(fluid):
+		# Names of CoolProp near the fluid given (typos, e.g. 'R1234ze' => 'R1234ze(E)')
+		names = CP.get_global_param_string('FluidsList').split(',')
+		lower = {name.lower(): name for name in names}
+		return [lower[name] for name in difflib.get_close_matches(str(fluid).lower(), lower, n=3, cutoff=0.6)]
+
+
+	def _check_fluid(self, name, fluid, index):
+		if name == 'fluid':
+			if self._get_T_crit(fluid) is None:
+				self._add('error', name, self._unknown[fluid], index, fluid)
+		else:
+			T, P = self.data_list[index][f'T_{name[-1]}i'], self.data_list[index][f'P_{name[-1]}i']
+			if isinstance(T, (int, float)) and isinstance(P, (int, float)):
+				self._external.setdefault((name, fluid), {})[index] = self._is_cp_computable(fluid, T, P)
+
+
+	def _check_external_fluids(self):
+		# Unknown fluid => cp is computable for none of the points, else only the points out of the range of the fluid fail
+		for (name, fluid), points in self._external.items():
+			if not any(points.values()):
+				nearest = self._nearest_fluids(fluid)
+				message = 'unknown fluid in CoolProp (cp not computable)' + (f', did you mean {nearest}?' if nearest else '')
+				for index in points:
+					self._add('error', name, message, index, fluid)
+				continue
+			for index, computable in points.items():
+				if not computable:
+					self._add('warning', name, f'CoolProp cannot compute cp at T_{name[-1]}i, P_{name[-1]}i, the point will not converge',
+							  index, fluid)
+
+
+	def _check_points(self):
+		if self.list_fluid is not None:
+			# Problems of list_fluid: keyed by the position of the fluid in list_fluid (not a point)
+			for position, fluid in enumerate(self.list_fluid):
+				if self._get_T_crit(fluid) is None:
+					self._add('error', 'list_fluid', self._unknown[fluid], position, fluid)
+
+		for index, data in enumerate(self.data_list):
+			if self.var_name is not None and self.var_name not in data:
+				self._add('error', self.var_name, 'the variable parameter is not an input of the points', index, None)
+
+			# Numbers: type, physical range, usual range
+			for name, (unit, condition, (low, high), mistake) in self.schema.items():
+				value = data.get(name)
+				if value is None:
+					self._add('error', name, 'missing value (empty cell)', index, value)
+				elif isinstance(value, bool) or not isinstance(value, (int, float)) or math.isnan(value):
+					self._add('error', name, f'not a number ({unit})', index, value)
+				elif not self.conditions[condition](value):
+					self._add('error', name, f'must be {condition} {unit}'.replace(' ∅', ''), index, value)
+				elif not low <= value <= high:
+					self._add('warning', name, f'out of the usual range [{low:g}, {high:g}] {unit}'.replace(' ∅', '')
+							  + (f', {mistake}?' if mistake else ''), index, value)
+
+			# Fluids (the refrigerant of the data is not used by SeveralFluidsSimulation)
+			for name in self.fluids:
+				if name == 'fluid' and self.list_fluid is not None:
+					continue
+				fluid = data.get(name)
+				if not isinstance(fluid, str) or not fluid:
+					self._add('error', name, 'missing fluid (empty cell)' if fluid is None else 'not a fluid name', index, fluid)
+				else:
+					self._check_fluid(name, fluid, index)
+
+			# Condensation below the critical temperature of each refrigerant
+			T_ci = data.get('T_ci')
+			for fluid in self.list_fluid or [data.get('fluid')]:
+				T_crit = self._get_T_crit(fluid) if isinstance(fluid, str) else None
+				if T_crit is not None and isinstance(T_ci, (int, float)) and T_ci + 273.15 >= T_crit:
+					self._add('warning', 'T_ci', f'above the critical temperature of {fluid} ({T_crit - 273.15:.1f} °C), '
+							  'the point will not converge', index, T_ci)
+
+			if data.get('condenser', self.condensers[0]) not in self.condensers:
+				self._add('error', 'condenser', f'must be one of {self.condensers}', index, data['condenser'])
+
+		self._check_external_fluids()
+
+
+	@staticmethod
+	def _format_points(points):
+		# [1, 2, 3, 7] => '1-3, 7'
+		groups = []
+		for point in sorted(points):
+			if groups and point == groups[-1][1] + 1:
+				groups[-1][1] = point
+			else:
+				groups.append([point, point])
+		return ', '.join(str(a) if a == b else f'{a}-{b}' for a, b in groups)
+
+
+	@staticmethod
+	def _format_values(values):
+		values = list(dict.fromkeys(values))
+		numbers = [value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool)]
+		if len(values) > 3 and len(numbers) == len(values):
+			return f'{min(numbers):g} to {max(numbers):g}'
+		return ', '.join(repr(value) for value in values[:3]) + (', ...' if len(values) > 3 else '')
+
+
+	def report(self):
+		# Text of the report (one line per problem), printed
+		lines = [f'Validation of {len(self.data_list)} points: {len(self.errors)} errors, {len(self.warnings)} warnings']
+		for (level, name, message), points in sorted(self.problems.items(), key=lambda item: item[0][0]):
+			where = 'list_fluid' if name == 'list_fluid' else f'points {self._format_points(points)}'
+			lines.append(f'{level.upper():<8}{name:<11}{where:<20}{message} (values: {self._format_values(points.values())})')
+		text = '\n'.join(lines)
+		print(text + '\n')
+		return text
+
+
+	def check(self):
+		# Report of the problems (if any), ValueError if a point cannot be solved
+		if self.problems:
+			text = self.report()
+			if self.errors:
+				raise ValueError(f'Invalid inputs, nothing is solved:\n{text}')
+		return self
@@ -0,0 +1,160 @@
+from Model_HTHP.__init__				import *
+from Model_HTHP.DesignOfExperiments	import *
+from scipy							import ndimage
+import json
+
+
+"""
+The class tabulates the outputs of the heat pump model (COP, P_cond = Q̇_cd, ...) on an N-dimensional grid,
+so that the downstream studies (TES sizing, annual simulation) do not have to run the model again.
+
+Build:
+	PerformanceMap.build(base_data, factors, workers=4)
+		base_data	: ,		Data of one column (see ExcelToPython.get_data), used for all the fixed inputs
+		factors		: ,		{name: [value1, value2, ...], ...}, at least 2 values for each factor (e.g. T_ei, T_ci, ω, ṁ_c)
+	=> the grid is solved in parallel by DesignOfExperiments (see DesignOfExperiments.py)
+
+Lookup (vectorized, the queries are numbers or numpy arrays broadcast together):
+	performance_map.evaluate('COP', T_ei=..., T_ci=..., ω=..., method='linear')
+		method = 'linear'	=> multilinear interpolation in the cell of the query
+		method = 'cubic'	=> cubic spline in the index space of the grid (scipy.ndimage.map_coordinates),
+							   only if all the points of the map converged (the spline coefficients depend on all
+							   the points of the table, so a failed point would change the values of all the cells)
+	performance_map.is_valid(T_ei=..., ...)
+		False if the query is outside the grid or if a point of its cell did not converge
+	=> evaluate returns NaN where is_valid is False: the failed points are flagged, never interpolated
+
+Storage:
+	save(file_path) / PerformanceMap.load(file_path)	(.npz file)
+
+"""
+
+
+class PerformanceMap:
+	def __init__(self, axes, outputs, converged, base_data=None):
+		self.axes		= {name: np.asarray(values, dtype=float) for name, values in axes.items()}
+		self.outputs	= {name: np.asarray(values, dtype=float) for name, values in outputs.items()}
+		self.converged	= np.asarray(converged, dtype=bool)
+		self.base_data	= base_data
+
+		for name, values in self.axes.items():
+			if len(values) < 2 or np.any(np.diff(values) <= 0):
+				raise ValueError(f"The axis '{name}' must have at least 2 increasing values")
+
+		# Offsets of the 2^d corners of a cell
+		self._corners	= np.array(list(np.ndindex(*(2,) * len(self.axes))))
+		self._filtered	= {}	# name => table prefiltered for the cubic splines
+
+
+	@property
+	def names(self):
+		return list(self.axes)
+
+
+	@property
+	def shape(self):
+		return tuple(len(values) for values in self.axes.values())
+
+
+	@classmethod
+	def build(cls, base_data, factors, **kwargs):
+		# Solve the grid (kwargs: workers, store, warm_start, ... see DesignOfExperiments) and tabulate the outputs
+		factors = {name: sorted(values) for name, values in factors.items()}
+		results = DesignOfExperiments(base_data, factors, method='grid', **kwargs).run()
+		return cls(results['factors'], results['outputs'], results['converged'], base_data)
+
+
+	def save(self, file_path):
+		os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+		arrays = {'converged': self.converged}
+		for j, (name, values) in enumerate(self.axes.items()):
+			arrays[f'axis_{j}'] = values
+		for j, (name, values) in enumerate(self.outputs.items()):
+			arrays[f'output_{j}'] = values
+		header = {'axes': self.names, 'outputs': list(self.outputs), 'base_data': self.base_data}
+		np.savez_compressed(file_path, header=json.dumps(header, ensure_ascii=False), **arrays)
+
+
+	@classmethod
+	def load(cls, file_path):
+		with np.load(file_path) as file:
+			header	= json.loads(str(file['header']))
+			axes	= {name: file[f'axis_{j}'] for j, name in enumerate(header['axes'])}
+			outputs	= {name: file[f'output_{j}'] for j, name in enumerate(header['outputs'])}
+			return cls(axes, outputs, file['converged'], header['base_data'])
+
+
+	def _locate(self, queries):
+		# Cell of each query: index of the lower corner and position t in [0, 1] along each axis
+
+		missing = set(self.names) - set(queries)
+		if missing:
+			raise KeyError(f'Missing inputs of the map: {sorted(missing)}')
+
+		values	= np.broadcast_arrays(*[np.asarray(queries[name], dtype=float) for name in self.names])
+		inside	= np.ones(values[0].shape, dtype=bool)
+		index	= []
+		t		= []
+		for axis, q in zip(self.axes.values(), values):
+			i = np.clip(np.searchsorted(axis, q, side='right') - 1, 0, len(axis) - 2)
+			index.append(i)
+			t.append((q - axis[i]) / (axis[i+1] - axis[i]))
+			inside &= (q >= axis[0]) & (q <= axis[-1])
+		return index, t, inside
+
+
+	def _interpolate(self, table, converged, index, t):
+		# Multilinear interpolation of the table in the cells (index, t) of the queries,
+		# and True where all the points of the cell converged
+		strides	= np.array([int(np.prod(table.shape[j+1:])) for j in range(table.ndim)])
+		base	= sum(i * stride for i, stride in zip(index, strides))
+		factors	= [(1 - tj, tj) for tj in t]
+		table, converged = table.ravel(), converged.ravel()
+
+		value = np.zeros(base.shape)
+		valid = np.ones(base.shape, dtype=bool)
+		for corner in self._corners:
+			weight = factors[0][corner[0]]
+			for factor, c in zip(factors[1:], corner[1:]):
+				weight = weight * factor[c]
+			flat = base + int(np.dot(corner, strides))
+			# A corner with a zero weight (query on a face of the cell) does not matter
+			valid &= converged[flat] | (weight == 0)
+			value += weight * np.where(weight == 0, 0, table[flat])
+		return value, valid
+
+
+	def is_valid(self, **queries):
+		# True if the query is inside the grid and all the points of its cell converged
+		index, t, inside = self._locate(queries)
+		return inside & self._interpolate(self.converged, self.converged, index, t)[1]
+
+
+	def _get_filtered(self, name):
+		# Table of the output for the cubic splines, the spline coefficients are computed once
+		if name not in self._filtered:
+			failed = np.count_nonzero(~self.converged | ~np.isfinite(self.outputs[name]))
+			if failed:
+				raise ValueError(f"The method 'cubic' needs a map without failed points ({failed} failed points "
+								 f"for '{name}'), use the method 'linear'")
+			self._filtered[name] = ndimage.spline_filter(self.outputs[name], order=3, mode='nearest')
+		return self._filtered[name]
+
+
+	def evaluate(self, name, method='linear', **queries):
+		# Output 'name' at the queries (NaN where is_valid is False)
+
+		if name not in self.outputs:
+			raise KeyError(f"'{name}' is not an output of the map, use one of {list(self.outputs)}")
+		if method not in ('linear', 'cubic'):
+			raise ValueError(f"Unknown method '{method}', use 'linear' or 'cubic'")
+
+		index, t, inside = self._locate(queries)
+		value, valid = self._interpolate(self.outputs[name], self.converged, index, t)
+
+		if method == 'cubic':
+			coordinates = np.array([(i + tj).ravel() for i, tj in zip(index, t)])
+			value = ndimage.map_coordinates(self._get_filtered(name), coordinates, order=3, mode='nearest', prefilter=False)
+			value = value.reshape(inside.shape)
+
+		return np.where(inside & valid, value, np.nan)
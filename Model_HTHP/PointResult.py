@@ -0,0 +1,42 @@
+from Model_HTHP.__init__ import *
+
+
+"""
+The class stores the result of ONE operating point of a sweep.
+
+It is yielded by the simulations (see iter_points in Simulation.py) as soon as the point
+is solved, so the plots, the Excel writer or the interface can use the results incrementally.
+
+PointResult:
+	'index'		: ,		Position of the point in the input data list (column of the Excel file)
+	'data'		: ,		Raw data of the column (see ExcelToPython.get_data)
+	'inputs'	: ,		Formatted inputs of the heat pump model (see PreComputation.format_inputs)
+	'solution'	: ,		Solution of the non-linear system [T_2, T_3, T_cd, T_ev] (in K)
+	'residuals'	: ,		Residuals of the non-linear system for the solution
+	'outputs'	: ,		Dictionary name => value of the outputs of the point (see _point_outputs)
+	'error'		: ,		None if the point converged, else the reason of the failure
+	'time'		: ,		Time spent to solve the point (in s)
+
+"""
+
+
+class PointResult:
+	def __init__(self, index, data, inputs=None, solution=None, residuals=None, outputs=None, error=None, time=0.0):
+		self.index		= index
+		self.data		= data
+		self.inputs		= inputs
+		self.solution	= solution
+		self.residuals	= residuals
+		self.outputs	= outputs if outputs is not None else {}
+		self.error		= error
+		self.time		= time
+
+
+	@property
+	def converged(self):
+		return self.error is None
+
+
+	def __repr__(self):
+		status = 'converged' if self.converged else f'failed ({self.error})'
+		return f'PointResult(index={self.index}, {status}, time={self.time:.3f} s)'
@@ -1,4 +1,5 @@
 from Model_HTHP.__init__ import *
+from Model_HTHP.PropertyTable import *
 
 
 """
@@ -32,6 +33,7 @@ class PostComputation:
 		self.Cv		= inputs['Cv']
 		self.V		= inputs['V']
 		self.ω		= inputs['ω']
+		self.zones	= inputs.get('condenser') == 'zones'
 		# data from the solution
 		self.T_2	= solution[0]
 		self.T_3	= solution[1]
@@ -44,7 +46,7 @@ class PostComputation:
 		Safely call PropsSI from CoolProp and handle errors.
 		"""
 		try:
-			return PropsSI(*args)
+			return PropertyTable.PropsSI(*args)	# tables of the saturation properties for a mixture
 		except Exception as e:
 			# print(f"CoolProp error with arguments {args}: {e}")
 			return float('nan')	# Return NaN for invalid property calls
@@ -57,7 +59,8 @@ class PostComputation:
 
 	@property
 	def P_ev(self):
-		return self._get_prop('P', 'T', self.T_ev, 'Q', 0, self.fluid)
+		# Dew pressure (T_ev is the dew temperature for a mixture, see PropertyTable.py)
+		return self._get_prop('P', 'T', self.T_ev, 'Q', 1, self.fluid)
 
 
 	@property
@@ -141,13 +144,20 @@ class PostComputation:
 		return self.power['cond'] / self.power['comp']
 
 
+	@property
+	def T_co(self):
+		# Temp of the external fluid out of the condensor
+		if self.zones:
+			# Energy balance of the three zones (see HeatPump._get_zones)
+			return self.T_ci + self.power['cond'] / (self.ṁ_c * self.cp_c)
+		return ( self.ε_cd * (self.T_2 - self.T_ci) ) + self.T_ci
+
+
 	@property
 	def ΔT_cd(self):
 		# ΔT_cd = T_co - T_ci
 		# Should be maximized
-		ΔT_cd = self.ε_cd * (self.T_2 - self.T_ci)
-		T_co = ΔT_cd + self.T_ci
-		return T_co - 273.15
+		return self.T_co - 273.15
 
 		'''
 		Q̇ = self.ṁ_c * self.cp_c * self.ε_cd * (self.T_2 - self.T_ci)
@@ -158,6 +168,5 @@ class PostComputation:
 
 	@property
 	def ΔT_lift(self):
-		T_co = ( self.ε_cd * (self.T_2 - self.T_ci) ) + self.T_ci
-		ΔT_lift = T_co - self.T_ei
+		ΔT_lift = self.T_co - self.T_ei
 		return ΔT_lift
\ No newline at end of file
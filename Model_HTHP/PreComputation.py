@@ -27,6 +27,7 @@ class PreComputation:
 		self.ṁ_e		= data['ṁ_e']		# kg/s
 		self.UA_ev		= data['UA_ev']		# W/°C = W/K
 		self.ΔT_s		= data['ΔT_s']		# Δ°C = ΔK
+		self.condenser	= data.get('condenser', 'effectiveness')	# 'effectiveness' or 'zones' (see HeatPump.py)
 		# inputs data to convert in SI units
 		self.V			= data['V'] * 10 ** (-6)		# cm3 to m3
 		self.ω			= data['ω'] * 2 * math.pi / 60	# rpm to rad/s
@@ -66,7 +67,7 @@ class PreComputation:
 
 
 	def format_inputs(self):
-		return {
+		inputs = {
 			# Data for computation
 			'fluid'	: self.fluid,	# Refrigirants
 			'ΔTs'	: self.ΔT_s,	# Superheating
@@ -83,4 +84,9 @@ class PreComputation:
 			'Cv'	: self.Cv,		# volumetric coefficient
 			'V'		: self.V,		# swept volume
 			'ω'		: self.ω,		# rotation speed
-			}
\ No newline at end of file
+			}
+		# Three-zone condenser (only added when used, the inputs of the default model are unchanged)
+		if self.condenser == 'zones':
+			inputs['condenser']	= self.condenser
+			inputs['UA_cd']		= self.UA_cd
+		return inputs
\ No newline at end of file
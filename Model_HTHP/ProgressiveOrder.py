@@ -0,0 +1,47 @@
+from Model_HTHP.__init__ import *
+
+
+"""
+The class gives the order of the points of a sweep, shared by SeveralFluidsSimulation and OneFluidSimulation.
+
+Progressive order (coarse to fine):
+	every 16th point first (and the last one), then every 8th, 4th, 2nd, and all the others
+	=> after each level, the points computed give a coarser version of the final curve (preview)
+
+Initial guess:
+	the converged solution of the nearest point already computed is used if the first initial guess diverges
+
+"""
+
+
+class ProgressiveOrder:
+	def _progressive_levels(self, n, stride=16):
+		# Indices of each level (coarse to fine)
+		levels, seen = [], set()
+		while stride >= 1:
+			level = [i for i in range(0, n, stride) if i not in seen]
+			if not levels and n > 0 and n - 1 not in level:
+				level.append(n - 1)
+			seen.update(level)
+			levels.append(level)
+			stride //= 2
+		return levels
+
+
+	def _get_order(self, n, progressive):
+		# Order of the n points: coarse to fine if progressive, else as the input data
+		if progressive:
+			return [i for level in self._progressive_levels(n) for i in level]
+		return range(n)
+
+
+	def _get_level_ends(self, n):
+		# Number of points computed at the end of each level (a preview is available)
+		return set(np.cumsum([len(level) for level in self._progressive_levels(n)]).tolist())
+
+
+	def _get_previous_solution(self, solutions, index):
+		# Converged solution of the nearest point already computed (used as initial guess if the first one diverges)
+		if not solutions:
+			return None
+		return solutions[min(solutions, key=lambda i: abs(i - index))]
@@ -0,0 +1,189 @@
+from Model_HTHP.__init__	import *
+from scipy.interpolate		import CubicSpline
+import CoolProp.CoolProp	as CP
+import re
+
+
+"""
+The class tabulates the saturation properties of a fluid, to replace the calls to CoolProp
+in the equations of the heat pump model (one spline evaluation instead of one PropsSI call per property).
+
+Fluids:
+	- pure fluids				'R1233zd(E)'
+	- zeotropic mixtures		'R32[0.3]&R1234ze(E)[0.7]'	(mole fractions, CoolProp format)
+	  => for a mixture, CoolProp needs a phase equilibrium computation at each call (~0.5 ms for a saturation state,
+	     ~5 ms for a vapour state), so all the properties of the refrigerant are taken from the table (see PropsSI)
+
+Saturation tables (bubble and dew curves), computed once per fluid (or composition) and per process:
+	- for n_points bubble temperatures T_bub, between the minimum temperature and the critical temperature
+	  (closer near the critical point, where the properties change fast):
+		P		= bubble pressure at T_bub
+		h_l, s_l	= saturated liquid at P (bubble point)
+		h_v, s_v	= saturated vapour at P (dew point), T_dew = dew temperature at P (T_dew - T_bub = glide)
+	- a cubic spline gives all the properties for any bubble temperature (NaN out of the table),
+	  and the bubble temperature for a given dew temperature or pressure
+
+Glide (same as FluidScreening.py):
+	- T_cd is the bubble temperature at P_cd (end of the condensation, T_3 = T_cd without subcooling)
+	- T_ev is the dew temperature at P_ev (end of the evaporation, the superheating ΔT_s starts at T_ev)
+	For a pure fluid, both are the saturation temperature.
+
+Vapour states (P, T): the phase of the state is imposed (gas) in CoolProp, to skip the phase equilibrium computation.
+Two-phase states (P, H or P, S): linear in the quality between the bubble and the dew points (exact for a pure fluid).
+
+"""
+
+
+class PropertyTable:
+	_tables = {}	# fluid => PropertyTable
+
+
+	def __init__(self, fluid, n_points=400):
+		self.fluid		= fluid
+		self.mixture	= '&' in fluid
+
+		# Components and mole fractions ('HEOS::' prefix of the backend not needed)
+		components		= re.findall(r'([^&\[\]:]+)\[([^\]]+)\]', fluid) if self.mixture else [(fluid.split('::')[-1], 1)]
+		names			= '&'.join(name for name, _ in components)
+		fractions		= [float(fraction) for _, fraction in components]
+		self.saturation_state	= CP.AbstractState('HEOS', names)
+		self.vapour_state		= CP.AbstractState('HEOS', names)
+		if self.mixture:
+			self.saturation_state.set_mole_fractions(fractions)
+			self.vapour_state.set_mole_fractions(fractions)
+		self.vapour_state.specify_phase(CP.iphase_gas)
+
+		# Range of the table: minimum temperature => critical temperature
+		T_min = self.saturation_state.Tmin()
+		if self.mixture:
+			T_crit = max(point.T for point in self.saturation_state.all_critical_points() if point.p > 0)
+		else:
+			T_crit = self.saturation_state.T_critical()
+
+		# Bubble temperatures closer near the critical point
+		s = np.linspace(0, 1, n_points)
+		T = T_crit - 0.05 - (T_crit - 0.05 - T_min) * (1 - s) ** 2
+
+		rows = []
+		for T_bub in T:
+			try:
+				rows.append([T_bub] + self._get_saturation_row(T_bub))
+			except ValueError:
+				continue	# no convergence of CoolProp close to the critical point of a mixture
+
+		# Rows with strictly increasing pressure and dew temperature only (the last ones may be wrong near the critical point)
+		rows	= np.array(rows)
+		keep	= [0]
+		for i in range(1, len(rows)):
+			if np.all(np.isfinite(rows[i])) and rows[i, 1] > rows[keep[-1], 1] and rows[i, 6] > rows[keep[-1], 6] and rows[i, 3] > rows[i, 2]:
+				keep.append(i)
+		rows	= rows[keep]
+
+		self.T_min, self.T_max	= rows[0, 0], rows[-1, 0]
+		self.T_dew_min, self.T_dew_max	= rows[0, 6], rows[-1, 6]
+		self.spline				= CubicSpline(rows[:, 0], rows[:, 1:])		# T_bub => [ln(P), h_l, h_v, s_l, s_v, T_dew]
+		self.dew_to_bubble		= CubicSpline(rows[:, 6], rows[:, 0])		# T_dew => T_bub
+		self.pressure_to_bubble	= CubicSpline(rows[:, 1], rows[:, 0])		# ln(P) => T_bub
+
+
+	def _get_saturation_row(self, T_bub):
+		# [ln(P), h_l, h_v, s_l, s_v, T_dew] computed by CoolProp for the bubble temperature T_bub
+		state = self.saturation_state
+		state.update(CP.QT_INPUTS, 0, T_bub)
+		P, h_l, s_l = state.p(), state.hmass(), state.smass()
+		state.update(CP.PQ_INPUTS, P, 1)
+		return [math.log(P), h_l, state.hmass(), s_l, state.smass(), state.T()]
+
+
+	@classmethod
+	def get(cls, fluid):
+		# Table of the fluid, computed at the first call
+		if fluid not in cls._tables:
+			cls._tables[fluid] = cls(fluid)
+		return cls._tables[fluid]
+
+
+	@classmethod
+	def PropsSI(cls, *args):
+		# PropsSI of CoolProp, with the table of the fluid for a mixture (the last argument is the fluid)
+		if '&' in str(args[-1]):
+			return cls.get(args[-1]).get_prop(*args)
+		return PropsSI(*args)
+
+
+	def _get_row(self, T, Q=0):
+		# Saturation properties for the bubble temperature T (Q=0) or the dew temperature T (Q=1)
+		if Q == 1 and self.mixture:
+			if not self.T_dew_min <= T <= self.T_dew_max:
+				return None
+			T = float(self.dew_to_bubble(T))
+		if not self.T_min <= T <= self.T_max:
+			return None
+		return T, self.spline(T)
+
+
+	def __call__(self, T, Q=0):
+		# P_sat (Pa), h_l (J/kg), h_v (J/kg) for the bubble temperature T (Q=0) or the dew temperature T (Q=1)
+		row = self._get_row(T, Q)
+		if row is None:
+			return float('nan'), float('nan'), float('nan')
+		log_P, h_l, h_v = row[1][:3]
+		return math.exp(log_P), float(h_l), float(h_v)
+
+
+	def T_dew(self, T_bub):
+		# Dew temperature at the pressure of the bubble temperature T_bub (T_dew - T_bub = glide)
+		row = self._get_row(T_bub)
+		return float(row[1][5]) if row is not None else float('nan')
+
+
+	def get_prop(self, output, *args):
+		# Same arguments as PropsSI (output, name_1, value_1, name_2, value_2, fluid)
+		if len(args) == 1:
+			if output == 'Tcrit':
+				return self.T_max + 0.05
+			return PropsSI(output, *args)
+
+		inputs = {args[0]: float(args[1]), args[2]: float(args[3])}
+
+		# Saturation: bubble (Q=0) or dew (Q=1) point, for a given T or P
+		if 'Q' in inputs and inputs['Q'] in (0, 1):
+			Q = int(inputs['Q'])
+			if 'T' in inputs:
+				row = self._get_row(inputs['T'], Q)
+			elif 'P' in inputs and inputs['P'] > 0:
+				row = self._get_row(float(self.pressure_to_bubble(math.log(inputs['P']))))
+			else:
+				return PropsSI(output, *args)
+			if row is None:
+				raise ValueError(f'{self.fluid}: state out of the saturation table')
+			T_bub, (log_P, h_l, h_v, s_l, s_v, T_dew) = row
+			values = {'P': math.exp(log_P), 'T': T_dew if Q else T_bub, 'H': h_v if Q else h_l, 'S': s_v if Q else s_l}
+			if output not in values:
+				return PropsSI(output, *args)
+			return float(values[output])
+
+		# Vapour: phase imposed in CoolProp
+		if set(inputs) == {'P', 'T'}:
+			self.vapour_state.update(CP.PT_INPUTS, inputs['P'], inputs['T'])
+			return self.vapour_state.keyed_output(CP.get_parameter_index(output))
+
+		# Two-phase or vapour, for a given P and H or S
+		if set(inputs) in ({'P', 'H'}, {'P', 'S'}):
+			name = 'H' if 'H' in inputs else 'S'
+			row = self._get_row(float(self.pressure_to_bubble(math.log(inputs['P']))))
+			if row is not None:
+				T_bub, (log_P, h_l, h_v, s_l, s_v, T_dew) = row
+				liquid, vapour = (h_l, h_v) if name == 'H' else (s_l, s_v)
+				if liquid <= inputs[name] <= vapour:
+					x = (inputs[name] - liquid) / (vapour - liquid)
+					values = {'Q': x, 'T': T_bub + x * (T_dew - T_bub), 'P': inputs['P'],
+							  'H': h_l + x * (h_v - h_l), 'S': s_l + x * (s_v - s_l)}
+					if output in values:
+						return float(values[output])
+				elif inputs[name] > vapour:
+					pair = CP.HmassP_INPUTS if name == 'H' else CP.PSmass_INPUTS
+					self.vapour_state.update(pair, *((inputs['H'], inputs['P']) if name == 'H' else (inputs['P'], inputs['S'])))
+					return self.vapour_state.keyed_output(CP.get_parameter_index(output))
+
+		return PropsSI(output, *args)
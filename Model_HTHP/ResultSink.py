@@ -0,0 +1,85 @@
+from Model_HTHP.__init__		import *
+from Model_HTHP.ColumnarResults	import *
+
+
+"""
+The class writes the results of a run on disk as soon as they are computed (after each fluid, or each chunk of points),
+instead of keeping all the fluids in memory until the end of the run.
+
+Directory of the results (next to the Excel file, e.g. Excel_Outputs/Outputs_..._results):
+	parts.json				List of the finished parts (updated after each part), format and name of the variable
+	part_000.feather, ...	Points of one fluid (or chunk of chunk_size points), see ColumnarResults.py for the columns
+=> the directory can be read at any time during the run: ColumnarResults.load(directory) gives the finished parts
+
+format = None => the parts are kept in memory (no file), same use otherwise.
+
+"""
+
+
+class ResultSink:
+	def __init__(self, directory, var_name,		# values to be set
+			format		= 'auto',				# default values (see ColumnarResults.formats, None => memory)
+			chunk_size	= None,					# default values (points per part, None => one part per fluid)
+			):
+		self.directory	= directory
+		self.var_name	= var_name
+		self.format		= format
+		self.chunk_size	= chunk_size
+
+		self.parts		= []	# description of the finished parts (in memory: the ColumnarResults)
+		self.buffer		= []	# rows of the points of the current part (ColumnarResults of one point)
+		self.fluid		= None	# fluid of the current part
+
+		if self.format is not None:
+			os.makedirs(self.directory, exist_ok=True)
+			self._save_index(finished=False)
+
+
+	def _save_index(self, finished):
+		# Written in a temporary file first, so that a reader never gets a partial index
+		index_file	= os.path.join(self.directory, 'parts.json')
+		temporary	= index_file + '.tmp'
+		with open(temporary, 'w', encoding='utf-8') as file:
+			json.dump({'var_name': self.var_name, 'format': self.format, 'finished': finished, 'parts': self.parts},
+					  file, ensure_ascii=False, indent=1)
+		os.replace(temporary, index_file)
+
+
+	def add(self, point, fluid):
+		# Add one point (PointResult), the current part is written when it is full or when the fluid changes
+		# The row is built at once: the data of the point is changed by the next fluid (see iter_points)
+		if self.buffer and fluid != self.fluid:
+			self.flush()
+		self.fluid = fluid
+		self.buffer.append(ColumnarResults.from_points([point], self.var_name, fluid))
+		if self.chunk_size and len(self.buffer) >= self.chunk_size:
+			self.flush()
+
+
+	def flush(self):
+		# Write the points of the current part (called at the end of each fluid)
+		if not self.buffer:
+			return
+		results = ColumnarResults.concatenate(self.buffer)
+		self.buffer = []
+
+		if self.format is None:
+			self.parts.append(results)
+			return
+
+		path = results.save(os.path.join(self.directory, f'part_{len(self.parts):03d}'), self.format)
+		self.parts.append({'file': os.path.basename(path), 'fluid': self.fluid, 'rows': len(results)})
+		self._save_index(finished=False)
+
+
+	def close(self):
+		self.flush()
+		if self.format is not None:
+			self._save_index(finished=True)
+
+
+	def load(self):
+		# All the finished parts in one ColumnarResults
+		if self.format is None:
+			return ColumnarResults.concatenate(self.parts)
+		return ColumnarResults.load(self.directory)
@@ -0,0 +1,157 @@
+from Model_HTHP.__init__	import *
+from Model_HTHP.PointResult	import *
+import CoolProp
+import argparse
+import functools
+import hashlib
+import inspect
+import sqlite3
+import json
+
+
+"""
+The class stores the converged operating points on disk (SQLite file), so that an identical point is never computed twice
+(repeated Excel columns, same fluid in several studies, re-running a test after a modification of the plots, ...).
+
+Key of a point = hash of:
+	- the formatted inputs of the heat pump model (see PreComputation.format_inputs)
+	- the settings of the solver (first initial guess, convergence criteria, simulation class)
+	  and the definition of the stored outputs (source code of _point_outputs of the simulation, see get_code_version)
+	- the version of CoolProp and of the model (files HeatPump.py, PreComputation.py, PostComputation.py and PropertyTable.py)
+=> modifying the model or the outputs, or updating CoolProp invalidates the stored points automatically
+   (the other changes of Simulation.py, e.g. the plots, do not)
+
+The least recently used points are removed when the file exceeds max_size (in MB).
+
+Command line:
+	python -m Model_HTHP.ResultStore info	[--file FILE]		Number of points and size of the store
+	python -m Model_HTHP.ResultStore clear	[--file FILE]		Remove all the stored points
+
+"""
+
+
+class ResultStore:
+	def __init__(self, file_path='Cache/result_store.sqlite', max_size=200):
+		self.file_path	= file_path
+		self.max_size	= max_size	# MB
+		self._connection = None
+		self.version	= self._get_version()
+
+
+	def __getstate__(self):
+		# The SQLite connection cannot be sent to another process (see DesignOfExperiments), it is opened again there
+		state = self.__dict__.copy()
+		state['_connection'] = None
+		return state
+
+
+	@property
+	def connection(self):
+		if self._connection is None:
+			os.makedirs(os.path.dirname(self.file_path) or '.', exist_ok=True)
+			self._connection = sqlite3.connect(self.file_path, timeout=60)
+			self._connection.execute(
+				'CREATE TABLE IF NOT EXISTS points (key TEXT PRIMARY KEY, value TEXT, size INTEGER, last_access REAL)')
+		return self._connection
+
+
+	def _get_version(self):
+		# Version of CoolProp and of the files of the model
+		version = hashlib.sha256(CoolProp.__version__.encode())
+		for name in ('HeatPump.py', 'PreComputation.py', 'PostComputation.py', 'PropertyTable.py'):
+			with open(os.path.join(os.path.dirname(__file__), name), 'rb') as file:
+				version.update(file.read())
+		return version.hexdigest()
+
+
+	@staticmethod
+	@functools.lru_cache(maxsize=None)
+	def get_code_version(function):
+		# Hash of the source code of a function (e.g. _point_outputs, which defines the stored outputs), read once
+		return hashlib.sha256(inspect.getsource(function).encode()).hexdigest()
+
+
+	def get_key(self, inputs, settings):
+		# Hash of the normalized inputs (12 significant digits) and of the solver settings
+		normalize = lambda v: v if isinstance(v, str) else float(f'{float(v):.12g}')
+		content = {
+			'inputs'	: {name: normalize(value) for name, value in inputs.items()},
+			'settings'	: settings,
+			'version'	: self.version,
+			}
+		return hashlib.sha256(json.dumps(content, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+	def get(self, key, index, data):
+		# PointResult stored for this key (None if the point was never computed)
+		row = self.connection.execute('SELECT value FROM points WHERE key = ?', (key,)).fetchone()
+		if row is None:
+			return None
+
+		with self.connection:
+			self.connection.execute('UPDATE points SET last_access = ? WHERE key = ?', (time.time(), key))
+
+		value = json.loads(row[0])
+		return PointResult(index, data, value['inputs'], np.array(value['solution']), value['residuals'], value['outputs'])
+
+
+	def put(self, key, point):
+		# Store a converged point
+		value = json.dumps({
+			'inputs'	: {k: (v if isinstance(v, str) else float(v)) for k, v in point.inputs.items()},
+			'solution'	: [float(v) for v in point.solution],
+			'residuals'	: [float(v) for v in point.residuals],
+			'outputs'	: {k: float(v) for k, v in point.outputs.items()},
+			}, ensure_ascii=False)
+
+		with self.connection:
+			self.connection.execute('INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?)', (key, value, len(value), time.time()))
+		self._evict()
+
+
+	def _evict(self):
+		# Remove the least recently used points when the store is too big (down to 90% of max_size)
+		size = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM points').fetchone()[0]
+		if size <= self.max_size * 1e6:
+			return
+
+		with self.connection:
+			for key, point_size in self.connection.execute('SELECT key, size FROM points ORDER BY last_access').fetchall():
+				self.connection.execute('DELETE FROM points WHERE key = ?', (key,))
+				size -= point_size
+				if size <= 0.9 * self.max_size * 1e6:
+					break
+
+
+	def info(self):
+		count, size = self.connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM points').fetchone()
+		return {'points': count, 'size (MB)': size / 1e6, 'file': self.file_path}
+
+
+	def clear(self):
+		# Invalidate the store: remove all the points
+		with self.connection:
+			self.connection.execute('DELETE FROM points')
+		self.connection.execute('VACUUM')
+
+
+	def close(self):
+		if self._connection is not None:
+			self._connection.close()
+			self._connection = None
+
+
+if __name__ == '__main__':
+
+	parser = argparse.ArgumentParser(description='Store of the computed heat pump operating points')
+	parser.add_argument('command', choices=['info', 'clear'])
+	parser.add_argument('--file', default='Cache/result_store.sqlite')
+	args = parser.parse_args()
+
+	store = ResultStore(args.file)
+	if args.command == 'clear':
+		store.clear()
+		print(f'The store {args.file} is cleared')
+	else:
+		print(store.info())
+	store.close()
@@ -0,0 +1,191 @@
+from Model_HTHP.__init__		import *
+from Model_HTHP.ExcelToPython	import *
+from Model_HTHP.InputValidation	import *
+from Interface.CreateSound		import *
+from openpyxl					import Workbook
+import copy
+
+
+"""
+The class runs several scenarios (studies) of a simulation in one batch, in parallel on a pool of processes,
+instead of one run per input file (Inputs_T3a, Inputs_T4a, ..., Inputs_T4f).
+
+Scenarios (see ExcelToPython.get_scenarios):
+	- a workbook with several input sheets ('inputs_T4a', 'inputs_T4b', ...)
+	- a directory of input files (Excel or text files, see TextInputs.py)
+	=> given as the input_file of the simulation
+
+Inputs:
+	'simulation': ,		SeveralFluidsSimulation or OneFluidSimulation, used as template for all the scenarios
+	'workers'	: ,		Number of processes solving the scenarios in parallel (one scenario per process)
+	'var_names'	: ,		Variable parameter of some scenarios {name: var_name} (else the var_name of the simulation)
+
+Validation:
+	All the scenarios are checked before the first one is solved (see InputValidation.py, validate of the simulation)
+	=> one report per scenario, nothing is solved if a scenario has an error
+
+Scheduler:
+	The scenarios with the most points are started first (same fluids for all the scenarios),
+	so that the batch ends about when the longest scenario ends.
+
+Output file (Excel_Outputs/Scenarios_....xlsx):
+	'summary'	=> one line per scenario and fluid: points, converged points, COP and P_cond ranges, time
+	<scenario>	=> outputs of the scenario (same columns as the sheet 'outputs' of a single run)
+
+	simulation = SeveralFluidsSimulation('Excel_Inputs', 'T_ci', list_fluid=['R1233zd(E)', 'R1234ze(Z)'])
+	ScenarioBatch(simulation, workers=4).run()		(or simulation.run_scenarios(workers=4))
+
+"""
+
+
+def _solve_scenario(simulation, name, data_list):
+	# Solve one scenario in a worker process (must be a module function to be pickled)
+	# The new solutions of the warm start index are sent back to the main process (see WarmStartIndex.merge)
+	start = time.perf_counter()
+
+	list_outputs, list_errors = [], []
+	if hasattr(simulation, 'list_fluid'):
+		# Several fluids: the points are converted for each fluid (iter_points changes the fluid of the data)
+		for fluid in simulation._get_list_fluid(data_list):
+			outputs, errors = simulation._points_to_outputs(simulation.iter_points(data_list, fluid), fluid)
+			list_outputs.append(outputs)
+			list_errors.append(errors)
+	else:
+		outputs, errors = simulation._points_to_outputs(simulation.iter_points(data_list))
+		outputs['fluid'] = data_list[0]['fluid']
+		list_outputs.append(outputs)
+		list_errors.append(errors)
+
+	entries = simulation.warm_start.new_entries if simulation.warm_start is not None else []
+	return name, list_outputs, list_errors, time.perf_counter() - start, entries
+
+
+class ScenarioBatch:
+	def __init__(self, simulation,			# values to be set
+			workers		= 1,				# default values
+			var_names	= None,				# default values
+			):
+		self.simulation	= simulation
+		self.workers	= workers
+		self.var_names	= var_names or {}
+		self.scenarios	= ExcelToPython.get_scenarios(simulation.input_file)
+		self.output_file = ExcelToPython._new_file_name('Scenarios')
+
+		if not self.scenarios:
+			raise ValueError(f'No input sheet or input file in {simulation.input_file}')
+		for name in self.var_names:
+			if name not in [scenario[0] for scenario in self.scenarios]:
+				raise KeyError(f"Unknown scenario '{name}', use one of {[scenario[0] for scenario in self.scenarios]}")
+
+
+	def _get_var_name(self, name):
+		return self.var_names.get(name, self.simulation.var_name)
+
+
+	def _get_tasks(self):
+		# (simulation, name, data_list) of each scenario, the longest scenarios first
+		tasks, invalid = [], []
+		for name, input_file, sheet in self.scenarios:
+			simulation				= copy.copy(self.simulation)
+			simulation.input_file	= input_file
+			simulation.var_name		= self._get_var_name(name)
+			tasks.append((simulation, name, ExcelToPython(input_file, sheet).get_data()))
+
+			if self.simulation.validate:
+				validation = InputValidation(tasks[-1][2], getattr(simulation, 'list_fluid', None), simulation.var_name)
+				if validation.problems:
+					print(f'Scenario {name}:')
+					validation.report()
+				invalid += [name] if validation.errors else []
+
+		if invalid:
+			raise ValueError(f'Invalid inputs in the scenarios {invalid}, nothing is solved (see the reports above)')
+
+		return sorted(tasks, key=lambda task: -len(task[2]))
+
+
+	def iter_scenarios(self):
+		# Solve the scenarios and yield (name, list_outputs, list_errors, time) as soon as each one is finished
+		tasks = self._get_tasks()
+
+		if self.workers <= 1:
+			for task in tasks:
+				yield _solve_scenario(*task)[:4]
+			return
+
+		with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+			futures = [executor.submit(_solve_scenario, *task) for task in tasks]
+			for future in as_completed(futures):
+				*result, entries = future.result()
+				self.simulation.warm_start.merge(entries) if entries else None
+				yield tuple(result)
+
+
+	def _get_summary(self, results):
+		# One line per scenario and fluid
+		summary = []
+		for name, _, _ in self.scenarios:
+			list_outputs, list_errors, duration = results[name]
+			for outputs, errors in zip(list_outputs, list_errors):
+				COP, P_cond = outputs['COP'], outputs['P_cond']
+				summary.append({
+					'scenario'		: name,
+					'fluid'			: outputs['fluid'],
+					'var_name'		: self._get_var_name(name),
+					'points'		: len(COP) + len(errors),
+					'converged'		: len(COP),
+					'COP_min'		: min(COP, default=None),
+					'COP_max'		: max(COP, default=None),
+					'P_cond_min'	: min(P_cond, default=None),
+					'P_cond_max'	: max(P_cond, default=None),
+					'time'			: duration,
+					})
+		return summary
+
+
+	def _write_results(self, results, summary):
+		# Sheet 'summary' then one sheet per scenario (write_only workbook, see ExcelToPython._write_columns)
+		workbook = Workbook(write_only=True)
+
+		sheet = workbook.create_sheet('summary')
+		sheet.append(list(summary[0]))
+		for line in summary:
+			sheet.append(list(line.values()))
+
+		for name, _, _ in self.scenarios:
+			columns	= ExcelToPython._fluid_columns(results[name][0])
+			title = ''.join('_' if character in '[]:*?/\\' else character for character in name)[:31]	# rules of Excel
+			ExcelToPython._append_columns(workbook.create_sheet(title), columns)
+
+		os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
+		workbook.save(self.output_file)
+		print(f'\n\n\nThe results data are written ine the file:\n{self.output_file}\n\n\n')
+
+
+	def run(self):
+
+		print(f'Step 0 : Loading the {len(self.scenarios)} scenarios of {self.simulation.input_file}')
+		start = time.perf_counter()
+
+		print(f'Step 1 : Solving the scenarios ({self.workers} workers)')
+		results = {}
+		for name, list_outputs, list_errors, duration in self.iter_scenarios():
+			results[name] = (list_outputs, list_errors, duration)
+			print(f'Scenario {name} finished in {duration:.1f} s ({len(results)}/{len(self.scenarios)})')
+		total = time.perf_counter() - start
+
+		# Notify that the computations are finished
+		CreateSound().sound1()
+
+		print('Step 2 : Summary of the scenarios')
+		summary = self._get_summary(results)
+		print(f"\n{'Scenario':<24}{'Fluid':<14}{'Points':>8}{'COP min':>9}{'COP max':>9}{'Time (s)':>10}")
+		for line in summary:
+			COP_range = f"{line['COP_min']:>9.2f}{line['COP_max']:>9.2f}" if line['converged'] else f"{'-':>9}{'-':>9}"
+			print(f"{line['scenario']:<24}{line['fluid']:<14}{line['converged']:>4}/{line['points']:<3}{COP_range}{line['time']:>10.1f}")
+		print(f'\nTotal time: {total:.1f} s (sum of the scenarios: {sum(result[2] for result in results.values()):.1f} s)\n')
+
+		print('Step 3 : Write the results in the output file')
+		self._write_results(results, summary)
+
+		return results, summary
@@ -3,13 +3,23 @@ from Model_HTHP.HeatPump 		 import *
 from Model_HTHP.PostComputation  import *
 from Model_HTHP.PreComputation	 import *
 from Model_HTHP.ExcelToPython	 import *
+from Model_HTHP.PointResult		 import *
+from Model_HTHP.Checkpoint		 import *
+from Model_HTHP.AdaptiveSampling import *
+from Model_HTHP.FluidScreening	 import *
+from Model_HTHP.ResultStore		 import *
+from Model_HTHP.WarmStartIndex	 import *
+from Model_HTHP.SimulationBase	 import *
+from Model_HTHP.ResultSink		 import *
+from Model_HTHP.ScenarioBatch	 import *
+from Model_HTHP.InputValidation	 import *
 from Interface.CreateSound		 import *
 
 
 # Class 1 : Simulation for several fluids
 
 
-class SeveralFluidsSimulation:
+class SeveralFluidsSimulation(SimulationBase):
 	# Main Variables:
 
 		# var_name		=> The name of the variable parameter to be varied
@@ -29,6 +39,9 @@ class SeveralFluidsSimulation:
 		# - residuals	=> The differences between the left-hand side and right-hand side of the equations in the system
 		# 				Residuals should be as close as possible to zero for accurate solutions
 
+	# Solve started again from the last solution if the previous solution diverges (see SimulationBase._solve_point)
+	restarts = 1
+
 
 	def __init__(self, input_file, var_name,			# values to be set
 			first_initial_guess = [370, 250, 330, 290],	# default values
@@ -40,6 +53,16 @@ class SeveralFluidsSimulation:
 			'R152a', 'R236fa', 'R245fa','R245ca','R365mfc','R1234yf', 'R717',
 			'R1234ze(E)', 'R1233zd(E)','R600a', 'R601a', 'R114','R1234ze(Z)'
 			],
+			checkpoint_file	= None,							# default values
+			resume			= False,						# default values
+			progressive		= False,						# default values
+			top_k			= None,							# default values
+			T_supply		= None,							# default values
+			store			= None,							# default values
+			warm_start		= None,							# default values
+			export			= 'auto',						# default values
+			chunk_size		= None,							# default values
+			validate		= True,							# default values
 			):
 		
 		self.first_initial_guess = first_initial_guess
@@ -49,112 +72,180 @@ class SeveralFluidsSimulation:
 		self.criteria_1	= criteria_1
 		self.criteria_2	= criteria_2
 		self.verif		= verif
+		self.progressive = progressive	# coarse to fine order (see ProgressiveOrder.py)
+		# Screening of the fluids: only the top_k best fluids are simulated (see FluidScreening.py)
+		self.top_k		= top_k
+		self.T_supply	= T_supply
+		# Stored results of the points already computed (ResultStore object, see ResultStore.py)
+		self.store		= store
+		# Index of the past solutions, used as initial guesses (WarmStartIndex object, see WarmStartIndex.py)
+		self.warm_start	= warm_start
+		# Results written on disk after each fluid (or chunk of chunk_size points) next to the Excel file
+		# export => format of the files (see ColumnarResults.py), None => kept in memory (see ResultSink.py)
+		self.export		= export
+		self.chunk_size	= chunk_size
+		self.sink		= None
+		# Check of all the points before solving (see InputValidation.py)
+		self.validate	= validate
+		# Checkpoint of the finished points (see Checkpoint.py)
+		self.checkpoint_file = checkpoint_file
+		self.resume			 = resume
+		self.checkpoint		 = None
+
+
+	def _point_outputs(self, data, solution, results):
+		# Extract key results from the computation of one operating point.
 
+		# If the COP is too high, do not take into account the results
+		if results.COP > 50: raise Exception('COP Divergence')
 
-	def _computation(self, data, initial_guess):
-		# Perform the main computation by solving the heat pump model for a given input and initial guess.
-		
-		inputs				= PreComputation(data).format_inputs()		# Format the inputs
-		heat_pump_model		= HeatPump(inputs)							# See details of the model in the file HeatPump.py
-		solution, residuals	= heat_pump_model.solve_v2(initial_guess)	# Solve the non linear system
-		results				= PostComputation(inputs, solution)			# Values of the hp, computed thanks to the solutions
-		
-		return solution, residuals, results
+		return {
+			# Extract the solutions
+			'T_2'	: solution[0] -273.15,	# results in °C
+			'T_3'	: solution[1] -273.15,	# results in °C
+			'T_cd'	: solution[2] -273.15,	# results in °C
+			'T_ev'	: solution[3] -273.15,	# results in °C
+			# Extract the post-computation results
+			'P_evap': abs(results.power['evap']),
+			'P_cond': abs(results.power['cond']),
+			'P_comp': abs(results.power['comp']),
+			'ΔT_cd'	: results.ΔT_cd,
+			'COP'	: results.COP,
+			'ṁ_f'	: results.ṁ_f,
+			}
 
 
-	def _results_extraction(self, data, solution, results, outputs):
-		# Extract key results from the computation and append them to the outputs dictionary.
+	def iter_points(self, data_list, fluid, progressive=None):
+		# Solve the heat pump model for a specific fluid and yield each point as soon as it is solved.
+		# The nearest converged solution is used as initial guess if the first initial guess diverges.
+		# progressive=True => coarse to fine order (see ProgressiveOrder.py), by default self.progressive
 
-		# Extract the solutions
-		outputs['T_2'].append(solution[0]  -273.15)	# results in °C
-		outputs['T_3'].append(solution[1]  -273.15)	# results in °C
-		outputs['T_cd'].append(solution[2] -273.15)	# results in °C
-		outputs['T_ev'].append(solution[3] -273.15)	# results in °C
+		progressive = self.progressive if progressive is None else progressive
+		solutions = {} # index => converged solution
 
-		# Set the x axis of the graphs
-		outputs[self.var_name].append(data[self.var_name])
+		for index in self._get_order(len(data_list), progressive):
+			# Set the fluid
+			data = data_list[index]
+			data['fluid'] = fluid
+			previous_solution = self._get_previous_solution(solutions, index)
 
-		# If the COP is too high, do not take into account the results
-		if results.COP > 50: raise Exception('COP Divergence')
+			# Skip the points already finished in a previous run (if resumed from a checkpoint)
+			point = self.checkpoint.get(fluid, index) if self.checkpoint else None
 
-		# Extract the post-computation results
-		outputs['P_evap'].append(abs(results.power['evap']))
-		outputs['P_cond'].append(abs(results.power['cond']))
-		outputs['P_comp'].append(abs(results.power['comp']))
-		outputs['ΔT_cd'].append(results.ΔT_cd)
-		outputs['COP'].append(results.COP)
-		outputs['ṁ_f'].append(results.ṁ_f)
+			if point is not None:
+				point.data = data
+			elif self.checkpoint:
+				self.checkpoint.start(fluid, index)
+				point = self._solve_point(index, data, previous_solution)
+				self.checkpoint.save(fluid, point)
+			else:
+				point = self._solve_point(index, data, previous_solution)
 
-		return outputs
+			if point.converged:
+				solutions[index] = point.solution
 
+			yield point
 
-	def _get_previous_solution(self, outputs, i):
-		# Retrieve the solution from the previous iteration to use as the initial guess for better convergence.
-		return [
-			outputs['T_2'][i-1]  +273.15,	# initial guess in K
-			outputs['T_3'][i-1]  +273.15,	# initial guess in K
-			outputs['T_cd'][i-1] +273.15,	# initial guess in K
-			outputs['T_ev'][i-1] +273.15	# initial guess in K
-			]
 
+	def _get_list_fluid(self, input_data):
+		# Fluids to simulate: all the fluids, or only the top_k best fluids of the screening
+		if not self.top_k:
+			return self.list_fluid
 
-	def _check_residuals(self, residuals):
-		# Verify if the residuals meet the convergence criteria defined above.
-		condition_1 = max(abs(r) for r in residuals) > self.criteria_1
-		condition_2 = abs(residuals[-1]) 			 > self.criteria_2
-		return condition_1 or condition_2
+		print(f'Screening of the fluids with an ideal cycle (the {self.top_k} best are kept)')
+		return FluidScreening(input_data, self.list_fluid, T_supply=self.T_supply).select(self.top_k)
 
 
-	def _get_outputs(self, data_list, fluid):
-		# Compute and collect results for a specific fluid over a range of variable parameter values.
+	def _validate(self, data_list, var_name=None):
+		# Check all the points (for all the fluids) before solving, ValueError with the report if a point cannot be solved
+		if self.validate:
+			InputValidation(data_list, self.list_fluid, var_name or self.var_name).check()
+
+
+	def _open_checkpoint(self):
+		# Start (or resume) the checkpoint file if one is asked
+		if self.checkpoint_file:
+			job = {'input_file': self.input_file, 'var_name': self.var_name}
+			self.checkpoint = Checkpoint(self.checkpoint_file, job, resume=self.resume)
+			print(f'Resumed {len(self.checkpoint.points)} finished points from {self.checkpoint_file}') if self.resume else None
 
-		outputs = {
+
+	def _close_checkpoint(self):
+		if self.checkpoint:
+			self.checkpoint.close()
+			self.checkpoint = None
+
+
+	def _new_outputs(self, fluid):
+		# Empty outputs dictionary, filled point by point with _results_extraction.
+		return {
 			'T_cd': [], 'P_cond': [], 'COP'  : [],
 			'T_ev': [], 'P_evap': [], 'ṁ_f'  : [],
 			'T_2' : [], 'P_comp': [], 'ΔT_cd': [],
 			'T_3' : [],
 			self.var_name: [], 'fluid': fluid
 			}
-		errors = []
-		i = 0
 
-		for data in data_list:
-			try:
-				# STEP 1: Set the fluid
-				data['fluid'] = fluid
 
-				# STEP 2: Compute with the first initial guess
-				solution, residuals, results = self._computation(data, self.first_initial_guess)
+	def _get_outputs(self, data_list, fluid):
+		# Compute and collect results for a specific fluid over a range of variable parameter values.
 
-				# STEP 3: If the computation diverged, use the previous solution as initial guess
-				if i != 0 and self._check_residuals(residuals):
-					solution, residuals, results = self._computation(data, self._get_previous_solution(outputs, i))
-					if i != 0 and self._check_residuals(residuals):
-						solution, residuals, results = self._computation(data, solution)
+		points = []
+		for point in self.iter_points(data_list, fluid):
+			self.sink.add(point, fluid) if self.sink else None
+			points.append(point)
+		self.sink.flush() if self.sink else None
+		outputs, errors = self._points_to_outputs(points, fluid)
 
-				# STEP 4: Print residuals if verification is requested
-				if self.verif:
-					print([f"{abs(num):.3e}" for num in residuals])
+		print(f'Non computed values for {self.var_name} = {errors}\n') if errors else None
 
-				# STEP 5: Do not consider the computation if the results fail to meet the convergence criteria
-				if self._check_residuals(residuals):
-					raise Exception('Solutions Divergence')
+		return outputs
 
-				# STEP 6: Extract outputs from the results
-				outputs = self._results_extraction(data, solution, results, outputs)
 
-				i += 1
+	def _get_adaptive_outputs(self, base_data, fluid, bounds, budget, watch):
+		# Same as _get_outputs, but the values of var_name are chosen by the adaptive sampling (see AdaptiveSampling.py)
 
-			except Exception as e:
-				# print(e)
-				# The computation may fail (pbm of convergence, not realistic inputs, ...)
-				errors.append(data[self.var_name])
+		base_data = dict(base_data, fluid=fluid)
+		points = AdaptiveSampling(self, base_data, bounds, budget, watch).get_points()
+		for point in points:
+			self.sink.add(point, fluid) if self.sink else None
+		self.sink.flush() if self.sink else None
+		outputs, errors = self._points_to_outputs(points, fluid)
 
 		print(f'Non computed values for {self.var_name} = {errors}\n') if errors else None
 
 		return outputs
 
 
+	def _open_sink(self, input_file, var_name=None):
+		# Results of the run written part by part in Excel_Outputs/Outputs_..._results (see ResultSink.py)
+		directory = os.path.splitext(input_file.output_file)[0] + '_results'
+		self.sink = ResultSink(directory, var_name or self.var_name, self.export, self.chunk_size)
+
+
+	def _close_sink(self):
+		self.sink.close()
+		print(f'The results are written part by part in the directory:\n{self.sink.directory}\n') if self.export else None
+
+
+	def _get_list_outputs(self, list_fluid):
+		# Outputs of each fluid (converged points, sorted as the input data), read back from the results of the run
+		# => only the fluid in progress is kept in memory during the run
+		results = self.sink.load()
+		list_outputs = []
+		for fluid in list_fluid:
+			outputs = self._new_outputs(fluid)
+			part = results.select(fluid=fluid, converged=True) if len(results) else results
+			if len(part):
+				order = np.argsort(part['index'], kind='stable')
+				for name in outputs:
+					if name != 'fluid':
+						column = part['var_value'] if name == self.var_name else part[f'output.{name}']
+						outputs[name] = np.asarray(column)[order].tolist()
+			list_outputs.append(outputs)
+		return list_outputs
+
+
 	def _plot_graphs(self, list_outputs):
 			# Generate and display graphs comparing the heat pump parameters for different fluids.
 
@@ -211,49 +302,70 @@ class SeveralFluidsSimulation:
 
 		print('Step 1 : Loading the input data from the input file')
 		input_data = input_file.get_data()
+		self._validate(input_data)
 
 		print('Step 2 : Solving the heat pump model')
-		list_outputs = []
-		for i in self.list_fluid:
+		list_fluid = self._get_list_fluid(input_data)
+		self._open_checkpoint()
+		self._open_sink(input_file)
+		for i in list_fluid:
 			print('\033[1m' + f'\nComputation for {i}' + '\033[0m')
-			outputs = self._get_outputs(input_data, i)
-			list_outputs.append(outputs)
+			self._get_outputs(input_data, i)
+		self._close_checkpoint()
+		self._close_sink()
 		
 		# Notify that the computations are finished
 		CreateSound().sound1()
 		
 		print('Step 3 : Plot the graphs')
+		list_outputs = self._get_list_outputs(list_fluid)
 		self._plot_graphs(list_outputs)
 
 		print('Step 4 : Write the results in the output file')
 		input_file.write_fluid_results(list_outputs)
 	
 
-	def run_with_progress(self):
+	def run_with_progress(self, preview=None):
+		# preview => function called with [outputs of the fluid in progress] at the end of each level (progressive order)
 		print('Step 0 : Loading the input file')
 		input_file = ExcelToPython(input_file=self.input_file)
 
 		print('Step 1 : Loading the input data from the input file')
 		input_data = input_file.get_data()
+		self._validate(input_data)
 
 		print('Step 2 : Solving the heat pump model')
-		list_outputs = []
-		total_fluids = len(self.list_fluid)
+		list_fluid = self._get_list_fluid(input_data)
+		self._open_checkpoint()
+		self._open_sink(input_file)
+		total_fluids = len(list_fluid)
+		ends = self._get_level_ends(len(input_data))
 
-		for idx, fluid in enumerate(self.list_fluid):
+		for idx, fluid in enumerate(list_fluid):
 			# Compute
 			print(f'\nComputation for {fluid}\n')
-			outputs = self._get_outputs(input_data, fluid)
-			list_outputs.append(outputs)
-
-			# Calculate and yield progress
-			progress = int((idx + 1) / total_fluids * 100) - 1
-			yield progress
+			points = []
+			for point in self.iter_points(input_data, fluid):
+				points.append(point)
+				self.sink.add(point, fluid)
+				if preview and self.progressive and len(points) in ends:
+					preview([self._points_to_outputs(points, fluid)[0]])
+
+				# Calculate and yield progress (point by point)
+				progress = int((idx + len(points) / len(input_data)) / total_fluids * 100) - 1
+				yield max(progress, 0)
+			self.sink.flush()
+
+			errors = self._points_to_outputs(points, fluid)[1]
+			print(f'Non computed values for {self.var_name} = {errors}\n') if errors else None
+		self._close_checkpoint()
+		self._close_sink()
 
 		# Notify that the computations are finished
 		CreateSound().sound1()
 
 		print('Step 3 : Plot the graphs (a web page will open, please wait)')
+		list_outputs = self._get_list_outputs(list_fluid)
 		self._plot_graphs(list_outputs)
 
 		print('Step 4 : Write the results in the output file')
@@ -263,10 +375,91 @@ class SeveralFluidsSimulation:
 		yield 100
 
 
+	def run_adaptive(self, bounds, budget, watch=('COP', 'ṁ_f')):
+		# Only the first column of the input file is used, var_name varies in bounds = (low, high)
+		# budget => number of points computed for each fluid
+
+		print('Step 0 : Loading the input file')
+		input_file = ExcelToPython(input_file=self.input_file)
+
+		print('Step 1 : Loading the input data from the input file (first column)')
+		base_data = input_file.get_data()[0]
+		self._validate([base_data])
+
+		print('Step 2 : Solving the heat pump model (adaptive sampling)')
+		list_fluid = self._get_list_fluid([base_data])
+		self._open_sink(input_file)
+		for i in list_fluid:
+			print('\033[1m' + f'\nComputation for {i}' + '\033[0m')
+			self._get_adaptive_outputs(base_data, i, bounds, budget, watch)
+		self._close_sink()
+
+		# Notify that the computations are finished
+		CreateSound().sound1()
+
+		print('Step 3 : Plot the graphs')
+		list_outputs = self._get_list_outputs(list_fluid)
+		self._plot_graphs(list_outputs)
+
+		print('Step 4 : Write the results in the output file')
+		input_file.write_fluid_results(list_outputs)
+
+
+	def run_inverse(self, design, target, value, initial=None):
+		# Inverse design for each fluid: value of the design variable ('V' or 'ω') giving the target
+		# ('T_co' in °C, 'Q_cd' in W or 'COP'), starting from the first column of the input file
+		# initial => starting value of the design variable (else the value of the first column)
+
+		print('Step 0 : Loading the input file')
+		input_file = ExcelToPython(input_file=self.input_file)
+
+		print('Step 1 : Loading the input data from the input file (first column)')
+		base_data = input_file.get_data()[0]
+		if initial is not None:
+			base_data[design] = initial
+		self._validate([base_data], var_name=design)
+
+		print(f'Step 2 : Solving the inverse heat pump model ({target} = {value})')
+		list_fluid = self._get_list_fluid([base_data])
+		self._open_sink(input_file, var_name=design)
+		points = {}
+		for index, fluid in enumerate(list_fluid):
+			data = dict(base_data)
+			data['fluid'] = fluid
+			points[fluid] = self.solve_inverse(data, design, target, value, index)
+			self.sink.add(points[fluid], fluid)
+			self.sink.flush()
+		self._close_sink()
+
+		# Notify that the computations are finished
+		CreateSound().sound1()
+
+		print(f"\n{'Fluid':<12}{design:>12}{'COP':>8}{'T_co (°C)':>11}{'Q_cd (kW)':>11}")
+		for fluid, point in points.items():
+			if point.converged:
+				print(f"{fluid:<12}{point.data[design]:>12.1f}{point.outputs['COP']:>8.2f}{point.outputs['ΔT_cd']:>11.1f}{point.outputs['P_cond']/1000:>11.1f}")
+			else:
+				print(f"{fluid:<12}{'-':>12}   ({point.error})")
+
+		print('Step 3 : Write the results in the output file')
+		converged = [point for point in points.values() if point.converged]
+		columns = {'fluid': [point.data['fluid'] for point in converged], design: [point.data[design] for point in converged]}
+		for name in ('COP', 'ΔT_cd', 'P_cond', 'P_comp', 'ṁ_f'):
+			columns[name] = [point.outputs[name] for point in converged]
+		input_file.write_results(**columns)
+
+		return points
+
+
+	def run_scenarios(self, workers=1, var_names=None):
+		# Several scenarios in parallel: input sheets of a workbook or input files of a directory (see ScenarioBatch.py)
+		return ScenarioBatch(self, workers, var_names).run()
+
+
 # Class 2 : Simulation for one fluid
 
 
-class OneFluidSimulation:
+class OneFluidSimulation(SimulationBase):
 	# Main Variables:
 
 		# var_name		=> The name of the variable parameter to be varied
@@ -289,7 +482,12 @@ class OneFluidSimulation:
 			  first_initial_guess	= [370, 250, 330, 290], # Default value
 			  verif					= True,					# Default value
 			  criteria_1			= 1e-3,					# Default value
-			  criteria_2			= 1e-6					# Default value
+			  criteria_2			= 1e-6,					# Default value
+			  progressive			= False,				# Default value
+			  store					= None,					# Default value
+			  warm_start			= None,					# Default value
+			  export				= 'auto',				# Default value
+			  validate				= True					# Default value
 			  ):
 		
 		# Input values
@@ -300,108 +498,111 @@ class OneFluidSimulation:
 		self.criteria_1	= criteria_1
 		self.criteria_2	= criteria_2
 		self.first_initial_guess = first_initial_guess
+		self.progressive = progressive	# coarse to fine order (see ProgressiveOrder.py)
+		self.store		= store			# stored results of the points already computed (see ResultStore.py)
+		self.warm_start	= warm_start	# index of the past solutions, used as initial guesses (see WarmStartIndex.py)
+		self.export		= export		# columnar copy of the results next to the Excel file (format, see ColumnarResults.py)
+		self.results	= []			# ColumnarResults of the run
+		self.validate	= validate		# check of all the points before solving (see InputValidation.py)
+
+
+	def _point_outputs(self, data, solution, results):
+		# Extract key results from the computation of one operating point.
+
+		return {
+			# Extract results
+			'T_2'	 : solution[0]-273.15,	# results in °C
+			'T_3'	 : solution[1]-273.15,	# results in °C
+			'T_cd'	 : solution[2]-273.15,	# results in °C
+			'T_ev'	 : solution[3]-273.15,	# results in °C
+			# Extract the post-computation results
+			'P_evap' : results.power['evap'],
+			'P_cond' : results.power['cond'],
+			'P_comp' : results.power['comp'],
+			'ΔT_lift': results.ΔT_lift,
+			'ΔT_cd'	 : results.ΔT_cd,
+			'COP'	 : results.COP,
+			'ṁ_f'	 : results.ṁ_f,
+			}
 
 
-	def _computation(self, data, initial_guess):
-		# Perform the main computation by solving the heat pump model for a given input and initial guess.
-
-		inputs				= PreComputation(data).format_inputs()		# Format the inputs
-		heat_pump_model		= HeatPump(inputs)							# See details of the model in the file HeatPump.py
-		solution, residuals	= heat_pump_model.solve_v2(initial_guess)	# Solve the non linear system
-		results				= PostComputation(inputs, solution)			# Values of the hp, computed thanks to the solutions
-		
-		return solution, residuals, results
-
+	def iter_points(self, data_list, progressive=None):
+		# Solve the heat pump model and yield each point as soon as it is solved (see PointResult.py).
+		# The nearest converged solution is used as initial guess if the first initial guess diverges.
+		# progressive=True => coarse to fine order (see ProgressiveOrder.py), by default self.progressive
 
-	def _results_extraction(self, data, outputs, solution, results):
-		# Extract key results from the computation and append them to the outputs dictionary.
+		progressive = self.progressive if progressive is None else progressive
+		solutions = {} # index => converged solution
 
-		# Extract results
-		outputs['T_2'].append(solution[0]-273.15)	# results in °C
-		outputs['T_3'].append(solution[1]-273.15)	# results in °C
-		outputs['T_cd'].append(solution[2]-273.15)	# results in °C
-		outputs['T_ev'].append(solution[3]-273.15)	# results in °C
-		# outputs['ΔT_lift'].append(solution[2] - solution[3])
-		
+		for index in self._get_order(len(data_list), progressive):
+			point = self._solve_point(index, data_list[index], self._get_previous_solution(solutions, index))
+			if point.converged:
+				solutions[index] = point.solution
 
-		# Set the x axis of the graphs
-		outputs[self.var_name].append(data[self.var_name])
+			yield point
 
-		# Extract the post-computation results
-		
-		outputs['P_evap'].append(results.power['evap'])
-		outputs['P_cond'].append(results.power['cond'])
-		outputs['P_comp'].append(results.power['comp'])
-		outputs['ΔT_lift'].append(results.ΔT_lift)
-		outputs['ΔT_cd'].append(results.ΔT_cd)
-		outputs['COP'].append(results.COP)
-		outputs['ṁ_f'].append(results.ṁ_f)
 
-		return outputs
+	def iter_previews(self, data_list):
+		# Progressive order: yield the outputs (sorted by var_name) each time a level is finished
+		# => a coarse curve is available after a few points, then refined until all the points are computed
 
+		ends = self._get_level_ends(len(data_list))
+		points = []
 
-	def _check_residuals(self, residuals):
-		# Verify if the residuals meet the convergence criteria defined above.
-		condition_1 = max(abs(r) for r in residuals) > self.criteria_1
-		condition_2 = abs(residuals[-1]) 			 > self.criteria_2
-		return condition_1 or condition_2
+		for point in self.iter_points(data_list, progressive=True):
+			points.append(point)
+			if len(points) in ends:
+				yield self._points_to_outputs(points)[0]
 
 
-	def _get_previous_solution(self, outputs, i):
-		# Retrieve the solution from the previous iteration to use as the initial guess for better convergence.
-		return [
-			outputs['T_2'][i-1]  +273.15,	# initial guess in K
-			outputs['T_3'][i-1]  +273.15,	# initial guess in K
-			outputs['T_cd'][i-1] +273.15,	# initial guess in K
-			outputs['T_ev'][i-1] +273.15	# initial guess in K
-			]
-		
+	def _validate(self, data_list):
+		# Check all the points before solving, ValueError with the report if a point cannot be solved
+		if self.validate:
+			InputValidation(data_list, var_name=self.var_name).check()
 
-	def _get_outputs(self, data_list):
-		# Compute and collect results for a specific fluid over a range of variable parameter values.
 
-		outputs = {
+	def _new_outputs(self, fluid=None):
+		# Empty outputs dictionary, filled point by point with _results_extraction (the fluid is set in the input file).
+		return {
 			'T_cd': [], 'P_cond': [], 'COP'	   : [],
 			'T_ev': [], 'P_evap': [], 'ṁ_f'	   : [],
 			'T_2' : [], 'P_comp': [], 'ΔT_cd'  : [],
 			'T_3' : [],				  'ΔT_lift': [],
 			self.var_name: []
 			}
-		errors = []
-		i = 0
 
-		for data in data_list:
-			try:
-				# STEP 1: Compute
-				solution, residuals, results = self._computation(data, self.first_initial_guess)
 
-				# STEP 2: If the computation diverged, use the previous solution as initial guess
-				if i != 0 and self._check_residuals(residuals):
-					solution, residuals, results = self._computation(data, self._get_previous_solution(outputs, i))
+	def _get_outputs(self, data_list):
+		# Compute and collect results for a specific fluid over a range of variable parameter values.
+
+		points = list(self.iter_points(data_list))
+		self.results.append(ColumnarResults.from_points(points, self.var_name))
+		outputs, errors = self._points_to_outputs(points)
 
-				# STEP 3: Print residuals if verification is requested
-				if self.verif:
-					print([f"{abs(num):.3e}" for num in residuals])
+		print(f'Non computed values for {self.var_name} = {errors}\n') if errors else None
 
-				# STEP 4: Do not consider the computation if the results fail to meet the convergence criteria
-				if self._check_residuals(residuals):
-					raise Exception('Solutions Divergence')
+		return outputs
 
-				# STEP 5: Extract outputs from the results
-				outputs = self._results_extraction(data, outputs, solution, results)
 
-				i += 1
+	def _get_adaptive_outputs(self, base_data, bounds, budget, watch):
+		# Same as _get_outputs, but the values of var_name are chosen by the adaptive sampling (see AdaptiveSampling.py)
 
-			except Exception as e:
-				# print(e)
-				# The computation may fail (pbm of convergence, not realistic inputs, ...)
-				errors.append(data[self.var_name])
+		points = AdaptiveSampling(self, base_data, bounds, budget, watch).get_points()
+		self.results.append(ColumnarResults.from_points(points, self.var_name))
+		outputs, errors = self._points_to_outputs(points)
 
 		print(f'Non computed values for {self.var_name} = {errors}\n') if errors else None
 
 		return outputs
 
 
+	def _export_results(self, input_file):
+		# Columnar copy of the results of the run next to the Excel file (see ColumnarResults.py)
+		if self.export and self.results:
+			path = ColumnarResults.concatenate(self.results).save(os.path.splitext(input_file.output_file)[0], self.export)
+			print(f'The results are also written in the file:\n{path}\n')
+
+
 	def _plot_graphs(self, outputs):
 		# Subplot with 2 rows and 2 columns
 		fig = make_subplots(rows=2, cols=2, subplot_titles=(
@@ -464,8 +665,10 @@ class OneFluidSimulation:
 
 		print('Step 1: Loading the input data from the input file')
 		input_data = input_file.get_data()
+		self._validate(input_data)
 		
 		print('Step 2: Solving the heat pump model')
+		self.results = []
 		outputs = self._get_outputs(input_data)
 
 		print('Step 3: Plot the results')
@@ -473,6 +676,7 @@ class OneFluidSimulation:
 
 		print('Step 4: Write the results in the output file')
 		input_file.write_results(**outputs)
+		self._export_results(input_file)
 
 
 	def run_test3(self):
@@ -482,8 +686,10 @@ class OneFluidSimulation:
 
 		print('Step 1: Loading the input data from the input file')
 		input_data = input_file.get_data()
+		self._validate(input_data)
 		
 		print('Step 2: Solving the heat pump model')
+		self.results = []
 		outputs = self._get_outputs(input_data)
 
 		print('Step 3: Plot the results')
@@ -491,9 +697,11 @@ class OneFluidSimulation:
 
 		print('Step 4: Write the results in the output file')
 		input_file.write_results(**outputs)
+		self._export_results(input_file)
 	
 
-	def run_with_progress(self):
+	def run_with_progress(self, preview=None):
+		# preview => function called with [outputs] at the end of each level (progressive order)
 
 		print('Step 0: Loading the input file')
 		input_file = ExcelToPython(input_file=self.input_file)
@@ -501,11 +709,24 @@ class OneFluidSimulation:
 
 		print('Step 1: Loading the input data from the input file')
 		input_data = input_file.get_data()
+		self._validate(input_data)
 		yield 20
 		
 		print('Step 2: Solving the heat pump model')
-		outputs = self._get_outputs(input_data)
-		yield 80
+		self.results = []
+		ends = self._get_level_ends(len(input_data))
+		points = []
+		for point in self.iter_points(input_data):
+			points.append(point)
+			if preview and self.progressive and len(points) in ends:
+				preview([self._points_to_outputs(points)[0]])
+
+			# Progress from 20 to 80 point by point
+			yield 20 + int(60 * len(points) / len(input_data))
+
+		self.results.append(ColumnarResults.from_points(points, self.var_name))
+		outputs, errors = self._points_to_outputs(points)
+		print(f'Non computed values for {self.var_name} = {errors}\n') if errors else None
 
 		# Notify that the computations are finished
 		CreateSound().sound1()
@@ -516,4 +737,33 @@ class OneFluidSimulation:
 
 		print('Step 4: Write the results in the output file')
 		input_file.write_results(**outputs)
-		yield 100
\ No newline at end of file
+		self._export_results(input_file)
+		yield 100
+
+
+	def run_adaptive(self, bounds, budget, watch=('COP', 'ṁ_f')):
+		# Only the first column of the input file is used, var_name varies in bounds = (low, high)
+		# budget => number of points computed
+
+		print('Step 0: Loading the input file')
+		input_file = ExcelToPython(input_file=self.input_file)
+
+		print('Step 1: Loading the input data from the input file (first column)')
+		base_data = input_file.get_data()[0]
+		self._validate([base_data])
+
+		print('Step 2: Solving the heat pump model (adaptive sampling)')
+		self.results = []
+		outputs = self._get_adaptive_outputs(base_data, bounds, budget, watch)
+
+		print('Step 3: Plot the results')
+		self._plot_graphs(outputs)
+
+		print('Step 4: Write the results in the output file')
+		input_file.write_results(**outputs)
+		self._export_results(input_file)
+
+
+	def run_scenarios(self, workers=1, var_names=None):
+		# Several scenarios in parallel: input sheets of a workbook or input files of a directory (see ScenarioBatch.py)
+		return ScenarioBatch(self, workers, var_names).run()
\ No newline at end of file
@@ -0,0 +1,171 @@
+from Model_HTHP.__init__ 		 import *
+from Model_HTHP.HeatPump 		 import *
+from Model_HTHP.PostComputation  import *
+from Model_HTHP.PreComputation	 import *
+from Model_HTHP.PointResult		 import *
+from Model_HTHP.ResultStore		 import *
+from Model_HTHP.ProgressiveOrder import *
+
+
+"""
+The class solves the operating points, shared by SeveralFluidsSimulation and OneFluidSimulation (see Simulation.py).
+
+Attributes of the simulations used here:
+	first_initial_guess, criteria_1, criteria_2, verif, var_name, store, warm_start
+	restarts	=> number of solves started again from the last solution when the previous solution diverges
+
+Methods of the simulations used here:
+	_point_outputs(data, solution, results)	=> outputs of a converged point
+	_new_outputs(fluid)						=> empty outputs dictionary
+
+"""
+
+
+class SimulationBase(ProgressiveOrder):
+	restarts = 0
+
+
+	def _computation(self, data, initial_guess, warm_start=None):
+		# Perform the main computation by solving the heat pump model for a given input and initial guess.
+		# With a warm start index, the initial guess is the nearest past solution (if any).
+
+		inputs				= PreComputation(data).format_inputs()		# Format the inputs
+		heat_pump_model		= HeatPump(inputs, warm_start)				# See details of the model in the file HeatPump.py
+		initial_guess		= heat_pump_model.get_initial_guess(initial_guess)
+		solution, residuals	= heat_pump_model.solve_v2(initial_guess)	# Solve the non linear system
+		results				= PostComputation(inputs, solution)			# Values of the hp, computed thanks to the solutions
+
+		return inputs, solution, residuals, results
+
+
+	def _results_extraction(self, point, outputs):
+		# Append the outputs of a converged point to the outputs dictionary.
+
+		# Set the x axis of the graphs
+		outputs[self.var_name].append(point.data[self.var_name])
+
+		for name, value in point.outputs.items():
+			outputs[name].append(value)
+
+		return outputs
+
+
+	def _check_residuals(self, residuals):
+		# Verify if the residuals meet the convergence criteria defined above.
+		condition_1 = max(abs(r) for r in residuals) > self.criteria_1
+		condition_2 = abs(residuals[-1]) 			 > self.criteria_2
+		return condition_1 or condition_2
+
+
+	def _get_store_key(self, data):
+		# Key of the operating point in the store (None if the inputs cannot be formatted)
+		try:
+			inputs = PreComputation(data).format_inputs()
+		except Exception:
+			return None
+		settings = {
+			'simulation'	: type(self).__name__,
+			'initial_guess'	: [float(T) for T in self.first_initial_guess],
+			'criteria'		: [self.criteria_1, self.criteria_2],
+			'outputs'		: ResultStore.get_code_version(type(self)._point_outputs),
+			}
+		return self.store.get_key(inputs, settings)
+
+
+	def _solve_point(self, index, data, previous_solution):
+		# Solve one operating point and store everything in a PointResult (see PointResult.py).
+
+		start = time.perf_counter()
+		point = PointResult(index, data)
+
+		# Same operating point already computed (see ResultStore.py)
+		key = self._get_store_key(data) if self.store else None
+		stored = self.store.get(key, index, data) if key else None
+		if stored is not None:
+			stored.time = time.perf_counter() - start
+			return stored
+
+		try:
+			# STEP 1: Compute with the nearest past solution (see WarmStartIndex.py), else the first initial guess
+			use_index = self.warm_start is not None and self.warm_start.size(data['fluid']) > 0
+			inputs, solution, residuals, results = self._computation(data, self.first_initial_guess, self.warm_start)
+			if use_index and self._check_residuals(residuals):
+				inputs, solution, residuals, results = self._computation(data, self.first_initial_guess)
+
+			# STEP 2: If the computation diverged, use the previous solution as initial guess (then the last solution)
+			if previous_solution is not None and self._check_residuals(residuals):
+				inputs, solution, residuals, results = self._computation(data, previous_solution)
+				for _ in range(self.restarts):
+					if not self._check_residuals(residuals):
+						break
+					inputs, solution, residuals, results = self._computation(data, solution)
+
+			point.inputs, point.solution, point.residuals = inputs, solution, residuals
+
+			# STEP 3: Print residuals if verification is requested
+			if self.verif:
+				print([f"{abs(num):.3e}" for num in residuals])
+
+			# STEP 4: Do not consider the computation if the results fail to meet the convergence criteria
+			if self._check_residuals(residuals):
+				raise Exception('Solutions Divergence')
+
+			# STEP 5: Extract outputs from the results
+			point.outputs = self._point_outputs(data, solution, results)
+			self.store.put(key, point) if key else None
+			self.warm_start.add(inputs, solution) if self.warm_start is not None else None
+
+		except Exception as e:
+			# The computation may fail (pbm of convergence, not realistic inputs, ...)
+			point.error = str(e) or type(e).__name__
+
+		point.time = time.perf_counter() - start
+		return point
+
+
+	def solve_inverse(self, data, design, target, value, index=0):
+		# Inverse design: value of the design variable ('V' in cm3 or 'ω' in rpm) giving the target
+		# ('T_co' in °C, 'Q_cd' in W or 'COP') in one solve of the heat pump model, instead of a sweep of the design variable
+		# The value of the design variable in data is the starting point.
+
+		start = time.perf_counter()
+		point = PointResult(index, dict(data))
+
+		# Initial guess: operating point with the starting value of the design variable
+		guess = self._solve_point(index, data, None)
+		initial_guess = guess.solution if guess.converged else self.first_initial_guess
+
+		try:
+			inputs				= PreComputation(data).format_inputs()
+			heat_pump_model		= HeatPump(inputs)
+			solution, x, residuals = heat_pump_model.solve_inverse(initial_guess, design, target, value + 273.15 if target == 'T_co' else value)
+
+			if self._check_residuals(residuals):
+				raise Exception('Solutions Divergence')
+
+			# Design variable in the units of the input file (the conversion of PreComputation is linear)
+			point.data[design]	= data[design] * x / inputs[design]
+			point.inputs		= PreComputation(point.data).format_inputs()
+			point.solution, point.residuals = solution, residuals
+			point.outputs		= self._point_outputs(point.data, solution, PostComputation(point.inputs, solution))
+
+		except Exception as e:
+			point.error = str(e) or type(e).__name__
+
+		point.time = time.perf_counter() - start
+		return point
+
+
+	def _points_to_outputs(self, points, fluid=None):
+		# Collect the outputs of the points (PointResult) in the outputs dictionary, sorted as the input data.
+
+		outputs = self._new_outputs(fluid)
+		errors = []
+
+		for point in sorted(points, key=lambda point: point.index):
+			if point.converged:
+				outputs = self._results_extraction(point, outputs)
+			else:
+				errors.append(point.data[self.var_name])
+
+		return outputs, errors
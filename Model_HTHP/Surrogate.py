@@ -0,0 +1,200 @@
+from Model_HTHP.__init__				import *
+from Model_HTHP.DesignOfExperiments	import *
+from scipy.interpolate				import RBFInterpolator
+import itertools
+import json
+
+
+"""
+The class fits a fast model (surrogate) of the heat pump for one fluid, from points solved by the real model,
+for the optimisation loops and the annual simulations (a few µs per point instead of one solve of HeatPump).
+
+Training:
+	Surrogate.train(base_data, factors, n_samples=200, method='auto', workers=4)
+		base_data	: ,		Data of one column (see ExcelToPython.get_data), used for all the fixed inputs (and the fluid)
+		factors		: ,		{name: (low, high), ...}, inputs of the surrogate = domain of validity
+	=> the samples are solved with a Sobol design (see DesignOfExperiments.py), the failed points are not used
+
+Methods:
+	'polynomial'	=> polynomial response surface of the given degree (least squares on the scaled inputs)
+	'rbf'			=> radial basis functions (thin plate spline, scipy.interpolate.RBFInterpolator)
+	'auto'			=> the method with the lowest cross-validated error
+
+Cross-validation:
+	cross_validate(k=5) => for each output, RMSE and maximum error of k-fold cross-validation (report() prints them)
+
+API (same outputs as PostComputation, numbers or numpy arrays broadcast together):
+	surrogate.COP(T_ci=..., ω=...)
+	surrogate.power(T_ci=..., ω=...)		=> {'evap': , 'cond': , 'comp': } in W
+	surrogate.ṁ_f(...), surrogate.ΔT_cd(...), surrogate.ΔT_lift(...)
+	surrogate.predict(...)					=> all the outputs of OneFluidSimulation._point_outputs
+
+Out of the domain of the factors, the points are solved by the real model (see SimulationBase._solve_point).
+
+Storage:
+	save(file_path) / Surrogate.load(file_path)	(.npz file with the samples, the model is fitted again when loaded)
+
+"""
+
+
+class Surrogate:
+	def __init__(self, base_data, factors, X, Y,		# values to be set
+			method	= 'auto',							# default values
+			degree	= 3,								# default values
+			):
+		if method not in ('polynomial', 'rbf', 'auto'):
+			raise ValueError(f"Unknown method '{method}', use 'polynomial', 'rbf' or 'auto'")
+
+		self.base_data	= base_data
+		self.factors	= {name: (float(low), float(high)) for name, (low, high) in factors.items()}
+		self.X			= np.asarray(X, dtype=float)	# samples, shape (n, len(factors))
+		self.Y			= {name: np.asarray(values, dtype=float) for name, values in Y.items()}
+		self.degree		= degree
+		self.scores		= {}
+
+		if method == 'auto':
+			# Cross-validation of each candidate, the scores of the best one are kept (see report)
+			errors, scores = {}, {}
+			for candidate in ('polynomial', 'rbf'):
+				self.method = candidate
+				scores[candidate] = self.cross_validate()
+				errors[candidate] = np.mean([score['RMSE'] / (np.ptp(self.Y[name]) or 1) for name, score in scores[candidate].items()])
+			method = min(errors, key=errors.get)
+			self.scores = scores[method]
+		self.method = method
+		self.models = self._fit(self.X, self.Y)
+
+		# Real model for the points out of the domain
+		self.simulation = OneFluidSimulation(None, self.names[0], verif=False)
+
+
+	@property
+	def names(self):
+		return list(self.factors)
+
+
+	@classmethod
+	def train(cls, base_data, factors, n_samples=200, seed=None, method='auto', degree=3, **kwargs):
+		# Solve the samples (kwargs: workers, store, warm_start, ... see DesignOfExperiments) and fit the surrogate
+		results = DesignOfExperiments(base_data, factors, method='sobol', n_samples=n_samples, seed=seed, **kwargs).run()
+
+		converged = results['converged']
+		X = np.column_stack([results['factors'][name][converged] for name in factors])
+		Y = {name: values[converged] for name, values in results['outputs'].items()}
+		return cls(base_data, factors, X, Y, method, degree)
+
+
+	def _scale(self, X):
+		# Inputs scaled in [-1, 1] on the domain of the factors
+		low, high = np.array(list(self.factors.values())).T
+		return 2 * (X - low) / (high - low) - 1
+
+
+	def _features(self, X):
+		# Monomials of the scaled inputs, up to the degree of the polynomial
+		X = self._scale(X)
+		columns = [np.ones(len(X))]
+		for d in range(1, self.degree + 1):
+			for combination in itertools.combinations_with_replacement(range(X.shape[1]), d):
+				columns.append(np.prod(X[:, combination], axis=1))
+		return np.column_stack(columns)
+
+
+	def _fit(self, X, Y):
+		# One model per output
+		if self.method == 'polynomial':
+			features = self._features(X)
+			return {name: np.linalg.lstsq(features, y, rcond=None)[0] for name, y in Y.items()}
+		return {name: RBFInterpolator(self._scale(X), y, kernel='thin_plate_spline', degree=1) for name, y in Y.items()}
+
+
+	def _evaluate(self, models, X):
+		if self.method == 'polynomial':
+			features = self._features(X)
+			return {name: features @ coefficients for name, coefficients in models.items()}
+		return {name: model(self._scale(X)) for name, model in models.items()}
+
+
+	def cross_validate(self, k=5, seed=0):
+		# k-fold cross-validation: RMSE and maximum error of each output on the points not used for the fit
+
+		folds = np.array_split(np.random.default_rng(seed).permutation(len(self.X)), k)
+		errors = {name: np.zeros(len(self.X)) for name in self.Y}
+
+		for fold in folds:
+			train = np.setdiff1d(np.arange(len(self.X)), fold)
+			models = self._fit(self.X[train], {name: y[train] for name, y in self.Y.items()})
+			for name, prediction in self._evaluate(models, self.X[fold]).items():
+				errors[name][fold] = prediction - self.Y[name][fold]
+
+		self.scores = {name: {'RMSE': float(np.sqrt(np.mean(e ** 2))), 'max': float(np.max(np.abs(e)))} for name, e in errors.items()}
+		return self.scores
+
+
+	def report(self):
+		scores = self.scores or self.cross_validate()
+		print(f"Surrogate of {self.base_data['fluid']} ({self.method}, {len(self.X)} points)")
+		print(f"{'Output':<10}{'Range':>14}{'RMSE':>12}{'Max error':>12}")
+		for name, score in scores.items():
+			print(f"{name:<10}{np.ptp(self.Y[name]):>14.4g}{score['RMSE']:>12.4g}{score['max']:>12.4g}")
+
+
+	def predict(self, **queries):
+		# All the outputs at the queries, the points out of the domain are solved by the real model
+
+		missing = set(self.names) - set(queries)
+		if missing:
+			raise KeyError(f'Missing inputs of the surrogate: {sorted(missing)}')
+
+		values	= np.broadcast_arrays(*[np.asarray(queries[name], dtype=float) for name in self.names])
+		shape	= values[0].shape
+		X		= np.column_stack([v.ravel() for v in values])
+		outputs	= self._evaluate(self.models, X)
+
+		# Out-of-domain guard
+		low, high = np.array(list(self.factors.values())).T
+		for i in np.flatnonzero(np.any((X < low) | (X > high), axis=1)):
+			data = dict(self.base_data)
+			data.update({name: float(value) for name, value in zip(self.names, X[i])})
+			point = self.simulation._solve_point(i, data, None)
+			for name in outputs:
+				outputs[name][i] = point.outputs[name] if point.converged else np.nan
+
+		return {name: value.reshape(shape) for name, value in outputs.items()}
+
+
+	def COP(self, **queries):
+		return self.predict(**queries)['COP']
+
+
+	def power(self, **queries):
+		outputs = self.predict(**queries)
+		return {'evap': outputs['P_evap'], 'cond': outputs['P_cond'], 'comp': outputs['P_comp']}
+
+
+	def ṁ_f(self, **queries):
+		return self.predict(**queries)['ṁ_f']
+
+
+	def ΔT_cd(self, **queries):
+		return self.predict(**queries)['ΔT_cd']
+
+
+	def ΔT_lift(self, **queries):
+		return self.predict(**queries)['ΔT_lift']
+
+
+	def save(self, file_path):
+		os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+		header = {'factors': self.factors, 'outputs': list(self.Y), 'base_data': self.base_data,
+				  'method': self.method, 'degree': self.degree}
+		arrays = {f'Y_{j}': y for j, y in enumerate(self.Y.values())}
+		np.savez_compressed(file_path, header=json.dumps(header, ensure_ascii=False), X=self.X, **arrays)
+
+
+	@classmethod
+	def load(cls, file_path):
+		with np.load(file_path) as file:
+			header	= json.loads(str(file['header']))
+			Y		= {name: file[f'Y_{j}'] for j, name in enumerate(header['outputs'])}
+			return cls(header['base_data'], header['factors'], file['X'], Y, header['method'], header['degree'])
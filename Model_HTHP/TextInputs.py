@@ -0,0 +1,126 @@
+from Model_HTHP.__init__ import *
+import argparse
+import json
+import csv
+
+# Optional: the YAML files need PyYAML
+try:
+	import yaml
+except ImportError:
+	yaml = None
+
+
+"""
+The class reads and writes the input data of the heat pump model in text files (CSV, JSON or YAML),
+instead of the Excel input files: same data as ExcelToPython.get_data (one dictionary per operating point).
+
+Formats:
+	.csv			=> one line per operating point, first line = names of the inputs
+						fluid,V,r,n,Cv,ω,fluid_c,T_ci,P_ci,ṁ_c,UA_cd,fluid_e,T_ei,P_ei,ṁ_e,UA_ev,ΔT_s
+						R134a,35,0.03,1.2,0.75,3500,water,17.98,101325,0.28,200,water,14.01,101325,0.11,200,10
+	.json / .yaml	=> list of operating points [{'fluid': 'R134a', 'V': 35, ...}, ...]
+					   or {'base': {...}, 'points': [{'T_ci': 20}, {'T_ci': 30}, ...]}
+					   => each point is the base data updated with the values of the point (generated sweeps)
+
+Units and names: same as the Excel input files (see ExcelToPython.rows).
+Other inputs can be added to the points (e.g. 'condenser': 'zones'), they are given to the model as they are.
+
+Conversion of the Excel input files:
+	python -m Model_HTHP.TextInputs Excel_Inputs/Inputs_T4a.xlsx Excel_Inputs/Inputs_T4b.xlsx --format csv
+	=> Excel_Inputs/Inputs_T4a.csv, Excel_Inputs/Inputs_T4b.csv (--directory to write them elsewhere)
+
+"""
+
+
+class TextInputs:
+	extensions	= ('.csv', '.json', '.yaml', '.yml')
+	names		= [							# inputs needed by the model (rows of the Excel input files)
+		'fluid', 'V', 'r', 'n', 'Cv', 'ω',
+		'fluid_c', 'T_ci', 'P_ci', 'ṁ_c', 'UA_cd',
+		'fluid_e', 'T_ei', 'P_ei', 'ṁ_e', 'UA_ev',
+		'ΔT_s',
+		]
+
+
+	@staticmethod
+	def _parse(text):
+		# Value of a cell of a CSV file: int, float or string (empty => None)
+		text = text.strip()
+		if text == '':
+			return None
+		for type_ in (int, float):
+			try:
+				return type_(text)
+			except ValueError:
+				pass
+		return text
+
+
+	@classmethod
+	def _check(cls, data_list, file_path):
+		for index, data in enumerate(data_list):
+			missing = [name for name in cls.names if name not in data]
+			if missing:
+				raise ValueError(f'{file_path}: the operating point n°{index + 1} has no value for {missing}')
+		return data_list
+
+
+	@classmethod
+	def read(cls, file_path):
+		# List with the data of each operating point (see ExcelToPython.get_data)
+		extension = os.path.splitext(file_path)[1].lower()
+		if extension not in cls.extensions:
+			raise ValueError(f"Unknown input format '{extension}', use one of {cls.extensions}")
+
+		with open(file_path, newline='', encoding='utf-8') as file:
+			if extension == '.csv':
+				return cls._check([{name: cls._parse(value) for name, value in row.items()} for row in csv.DictReader(file)], file_path)
+			if extension == '.json':
+				content = json.load(file)
+			elif yaml is None:
+				raise ImportError(f'{file_path} needs PyYAML (pip install pyyaml), use a .csv or .json file')
+			else:
+				content = yaml.load(file, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))	# libyaml if available (faster)
+
+		if isinstance(content, dict):
+			content = [dict(content.get('base', {}), **point) for point in content.get('points', [{}])]
+		return cls._check(content, file_path)
+
+
+	@classmethod
+	def write(cls, data_list, file_path):
+		# Write the data of the operating points in a text file (format given by the extension)
+		extension = os.path.splitext(file_path)[1].lower()
+		if extension not in cls.extensions:
+			raise ValueError(f"Unknown input format '{extension}', use one of {cls.extensions}")
+		if extension in ('.yaml', '.yml') and yaml is None:
+			raise ImportError(f'{file_path} needs PyYAML (pip install pyyaml), use a .csv or .json file')
+
+		os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+		with open(file_path, 'w', newline='', encoding='utf-8') as file:
+			if extension == '.csv':
+				names	= list(dict.fromkeys(name for data in [dict.fromkeys(cls.names)] + data_list for name in data))
+				writer	= csv.DictWriter(file, fieldnames=names)
+				writer.writeheader()
+				writer.writerows({name: '' if value is None else repr(value) if isinstance(value, float) else value
+								  for name, value in data.items()} for data in data_list)
+			elif extension == '.json':
+				json.dump(data_list, file, ensure_ascii=False, indent=1)
+			else:
+				yaml.safe_dump(data_list, file, allow_unicode=True, sort_keys=False)
+		return file_path
+
+
+if __name__ == '__main__':
+	from Model_HTHP.ExcelToPython import ExcelToPython
+
+	parser = argparse.ArgumentParser(description='Conversion of the Excel input files in text input files')
+	parser.add_argument('files', nargs='+', help='Excel input files')
+	parser.add_argument('--format', choices=['csv', 'json', 'yaml'], default='csv')
+	parser.add_argument('--directory', default=None, help='directory of the text files (else the directory of each Excel file)')
+	args = parser.parse_args()
+
+	for file_path in args.files:
+		name = os.path.splitext(os.path.basename(file_path))[0] + '.' + args.format
+		text_file = TextInputs.write(ExcelToPython(input_file=file_path).get_data(), os.path.join(args.directory or os.path.dirname(file_path), name))
+		print(f'{file_path} => {text_file}')
@@ -0,0 +1,206 @@
+from Model_HTHP.__init__	import *
+from Model_HTHP.Simulation	import *
+from scipy.stats			import norm
+import itertools
+
+
+"""
+The class propagates the uncertainty of the inputs (n, Cv, r, UA_cd, UA_ev, ...) through the heat pump model
+with a Monte Carlo method, to get the distributions of the outputs (COP, T_co, ...) instead of single values.
+
+Inputs:
+	'base_data'		: ,		Data of one column (see ExcelToPython.get_data), nominal values of all the inputs
+	'distributions'	: ,		{name: distribution, ...} of the uncertain inputs (units of the Excel file)
+								('normal', mean, std)	('uniform', low, high)	('triangular', low, mode, high)
+	'outputs'		: ,		Outputs to study (see OneFluidSimulation._point_outputs), 'ΔT_cd' is T_co in °C
+
+Method:
+	1. The nominal point (base_data) is solved, its solution is the initial guess of all the samples (warm start)
+	2. The samples are drawn and solved by batches (batch_size), in parallel with several workers
+	3. After each batch, the statistics are updated and yielded (see iter_statistics):
+		mean, standard deviation, quantiles 5 % / 50 % / 95 %, fraction of converged samples,
+		half width of the confidence interval of the mean = z * std / sqrt(n)
+	4. Early stopping: when the half width is below tolerance * |mean| for all the outputs (after min_samples),
+	   or when max_samples samples are solved
+
+"""
+
+
+def _solve_batch(simulation, batch, fallback_guess):
+	# Solve a batch of samples in a worker process (must be a module function to be pickled)
+	return [simulation._solve_point(index, data, fallback_guess) for index, data in batch]
+
+
+class UncertaintyPropagation:
+	def __init__(self, base_data, distributions,			# values to be set
+			outputs		= ('COP', 'ΔT_cd'),					# default values
+			batch_size	= 100,								# default values
+			min_samples	= 200,								# default values
+			max_samples	= 5000,								# default values
+			tolerance	= 0.005,							# default values (relative half width of the confidence interval)
+			confidence	= 0.95,								# default values
+			workers		= 1,								# default values
+			seed		= None,								# default values
+			first_initial_guess = [370, 250, 330, 290],		# default values
+			criteria_1	= 1e-3,								# default values
+			criteria_2	= 1e-6,								# default values
+			):
+
+		for name, distribution in distributions.items():
+			if name not in base_data:
+				raise KeyError(f"'{name}' is not an input of the heat pump model (see ExcelToPython.get_data)")
+			if distribution[0] not in ('normal', 'uniform', 'triangular'):
+				raise ValueError(f"Unknown distribution '{distribution[0]}', use 'normal', 'uniform' or 'triangular'")
+
+		self.base_data		= base_data
+		self.distributions	= distributions
+		self.outputs		= list(outputs)
+		self.batch_size		= batch_size
+		self.min_samples	= min_samples
+		self.max_samples	= max_samples
+		self.tolerance		= tolerance
+		self.z				= norm.ppf((1 + confidence) / 2)
+		self.workers		= workers
+		self.random			= np.random.default_rng(seed)
+		self.first_initial_guess = first_initial_guess
+		self.criteria_1		= criteria_1
+		self.criteria_2		= criteria_2
+
+		self.inputs_values	= {name: [] for name in distributions}		# sampled value of each uncertain input
+		self.outputs_values	= {name: [] for name in self.outputs}		# value of each output (NaN if not converged)
+
+
+	def _draw(self, n):
+		# n samples of the uncertain inputs
+		values = {}
+		for name, (law, *parameters) in self.distributions.items():
+			if law == 'normal':
+				values[name] = self.random.normal(*parameters, n)
+			elif law == 'uniform':
+				values[name] = self.random.uniform(*parameters, n)
+			else:
+				values[name] = self.random.triangular(*parameters, n)
+		return values
+
+
+	def _get_batch(self, start, n):
+		# Data of the samples n°start to start + n
+		values = self._draw(n)
+		batch = []
+		for k in range(n):
+			data = dict(self.base_data)
+			data.update({name: float(values[name][k]) for name in self.distributions})
+			batch.append((start + k, data))
+		return batch
+
+
+	def _add_points(self, points):
+		for point in points:
+			for name in self.distributions:
+				self.inputs_values[name].append(point.data[name])
+			for name in self.outputs:
+				self.outputs_values[name].append(point.outputs[name] if point.converged else np.nan)
+
+
+	def get_statistics(self):
+		# Statistics of the outputs over the converged samples
+		n = len(next(iter(self.outputs_values.values())))
+		statistics = {'samples': n, 'converged': 0.0}
+
+		for name, values in self.outputs_values.items():
+			values = np.array(values)
+			values = values[np.isfinite(values)]
+			statistics['converged'] = len(values) / n if n else 0.0
+			if len(values) < 2:
+				statistics[name] = None
+				continue
+			q05, q50, q95 = np.quantile(values, [0.05, 0.5, 0.95])
+			std = float(np.std(values, ddof=1))
+			statistics[name] = {
+				'mean'		: float(np.mean(values)),
+				'std'		: std,
+				'q05'		: float(q05),
+				'median'	: float(q50),
+				'q95'		: float(q95),
+				'half_width': float(self.z * std / np.sqrt(len(values))),
+				}
+		return statistics
+
+
+	def _is_precise(self, statistics):
+		# Early stopping: confidence intervals of the means tight enough for all the outputs
+		if statistics['samples'] < self.min_samples:
+			return False
+		return all(
+			statistics[name] is not None and statistics[name]['half_width'] <= self.tolerance * abs(statistics[name]['mean'])
+			for name in self.outputs
+			)
+
+
+	def iter_statistics(self):
+		# Solve the samples by batches and yield the statistics after each batch
+
+		# STEP 1: Nominal point, its solution is the initial guess of the samples
+		nominal = OneFluidSimulation(None, list(self.distributions)[0], first_initial_guess=self.first_initial_guess, verif=False,
+			criteria_1=self.criteria_1, criteria_2=self.criteria_2)._solve_point(-1, self.base_data, None)
+		if not nominal.converged:
+			raise Exception(f'The nominal point did not converge ({nominal.error})')
+
+		simulation = OneFluidSimulation(None, list(self.distributions)[0], first_initial_guess=list(nominal.solution), verif=False,
+			criteria_1=self.criteria_1, criteria_2=self.criteria_2)
+		n_batches = -(-self.max_samples // self.batch_size)
+		batches = (self._get_batch(k * self.batch_size, min(self.batch_size, self.max_samples - k * self.batch_size))
+				   for k in range(n_batches))
+
+		# STEP 2: Solve the batches, update the statistics after each one
+		if self.workers <= 1:
+			for batch in batches:
+				self._add_points(_solve_batch(simulation, batch, self.first_initial_guess))
+				statistics = self.get_statistics()
+				yield statistics
+				if self._is_precise(statistics):
+					return
+			return
+
+		# Parallel: a few batches in progress for each worker, the next ones are only submitted if needed
+		with ProcessPoolExecutor(max_workers=self.workers) as executor:
+			running = set()
+			for batch in itertools.islice(batches, 2 * self.workers):
+				running.add(executor.submit(_solve_batch, simulation, batch, self.first_initial_guess))
+
+			while running:
+				future = next(as_completed(running))
+				running.remove(future)
+				self._add_points(future.result())
+				statistics = self.get_statistics()
+				yield statistics
+
+				# STEP 3: Early stopping
+				if self._is_precise(statistics):
+					for future in running:
+						future.cancel()
+					return
+				batch = next(batches, None)
+				if batch is not None:
+					running.add(executor.submit(_solve_batch, simulation, batch, self.first_initial_guess))
+
+
+	def run(self, display=True):
+		# Solve the samples until the statistics are precise enough, and return the statistics
+
+		start = time.perf_counter()
+		for statistics in self.iter_statistics():
+			if display:
+				summary = ', '.join(f"{name} = {statistics[name]['mean']:.4g} ± {statistics[name]['half_width']:.2g}"
+									for name in self.outputs if statistics[name] is not None)
+				print(f"{statistics['samples']:>6} samples ({statistics['converged']*100:.0f} % converged): {summary}")
+
+		if display:
+			print(f'\nTime: {time.perf_counter() - start:.1f} s')
+			print(f"{'Output':<10}{'Mean':>10}{'Std':>10}{'5 %':>10}{'Median':>10}{'95 %':>10}")
+			for name in self.outputs:
+				s = statistics[name]
+				if s is not None:
+					print(f"{name:<10}{s['mean']:>10.4g}{s['std']:>10.3g}{s['q05']:>10.4g}{s['median']:>10.4g}{s['q95']:>10.4g}")
+
+		return statistics
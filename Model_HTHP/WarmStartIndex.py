@@ -0,0 +1,158 @@
+from Model_HTHP.__init__ import *
+from scipy.spatial import cKDTree
+import atexit
+import weakref
+
+
+"""
+The class keeps the converged solutions of the past runs, to give a good initial guess for a new operating point.
+
+For each fluid:
+	- the inputs of the heat pump model (see PreComputation.format_inputs) are normalized:
+		log of the scale variables (ṁ_e, ṁ_c, cp_e, cp_c, V, ω), then centered and reduced
+	- a KD-tree gives the nearest past point => its solution [T_2, T_3, T_cd, T_ev] is the initial guess
+	- the new points are first kept in a small buffer (searched point by point),
+	  the KD-tree is only built again when the buffer is full
+
+The index is saved in a .npz file every autosave new points and when Python exits,
+so that it is shared between the sessions (see HeatPump.get_initial_guess).
+
+Parallel runs (DesignOfExperiments, ScenarioBatch with workers > 1):
+	each worker solves with a copy of the index, the points it adds are kept in new_entries
+	=> they are sent back with the results and added to the index of the main process (see merge)
+
+"""
+
+
+_indexes = weakref.WeakSet()	# indexes of the main process, saved when Python exits
+
+
+@atexit.register
+def _save_indexes():
+	for index in list(_indexes):
+		index.save()
+
+
+class WarmStartIndex:
+	# Inputs of the heat pump model used to compare the operating points
+	features	= ['ΔTs', 'T_ei', 'T_ci', 'ṁ_e', 'ṁ_c', 'cp_e', 'cp_c', 'ε_cd', 'ε_ev', 'n', 'r', 'Cv', 'V', 'ω']
+	log_features= ['ṁ_e', 'ṁ_c', 'cp_e', 'cp_c', 'V', 'ω']
+
+
+	def __init__(self, file_path='Cache/warm_start.npz', autosave=100, buffer_size=256):
+		self.file_path	 = file_path
+		self.autosave	 = autosave
+		self.buffer_size = buffer_size
+		self.X			 = {}	# fluid => list of the features of the past points
+		self.Y			 = {}	# fluid => list of the past solutions
+		self.trees		 = {}	# fluid => (KD-tree, number of points in the tree, mean, std)
+		self.new_entries = []	# (fluid, features, solution) added by a worker process, see merge
+		self._new_points = 0
+		self._pid		 = os.getpid()
+
+		if self.file_path and os.path.exists(self.file_path):
+			self.load()
+		if self.file_path:
+			_indexes.add(self)
+
+
+	def _get_features(self, inputs):
+		x = np.array([float(inputs[name]) for name in self.features])
+		log = [self.features.index(name) for name in self.log_features]
+		x[log] = np.log(np.abs(x[log]) + 1e-30)
+		return x
+
+
+	def size(self, fluid):
+		return len(self.X.get(fluid, ()))
+
+
+	def add(self, inputs, solution):
+		# Add a converged point (inputs = formatted inputs, see PreComputation.format_inputs)
+		fluid = inputs['fluid']
+		x = self._get_features(inputs)
+		y = np.array(solution, dtype=float)
+
+		if not (np.all(np.isfinite(x)) and np.all(np.isfinite(y))):
+			return
+
+		if os.getpid() != self._pid:
+			self.new_entries.append((fluid, x, y))
+		self._add_features(fluid, x, y)
+
+
+	def merge(self, entries):
+		# Add the points of a worker process (its new_entries, sent back with its results)
+		for fluid, x, y in entries:
+			self._add_features(fluid, x, y)
+
+
+	def _add_features(self, fluid, x, y):
+		self.X.setdefault(fluid, []).append(x)
+		self.Y.setdefault(fluid, []).append(y)
+
+		self._new_points += 1
+		if self.file_path and self._new_points >= self.autosave:
+			self.save()
+
+
+	def _get_tree(self, fluid):
+		# KD-tree of the fluid, built again when too many points are not in it
+		tree = self.trees.get(fluid)
+		if tree is None or self.size(fluid) - tree[1] > self.buffer_size:
+			X	 = np.array(self.X[fluid])
+			mean = X.mean(axis=0)
+			std	 = X.std(axis=0)
+			std[std == 0] = 1
+			tree = (cKDTree((X - mean) / std), len(X), mean, std)
+			self.trees[fluid] = tree
+		return tree
+
+
+	def query(self, inputs):
+		# Solution of the nearest past point (None if the fluid has no past point)
+		fluid = inputs['fluid']
+		if self.size(fluid) == 0:
+			return None
+
+		tree, n, mean, std = self._get_tree(fluid)
+		x = (self._get_features(inputs) - mean) / std
+
+		# Nearest point in the KD-tree
+		distance, i = tree.query(x)
+
+		# Nearest point in the buffer (points added after the KD-tree)
+		if self.size(fluid) > n:
+			distances = np.sqrt(np.sum(((np.array(self.X[fluid][n:]) - mean) / std - x) ** 2, axis=1))
+			j = int(np.argmin(distances))
+			if distances[j] < distance:
+				i = n + j
+
+		return list(self.Y[fluid][i])
+
+
+	def save(self):
+		# Only the process which created the index writes the file (not the workers, see DesignOfExperiments)
+		if not self.file_path or os.getpid() != self._pid or not self.X:
+			return
+		os.makedirs(os.path.dirname(self.file_path) or '.', exist_ok=True)
+
+		fluids = list(self.X)
+		arrays = {'fluids': np.array(fluids)}
+		for i, fluid in enumerate(fluids):
+			arrays[f'X_{i}'] = np.array(self.X[fluid])
+			arrays[f'Y_{i}'] = np.array(self.Y[fluid])
+
+		# Write a temporary file first, so that a crash never leaves a corrupted index
+		temporary = self.file_path + '.tmp.npz'
+		np.savez(temporary, **arrays)
+		os.replace(temporary, self.file_path)
+		self._new_points = 0
+
+
+	def load(self):
+		with np.load(self.file_path) as file:
+			for i, fluid in enumerate(file['fluids']):
+				self.X[str(fluid)] = list(file[f'X_{i}'])
+				self.Y[str(fluid)] = list(file[f'Y_{i}'])
+		self.trees = {}
@@ -1,6 +1,7 @@
 # Libraries for Heat Pump model
 from CoolProp.CoolProp	import PropsSI
 from scipy.optimize		import least_squares, minimize, root, fsolve, newton, broyden1, anderson, fixed_point, curve_fit
+from scipy.stats		import qmc
 
 # Libraries for plot
 from matplotlib			 import pyplot as plt 
@@ -14,8 +15,10 @@ import random
 import numpy as np
 import sounddevice as sd
 import math
+import time
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Libraries for Excel format
 from openpyxl	import load_workbook
@@ -0,0 +1,50 @@
+from __init__			import *
+from ExcelToPython		import *
+from PreComputation		import *
+from CascadeHeatPump	import *
+
+
+# _test10.py
+
+	# Model of T. B. HERBAS, E. C. BERLINCK, C. A. T URIU, R. P. MARQUES AND J. A. R. PARISE
+	# from 'STEADY-STATE SIMULATION OF VAPOUR-COMPRESSION HEAT PUMPS'
+
+	# Test 10 aims to:
+	# - compute a cascade of two heat pumps (R134a for the low stage, R1233zd(E) for the high stage)
+	#   coupled by a water loop, for a large temperature lift (source at 20 °C, sink at 100 °C)
+	# - compare the number of iterations and the time with one stage alone
+
+	# The 10 equations of the cascade are solved together (Newton iterations, sparse Jacobian by finite differences),
+	# the temperatures of the intermediate loop are outputs of the solve
+
+	# => see details in CascadeHeatPump.py
+
+
+if __name__ == '__main__':
+
+	input_file	= 'Excel_Inputs/Inputs_T4_sizing_plot.xlsx'
+	base_data	= ExcelToPython(input_file=input_file).get_data()[0]
+
+	data_L = dict(base_data, fluid='R134a', V=300, T_ei=20, UA_ev=3000,
+				  fluid_c='water', T_ci=60, P_ci=1e6, ṁ_c=0.5, UA_cd=3000)
+	data_H = dict(base_data, fluid='R1233zd(E)', V=300, T_ci=100, P_ci=1e6, UA_cd=3000,
+				  fluid_e='water', T_ei=60, P_ei=1e6, ṁ_e=0.5, UA_ev=3000)
+
+	# Cascade
+	cascade = CascadeHeatPump(PreComputation(data_L).format_inputs(), PreComputation(data_H).format_inputs())
+	start = time.perf_counter()
+	solution, residuals = cascade.solve()
+	time_cascade = time.perf_counter() - start
+
+	results_L, results_H = cascade.get_results(solution)
+	print(f'Cascade: {cascade.iterations} iterations, {time_cascade*1000:.1f} ms, max residual = {max(abs(r) for r in residuals):.1e}')
+	print(f'	Loop: {solution[8] - 273.15:.1f} °C => {solution[9] - 273.15:.1f} °C')
+	print(f'	COP low stage = {results_L.COP:.3f}, COP high stage = {results_H.COP:.3f}, COP cascade = {cascade.get_COP(solution):.3f}')
+
+	# High stage alone, with the loop temperature found by the cascade,
+	# from the default initial guess (as the cascade) and from an initial guess close to its solution
+	for name, initial_guess in (('default initial guess', [370, 250, 330, 290]), ('close initial guess', solution[4:8] + 10)):
+		heat_pump_model = HeatPump(PreComputation(dict(data_H, T_ei=solution[9] - 273.15)).format_inputs())
+		start = time.perf_counter()
+		heat_pump_model.solve_v2(initial_guess)
+		print(f'One stage ({name}): {(time.perf_counter() - start)*1000:.1f} ms')
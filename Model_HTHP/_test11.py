@@ -0,0 +1,45 @@
+from __init__			import *
+from ExcelToPython		import *
+from PreComputation		import *
+from PostComputation	import *
+from HeatPump			import *
+
+
+# _test11.py
+
+	# Model of T. B. HERBAS, E. C. BERLINCK, C. A. T URIU, R. P. MARQUES AND J. A. R. PARISE
+	# from 'STEADY-STATE SIMULATION OF VAPOUR-COMPRESSION HEAT PUMPS'
+
+	# Test 11 aims to:
+	# - compare the condenser with a constant effectiveness (ε_cd) and the three-zone condenser
+	#   (desuperheating, condensing, subcooling) for R1233zd(E), when T_ci increases
+	# - compare the time of both models
+
+	# The three-zone condenser is chosen with data['condenser'] = 'zones'
+	# (also in the base_data of DesignOfExperiments, PerformanceMap, Surrogate, ...)
+
+	# => see details in HeatPump.py and PropertyTable.py
+
+
+if __name__ == '__main__':
+
+	input_file	= 'Excel_Inputs/Inputs_T3a.xlsx'
+	base_data	= ExcelToPython(input_file=input_file).get_data()[0]
+	base_data.update({'ṁ_c': 0.2, 'UA_cd': 1500, 'ṁ_e': 0.5, 'UA_ev': 1500})
+
+	for condenser in ('effectiveness', 'zones'):
+		print(f'\nCondenser: {condenser}')
+		print(f"{'T_ci':>6}{'T_2':>8}{'T_cd':>8}{'T_co':>8}{'COP':>8}")
+
+		initial_guess	= [345.5, 308.3, 308.3, 273.4]
+		start			= time.perf_counter()
+		for T_ci in range(20, 81, 10):
+			inputs				= PreComputation(dict(base_data, T_ci=T_ci, condenser=condenser)).format_inputs()
+			solution, residuals	= HeatPump(inputs).solve_v2(initial_guess)
+			if max(abs(r) for r in residuals) > 1e-3:
+				print(f'{T_ci:>6}   Solutions Divergence')
+				continue
+			initial_guess	= solution
+			results			= PostComputation(inputs, solution)
+			print(f'{T_ci:>6}{solution[0] - 273.15:>8.1f}{solution[2] - 273.15:>8.1f}{results.ΔT_cd:>8.1f}{results.COP:>8.2f}')
+		print(f'Time: {(time.perf_counter() - start) * 1000:.0f} ms')
@@ -0,0 +1,67 @@
+from __init__			import *
+from ExcelToPython		import *
+from PreComputation		import *
+from PostComputation	import *
+from HeatPump			import *
+from FluidScreening		import *
+from PropertyTable		import *
+
+
+# _test12.py
+
+	# Model of T. B. HERBAS, E. C. BERLINCK, C. A. T URIU, R. P. MARQUES AND J. A. R. PARISE
+	# from 'STEADY-STATE SIMULATION OF VAPOUR-COMPRESSION HEAT PUMPS'
+
+	# Test 12 aims to:
+	# - screen zeotropic mixtures of R32 and R1234ze(E) with the pure fluids (see FluidScreening.py)
+	# - solve the heat pump model with the three-zone condenser for the same fluids, when T_ci increases
+	# - compare the time of the pure fluids and of the mixtures (the tables of the mixtures are built once)
+
+	# A mixture is given with the mole fractions of its components, in the CoolProp format: 'R32[0.3]&R1234ze(E)[0.7]'
+	# T_cd is the bubble temperature and T_ev the dew temperature of the mixture (glide = T_dew - T_bub)
+
+	# => see details in PropertyTable.py and HeatPump.py
+
+
+if __name__ == '__main__':
+
+	input_file	= 'Excel_Inputs/Inputs_T3a.xlsx'
+	base_data	= ExcelToPython(input_file=input_file).get_data()[0]
+	base_data.update({'ṁ_c': 0.2, 'UA_cd': 1500, 'ṁ_e': 0.5, 'UA_ev': 1500, 'condenser': 'zones'})
+
+	list_fluid	= ['R1234ze(E)', 'R32[0.1]&R1234ze(E)[0.9]', 'R32[0.3]&R1234ze(E)[0.7]', 'R32[0.5]&R1234ze(E)[0.5]', 'R32']
+
+	# Tables of the mixtures
+	for fluid in list_fluid:
+		if '&' in fluid:
+			start = time.perf_counter()
+			table = PropertyTable.get(fluid)
+			print(f'{fluid:<26} table: {(time.perf_counter() - start) * 1000:.0f} ms, '
+				  f'glide at 40 °C = {table.T_dew(313.15) - 313.15:.2f} K')
+
+	# Screening
+	print()
+	start = time.perf_counter()
+	FluidScreening([base_data], list_fluid, T_supply=80).select()
+	print(f'Time: {(time.perf_counter() - start) * 1000:.0f} ms')
+
+	# Heat pump model
+	for fluid in list_fluid:
+		print(f'\nFluid: {fluid}')
+		print(f"{'T_ci':>6}{'T_2':>8}{'T_cd':>8}{'T_co':>8}{'COP':>8}")
+
+		first_guess		= [345.5, 308.3, 308.3, 273.4]
+		initial_guess	= first_guess
+		start			= time.perf_counter()
+		for T_ci in range(20, 61, 10):
+			inputs				= PreComputation(dict(base_data, fluid=fluid, T_ci=T_ci)).format_inputs()
+			solution, residuals	= HeatPump(inputs).solve_v2(initial_guess)
+			if max(abs(r) for r in residuals) > 1e-3:
+				solution, residuals	= HeatPump(inputs).solve_v2(first_guess)
+			if max(abs(r) for r in residuals) > 1e-3:
+				print(f'{T_ci:>6}   Solutions Divergence')
+				continue
+			initial_guess	= solution
+			results			= PostComputation(inputs, solution)
+			print(f'{T_ci:>6}{solution[0] - 273.15:>8.1f}{solution[2] - 273.15:>8.1f}{results.ΔT_cd:>8.1f}{results.COP:>8.2f}')
+		print(f'Time: {(time.perf_counter() - start) * 1000:.0f} ms')
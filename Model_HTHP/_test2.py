@@ -15,6 +15,22 @@ from Simulation	import *
 	# - Plots temperatures, COP, compressor power, and mass flow rate
 	# - Requires the input Excel file to be correctly filled out
 
+	# Adaptive sampling:
+	# - run_adaptive(bounds=(low, high), budget=n) only uses the first column of the Excel file
+	# - the n values of var_name are chosen where the COP and ṁ_f change fastest (see AdaptiveSampling.py)
+
+	# Stored results:
+	# - Add store=ResultStore() to reuse the points already computed (e.g. when re-running after a modification of the plots)
+	# - python -m Model_HTHP.ResultStore clear => remove all the stored points (see ResultStore.py)
+
+	# Inverse design:
+	# - solve_inverse(data, 'ω', 'COP', 8) gives the rotation speed (rpm) for which COP = 8, in one solve
+	# - targets: 'T_co' in °C, 'Q_cd' in W or 'COP', design variables: 'V' or 'ω' (see HeatPump.solve_inverse)
+
+	# Warm start:
+	# - Add warm_start=WarmStartIndex() to start each point from the solution of the nearest past point (see WarmStartIndex.py)
+	# - the index is saved in Cache/warm_start.npz and grows with every run
+
 	# => see details in OneFluidSimulation.py
 
 
@@ -24,6 +24,37 @@ from Simulation	import *
 	# Simply enter "_" in the fluid field
 	# The code will automatically test several possible fluids
 
+	# Long runs:
+	# - Add checkpoint_file='Excel_Outputs/checkpoint.jsonl' to save each finished point
+	# - Add resume=True to restart from this file after a crash (the finished points are skipped)
+
+	# Adaptive sampling:
+	# - run_adaptive(bounds=(low, high), budget=n) only uses the first column of the Excel file
+	# - the n values of var_name are chosen where the COP and ṁ_f change fastest (see AdaptiveSampling.py)
+
+	# Screening of the fluids:
+	# - Add top_k=5 (and T_supply=170, in °C) to rank the fluids with an ideal cycle first
+	# - Only the 5 best fluids are then computed with the full model (see FluidScreening.py)
+
+	# Stored results:
+	# - Add store=ResultStore() to reuse the points already computed (e.g. when re-running after a modification of the plots)
+	# - python -m Model_HTHP.ResultStore clear => remove all the stored points (see ResultStore.py)
+
+	# Inverse design (sizing):
+	# - run_inverse('V', 'T_co', 170, initial=5000) gives, for each fluid, the swept volume V (cm3) which delivers T_co = 170 °C
+	# - one solve per fluid instead of a dense sweep of V (targets: 'T_co' in °C, 'Q_cd' in W or 'COP', design: 'V' or 'ω')
+
+	# Warm start:
+	# - Add warm_start=WarmStartIndex() to start each point from the solution of the nearest past point (see WarmStartIndex.py)
+	# - the index is saved in Cache/warm_start.npz and grows with every run
+
+	# Columnar results:
+	# - Each run also writes all the points (inputs, solutions, residuals, outputs, status) next to the Excel file,
+	#   in Excel_Outputs/Outputs_..._results, after each fluid (.feather files if pyarrow is installed, else .npy files)
+	# - Add chunk_size=50 to write them every 50 points (see ResultSink.py)
+	# - ColumnarResults.load(path) reads them back (memory-mapped) without openpyxl, even during the run
+	# - export=None => Excel only
+
 	# => see details in SeveralFluidsSimulation.py
 
 
@@ -0,0 +1,36 @@
+from __init__				import *
+from DesignOfExperiments	import *
+
+
+# _test5.py
+
+	# Model of T. B. HERBAS, E. C. BERLINCK, C. A. T URIU, R. P. MARQUES AND J. A. R. PARISE
+	# from 'STEADY-STATE SIMULATION OF VAPOUR-COMPRESSION HEAT PUMPS'
+
+	# Tests 2 to 4 can only vary ONE input, written column by column in the Excel file.
+	# Test 5 aims to:
+	# - vary several inputs at the same time (here V x ω x T_ci)
+	# - only use the first column of the Excel file for the fixed inputs
+	# - solve the points in parallel
+
+	# method = 'grid'	=> every combination of the listed values
+	# method = 'lhs'	=> Latin hypercube sampling, factors given as (low, high)
+	# method = 'sobol'	=> Sobol sampling, factors given as (low, high)
+
+	# => see details in DesignOfExperiments.py
+
+
+if __name__ == '__main__':
+
+	input_file	= 'Excel_Inputs/Inputs_T3a.xlsx'
+	base_data	= ExcelToPython(input_file=input_file).get_data()[0]
+	factors		= {
+		'V'		: [100, 200, 300, 400, 500],
+		'ω'		: [2000, 2500, 3000, 3500],
+		'T_ci'	: [0, 10, 20, 30, 40],
+		}
+
+	results = DesignOfExperiments(base_data, factors, method='grid', workers=4).run()
+
+	# COP (V, ω, T_ci) for the highest rotation speed
+	print(np.round(results['outputs']['COP'][:, -1, :], 2))
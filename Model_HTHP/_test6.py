@@ -0,0 +1,50 @@
+from __init__			import *
+from PerformanceMap		import *
+
+
+# _test6.py
+
+	# Model of T. B. HERBAS, E. C. BERLINCK, C. A. T URIU, R. P. MARQUES AND J. A. R. PARISE
+	# from 'STEADY-STATE SIMULATION OF VAPOUR-COMPRESSION HEAT PUMPS'
+
+	# Test 6 aims to:
+	# - tabulate the COP and the condenser power (P_cond = Q̇_cd) as functions of T_ei, T_ci and ω
+	# - save the map, so that the downstream studies (TES sizing, annual simulation) do not re-run the model
+	# - evaluate the map for many operating points at once
+
+	# The points which did not converge are flagged: evaluate returns NaN in their cells (see is_valid)
+	# The cubic splines need a map without failed points, else the linear interpolation is used
+
+	# Large maps (4 to 6 inputs, many fluids):
+	# - ChunkedPerformanceMap.build('Excel_Outputs/Map_R1233zd(E)', base_data, factors, chunk_size=4096, workers=4)
+	# - the map is written on disk chunk by chunk, building again in the same directory resumes a stopped build
+	# - ChunkedPerformanceMap(directory).evaluate(...) only reads the chunks touched by the queries
+
+	# => see details in PerformanceMap.py and ChunkedPerformanceMap.py
+
+
+if __name__ == '__main__':
+
+	input_file	= 'Excel_Inputs/Inputs_T3a.xlsx'
+	base_data	= ExcelToPython(input_file=input_file).get_data()[0]
+	factors		= {
+		'T_ei'	: [10, 15, 20, 25, 30],
+		'T_ci'	: [0, 10, 20, 30, 40],
+		'ω'		: [2000, 2500, 3000, 3500],
+		}
+
+	performance_map = PerformanceMap.build(base_data, factors, workers=4)
+	performance_map.save('Excel_Outputs/performance_map.npz')
+
+	# COP and Q̇_cd for 1 000 000 random operating points
+	n	= 1000000
+	T_ei= np.random.uniform(10, 30, n)
+	T_ci= np.random.uniform(0, 40, n)
+	ω	= np.random.uniform(2000, 3500, n)
+
+	method	= 'cubic' if performance_map.converged.all() else 'linear'
+	COP	= performance_map.evaluate('COP', T_ei=T_ei, T_ci=T_ci, ω=ω, method=method)
+	Q_cd= performance_map.evaluate('P_cond', T_ei=T_ei, T_ci=T_ci, ω=ω)
+
+	print(f'Valid points: {np.mean(np.isfinite(COP))*100:.1f} %')
+	print(f'Mean COP: {np.nanmean(COP):.2f}, mean Q̇_cd: {np.nanmean(np.abs(Q_cd))/1000:.1f} kW')
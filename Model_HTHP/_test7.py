@@ -0,0 +1,37 @@
+from __init__	import *
+from Surrogate	import *
+
+
+# _test7.py
+
+	# Model of T. B. HERBAS, E. C. BERLINCK, C. A. T URIU, R. P. MARQUES AND J. A. R. PARISE
+	# from 'STEADY-STATE SIMULATION OF VAPOUR-COMPRESSION HEAT PUMPS'
+
+	# Test 7 aims to:
+	# - fit a fast model (surrogate) of the heat pump from 200 points solved by the real model
+	# - print the cross-validated error of each output
+	# - evaluate the COP in a few µs per point (optimisation loops, annual simulations)
+
+	# The domain of validity is given by the factors: out of it, the points are solved by the real model
+
+	# => see details in Surrogate.py
+
+
+if __name__ == '__main__':
+
+	input_file	= 'Excel_Inputs/Inputs_T3a.xlsx'
+	base_data	= ExcelToPython(input_file=input_file).get_data()[0]
+	factors		= {
+		'T_ei'	: (10, 30),
+		'T_ci'	: (0, 40),
+		'ω'		: (2000, 3500),
+		}
+
+	surrogate = Surrogate.train(base_data, factors, n_samples=200, workers=4)
+	surrogate.report()
+	surrogate.save(f"Excel_Outputs/Surrogate_{base_data['fluid']}.npz")
+
+	# COP for 1 000 000 random operating points
+	n	= 1000000
+	COP	= surrogate.COP(T_ei=np.random.uniform(10, 30, n), T_ci=np.random.uniform(0, 40, n), ω=np.random.uniform(2000, 3500, n))
+	print(f'Mean COP: {np.mean(COP):.2f}')
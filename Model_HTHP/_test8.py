@@ -0,0 +1,35 @@
+from __init__			import *
+from ExcelToPython		import *
+from DesignOptimisation	import *
+
+
+# _test8.py
+
+	# Model of T. B. HERBAS, E. C. BERLINCK, C. A. T URIU, R. P. MARQUES AND J. A. R. PARISE
+	# from 'STEADY-STATE SIMULATION OF VAPOUR-COMPRESSION HEAT PUMPS'
+
+	# Test 8 aims to:
+	# - find the design (V, ω, UA_cd, UA_ev) with the highest COP, for T_co >= T_co_min
+	# - or the cheapest design (objective='cost') for the same constraint
+	# instead of sweeping each design variable and reading the best value on the graphs
+
+	# The gradients are computed from the Jacobian of the system (implicit differentiation),
+	# the optimiser converges in a few tens of solves of the model
+
+	# => see details in DesignOptimisation.py
+
+
+if __name__ == '__main__':
+
+	input_file	= 'Excel_Inputs/Inputs_T3a.xlsx'
+	base_data	= ExcelToPython(input_file=input_file).get_data()[0]
+	base_data['T_ci'] = 20
+	variables	= {
+		'V'		: (100, 600),		# cm3
+		'ω'		: (1500, 4000),		# rpm
+		'UA_cd'	: (200, 3000),		# W/K
+		'UA_ev'	: (200, 3000),		# W/K
+		}
+
+	DesignOptimisation(base_data, variables, objective='COP', T_co_min=23).run()
+	DesignOptimisation(base_data, variables, objective='cost', T_co_min=23).run()
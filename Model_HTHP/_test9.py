@@ -0,0 +1,32 @@
+from __init__				import *
+from UncertaintyPropagation	import *
+
+
+# _test9.py
+
+	# Model of T. B. HERBAS, E. C. BERLINCK, C. A. T URIU, R. P. MARQUES AND J. A. R. PARISE
+	# from 'STEADY-STATE SIMULATION OF VAPOUR-COMPRESSION HEAT PUMPS'
+
+	# Test 9 aims to:
+	# - give a distribution to the uncertain inputs (n, Cv, r, UA_cd, UA_ev)
+	# - get the distributions of the COP and of T_co (ΔT_cd) with a Monte Carlo method
+	# - stop as soon as the confidence intervals of the means are tight enough (tolerance)
+
+	# The statistics are printed after each batch of samples
+	# => see details in UncertaintyPropagation.py
+
+
+if __name__ == '__main__':
+
+	input_file	= 'Excel_Inputs/Inputs_T3a.xlsx'
+	base_data	= ExcelToPython(input_file=input_file).get_data()[0]
+	base_data['T_ci'] = 20
+	distributions = {
+		'n'		: ('normal', base_data['n'], 0.02),
+		'Cv'	: ('uniform', 0.95 * base_data['Cv'], 1.05 * base_data['Cv']),
+		'r'		: ('triangular', 0.02, base_data['r'], 0.05),
+		'UA_cd'	: ('normal', base_data['UA_cd'], 0.05 * base_data['UA_cd']),
+		'UA_ev'	: ('normal', base_data['UA_ev'], 0.05 * base_data['UA_ev']),
+		}
+
+	UncertaintyPropagation(base_data, distributions, outputs=('COP', 'ΔT_cd'), max_samples=5000, workers=4).run()
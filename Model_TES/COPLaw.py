@@ -0,0 +1,83 @@
+from Model_TES.__init__		import *
+from scipy.optimize			import curve_fit
+from scipy.interpolate		import PchipInterpolator
+
+
+"""
+The class fits the law COP(Ẇ_comp) of the heat pump on the results of the HTHP model (see Model_HTHP/Simulation.py),
+to give it to the TES model instead of coefficients fitted by hand: inputs['COP'] = COPLaw.from_outputs(outputs)
+
+Inputs:
+	'Ẇ_comp'	: ,		Power of the compressor of each point (W), e.g. outputs['P_comp'] of OneFluidSimulation
+	'COP'		: ,		COP of each point, e.g. outputs['COP'] of OneFluidSimulation
+	(the points which did not converge, NaN or <= 0, are not used)
+
+Methods:
+	'power'		=> COP = a(Ẇ_comp)ᵇ, least squares (scipy.optimize.curve_fit) from the straight line in log-log
+				   => same law as the previous inputs['COP'] = (a, b), extrapolated out of the range of the points
+	'spline'	=> monotone cubic spline (PCHIP) through the mean COP of each Ẇ_comp,
+				   constant out of the range of the points
+
+Goodness of fit (report() prints them):
+	R² = 1 - Σ(COP - fit)² / Σ(COP - mean)²		RMSE = √(Σ(COP - fit)² / n)
+
+The law is vectorized: COP_law(Ẇ_comp) with a numpy array of the powers of all the hours of the year.
+
+"""
+
+
+class COPLaw:
+	def __init__(self, Ẇ_comp, COP,		# values to be set
+			method	= 'power',			# default values
+			):
+		if method not in ('power', 'spline'):
+			raise ValueError(f"Unknown method '{method}', use 'power' or 'spline'")
+
+		Ẇ_comp, COP	= np.asarray(Ẇ_comp, dtype=float), np.asarray(COP, dtype=float)
+		valid		= np.isfinite(Ẇ_comp) & np.isfinite(COP) & (Ẇ_comp > 0) & (COP > 0)
+		if np.count_nonzero(valid) < 2:
+			raise ValueError('At least 2 converged points are needed to fit the COP law')
+
+		self.method	= method
+		self.Ẇ_comp	= Ẇ_comp[valid]
+		self.values	= COP[valid]
+		self.domain	= (float(self.Ẇ_comp.min()), float(self.Ẇ_comp.max()))
+
+		if method == 'power':
+			# Initial guess: straight line ln(COP) = ln(a) + b ln(Ẇ_comp)
+			b, ln_a		= np.polyfit(np.log(self.Ẇ_comp), np.log(self.values), 1)
+			(self.a, self.b), _ = curve_fit(lambda x, a, b: a * x ** b, self.Ẇ_comp, self.values, p0=(np.exp(ln_a), b), maxfev=10000)
+		else:
+			# Mean COP of the points with the same power, the spline needs strictly increasing values of Ẇ_comp
+			x, inverse	= np.unique(self.Ẇ_comp, return_inverse=True)
+			y			= np.bincount(inverse, weights=self.values) / np.bincount(inverse)
+			self.spline	= PchipInterpolator(x, y)
+
+		residuals	= self.values - self(self.Ẇ_comp)
+		self.RMSE	= float(np.sqrt(np.mean(residuals ** 2)))
+		self.R2		= float(1 - np.sum(residuals ** 2) / np.sum((self.values - np.mean(self.values)) ** 2))
+
+
+	@classmethod
+	def from_outputs(cls, outputs, method='power'):
+		# Law fitted on the outputs dictionary of OneFluidSimulation (or of one fluid of SeveralFluidsSimulation)
+		return cls(outputs['P_comp'], outputs['COP'], method)
+
+
+	@classmethod
+	def from_points(cls, points, method='power'):
+		# Law fitted on the points (PointResult) given by iter_points of the simulations
+		points = [point for point in points if point.converged]
+		return cls([point.outputs['P_comp'] for point in points], [point.outputs['COP'] for point in points], method)
+
+
+	def __call__(self, Ẇ_comp):
+		if self.method == 'power':
+			return self.a * np.asarray(Ẇ_comp, dtype=float) ** self.b
+		return self.spline(np.clip(Ẇ_comp, *self.domain))
+
+
+	def report(self):
+		law = f'COP = {self.a:.5g} (Ẇ_comp)^{self.b:.4g}' if self.method == 'power' else 'COP = PCHIP spline of Ẇ_comp'
+		print(f'{law}		R² = {self.R2:.4f}		RMSE = {self.RMSE:.3g}')
+		print(f'{len(self.values)} points, Ẇ_comp from {self.domain[0]:.4g} to {self.domain[1]:.4g} W')
@@ -11,7 +11,6 @@ class ThermalEnergyStorage:
 		self.ṁ_s	 = inputs['ṁ_s']
 		self.P_s	 = inputs['P_s']
 		self.T_s_min = inputs['T_s_min'] + 273.15	# in K
-		# self.COP	 = inputs['COP']				# To replace by a function !
 	
 		# Side 2 : Process
 		self.fluid_p	= inputs['fluid_p']
@@ -21,7 +20,9 @@ class ThermalEnergyStorage:
 		self.T_po		= inputs['T_po'] + 273.15	# in K
 		self.t_p_start	= inputs['t_p_start']		# Process start hour
 		self.t_p_end	= inputs['t_p_end']			# Process end hour
-		self.a, self.b	= inputs['COP']
+		# COP law: (a, b) => COP = a(Ẇ_comp)ᵇ, or a function of Ẇ_comp (e.g. COPLaw fitted on the results of the HTHP model)
+		self.COP_law	= inputs['COP'] if callable(inputs['COP']) else None
+		self.a, self.b	= (None, None) if self.COP_law is not None else inputs['COP']
 
 		# Side 3 : PV power plant
 		self.A_pv		= A_pv				# Area of the solar panels
@@ -91,6 +92,9 @@ class ThermalEnergyStorage:
 	def COP(self):
 		# COP = a(Ẇ_comp)ᵇ => from results of the HTHP model
 		# Ensure that the computation takes place for Ẇ_comp > 0.
+		if self.COP_law is not None:
+			Ẇ_comp = self.Ẇ_comp
+			return np.where(Ẇ_comp > 0, self.COP_law(np.where(Ẇ_comp > 0, Ẇ_comp, 1)), 0)
 		return np.where(self.Ẇ_comp > 0, self.a * self.Ẇ_comp ** self.b, 0)
 
 